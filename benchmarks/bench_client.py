@@ -0,0 +1,161 @@
+"""Measures the overhead of the client against the in-process fake server.
+
+    python -m benchmarks.bench_client
+    python -m benchmarks.bench_client --latency 0.005 --messages 50000
+    python -m benchmarks.bench_client --json results.json
+
+Benchmarks:
+    requests/sec       channels_info calls, one after the other and on a
+                       pool of threads (map_calls)
+    cpu per call       client CPU time per call, with a transport answering
+                       in-process (no HTTP, no server)
+    pagination         channels_history items/sec, plain, with prefetch and
+                       with stream=True
+    memory             peak memory of a history kept as dicts and as Message
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from rocketchat_API.fake_server import FakeRocketChatServer
+from rocketchat_API.models import Message
+from rocketchat_API.rocketchat import RocketChat
+from rocketchat_API.transport import RocketChatTransport
+
+
+class CannedResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content):
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        pass
+
+
+class InProcessTransport(RocketChatTransport):
+    """Answers every request with the same body, without any I/O."""
+
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode()
+
+    def request(self, method, url, **kwargs):
+        return CannedResponse(self.content)
+
+
+def requests_per_second(rocket, calls, workers):
+    started = time.perf_counter()
+    for _ in range(calls):
+        rocket.channels_info(room_id="GENERAL")
+    sequential = calls / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    batch = (("channels_info", (), {"room_id": "GENERAL"}) for _ in range(calls))
+    for result in rocket.map_calls(batch, max_workers=workers):
+        result.result()
+    concurrent = calls / (time.perf_counter() - started)
+    return {
+        "requests_per_sec": round(sequential, 1),
+        "requests_per_sec_%d_threads" % workers: round(concurrent, 1),
+    }
+
+
+def cpu_per_call(calls):
+    results = {}
+    for name, payload, call in (
+        (
+            "channels_info",
+            {"channel": {"_id": "GENERAL", "name": "general"}, "success": True},
+            lambda rocket: rocket.channels_info(room_id="GENERAL"),
+        ),
+        (
+            "chat_post_message",
+            {"message": {"_id": "1", "msg": "hello"}, "success": True},
+            lambda rocket: rocket.chat_post_message("hello", room_id="GENERAL"),
+        ),
+    ):
+        rocket = RocketChat(transport=InProcessTransport(payload))
+        started = time.process_time()
+        for _ in range(calls):
+            call(rocket)
+        elapsed = time.process_time() - started
+        results["cpu_us_per_call_" + name] = round(elapsed / calls * 1e6, 2)
+    return results
+
+
+def pagination(rocket, page_size):
+    results = {}
+    for name, kwargs in (
+        ("plain", {}),
+        ("prefetch_4", {"prefetch": 4}),
+        ("stream", {"stream": True}),
+    ):
+        started = time.perf_counter()
+        items = sum(
+            1 for _ in rocket.channels_history("GENERAL", count=page_size, **kwargs)
+        )
+        elapsed = time.perf_counter() - started
+        results["history_items_per_sec_" + name] = round(items / elapsed, 1)
+    return results
+
+
+def memory(rocket, page_size):
+    results = {}
+    for name, kwargs in (("dicts", {}), ("models", {"model": Message})):
+        tracemalloc.start()
+        history = list(rocket.channels_history("GENERAL", count=page_size, **kwargs))
+        _, peak = tracemalloc.get_traced_memory()
+        current = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        kept = sum(stat.size for stat in current.statistics("filename"))
+        results["history_peak_mb_" + name] = round(peak / 2**20, 2)
+        results["history_kept_mb_" + name] = round(kept / 2**20, 2)
+        del history
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--json", help="Also write the results to this file")
+    options = parser.parse_args(argv)
+
+    results = {}
+    with FakeRocketChatServer(
+        latency=options.latency, max_page_size=options.page_size
+    ) as server:
+        server.add_messages("GENERAL", options.messages)
+        rocket = RocketChat("admin", "password", server_url=server.url)
+        results.update(requests_per_second(rocket, options.calls, options.workers))
+        results.update(cpu_per_call(options.calls * 5))
+        results.update(pagination(rocket, options.page_size))
+        results.update(memory(rocket, options.page_size))
+
+    for name, value in results.items():
+        print("%-40s %12s" % (name, value))
+
+    if options.json:
+        report = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "options": vars(options),
+            "results": results,
+        }
+        with open(options.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
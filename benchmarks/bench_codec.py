@@ -0,0 +1,61 @@
+"""Compares the JSON codecs on a page of messages.
+
+python benchmarks/bench_codec.py
+"""
+
+import timeit
+
+from rocketchat_API.codec import JSONCodec, OrjsonCodec, UjsonCodec
+
+
+def message(i):
+    return {
+        "_id": "msg%06d" % i,
+        "rid": "GENERAL",
+        "msg": "Hello world, this is message number %d with some text" % i,
+        "ts": "2024-01-01T00:00:%02d.000Z" % (i % 60),
+        "u": {"_id": "user%d" % (i % 50), "username": "user%d" % (i % 50)},
+        "_updatedAt": "2024-01-01T00:00:%02d.000Z" % (i % 60),
+        "urls": [],
+        "mentions": [{"_id": "user1", "username": "user1"}],
+        "channels": [],
+        "md": [{"type": "PARAGRAPH", "value": [{"type": "PLAIN_TEXT", "value": "hi"}]}],
+    }
+
+
+def available_codecs():
+    codecs = [JSONCodec()]
+    for codec in (OrjsonCodec, UjsonCodec):
+        try:
+            codecs.append(codec())
+        except ImportError:
+            print("%s is not installed, skipped" % codec.name)
+    return codecs
+
+
+def main(number=200):
+    page = {"messages": [message(i) for i in range(1000)], "count": 1000}
+    body = JSONCodec.dumps(page)
+    codecs = available_codecs()
+    print("page of 1000 messages, %d bytes, %d runs" % (len(body), number))
+    print("%-8s %12s %12s" % ("codec", "dumps (ms)", "loads (ms)"))
+    baseline = None
+    for codec in codecs:
+        dumps = timeit.timeit(lambda: codec.dumps(page), number=number) / number
+        loads = timeit.timeit(lambda: codec.loads(body), number=number) / number
+        if baseline is None:
+            baseline = (dumps, loads)
+        print(
+            "%-8s %7.2f x%-4.1f %7.2f x%-4.1f"
+            % (
+                codec.name,
+                dumps * 1000,
+                baseline[0] / dumps,
+                loads * 1000,
+                baseline[1] / loads,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
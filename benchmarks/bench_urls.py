@@ -0,0 +1,56 @@
+"""Measures the cost of building the URL of a GET call.
+
+python -m benchmarks.bench_urls
+"""
+
+import timeit
+from urllib.parse import urlencode
+
+from rocketchat_API.urls import build_query, endpoint_url
+
+SERVER_URL = "https://chat.example.com"
+ARGS = {
+    "roomId": "GENERAL",
+    "searchText": "deploy & rollback #42",
+    "offset": 500,
+    "count": 100,
+    "userIds": ["a1b2c3", "d4e5f6", "g7h8i9"],
+}
+
+
+def concatenation(args, method="chat.search"):
+    """The builder used before, which did not encode the values."""
+    url = SERVER_URL + "/api/v1/" + method
+    params = "&".join(
+        (
+            "&".join(i + "[]=" + j for j in args[i])
+            if isinstance(args[i], list)
+            else i + "=" + str(args[i])
+        )
+        for i in args
+    )
+    return "%s?%s" % (url, params)
+
+
+def urlencode_doseq(args, method="chat.search"):
+    url = SERVER_URL + "/api/v1/" + method
+    return "%s?%s" % (url, urlencode(args, doseq=True))
+
+
+def builder(args, method="chat.search"):
+    return "%s?%s" % (endpoint_url(SERVER_URL, "/api/v1/", method), build_query(args))
+
+
+def main(number=200000):
+    print("%d URLs with %d parameters" % (number, len(ARGS)))
+    for name, build in (
+        ("concatenation (unencoded)", concatenation),
+        ("urlencode(doseq=True)", urlencode_doseq),
+        ("build_query", builder),
+    ):
+        seconds = timeit.timeit(lambda: build(ARGS), number=number)
+        print("%-26s %6.2f us/call" % (name, seconds / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
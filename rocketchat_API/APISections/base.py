@@ -1,8 +1,16 @@
+import asyncio
+import contextvars
+import functools
+import inspect
 import itertools
 import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from json import JSONDecodeError
-from typing import Any, Callable, Generator
+from typing import Any, AsyncGenerator, Awaitable, Callable, Generator, Iterator
 
 import requests
 
@@ -12,6 +20,16 @@ from rocketchat_API.APIExceptions.RocketExceptions import (
     RocketBadStatusCodeException,
     RocketApiException,
 )
+from rocketchat_API.auth import ANONYMOUS, AuthState, HeadersView
+from rocketchat_API.batch import BatchResult, map_calls, resolve_call
+from rocketchat_API.codec import default_codec
+from rocketchat_API.directory import ROOM_CHANGING_METHODS
+from rocketchat_API.instrumentation import RequestEvent, body_size
+from rocketchat_API.rate_limit import RateLimiter
+from rocketchat_API.streaming import StreamedPage
+from rocketchat_API.tracing import PaginationTrace, current_span
+from rocketchat_API.transport import THREAD_SAFE_POOL_SIZE, RequestsTransport
+from rocketchat_API.urls import build_query, endpoint_url
 
 
 def _paginated_generator(
@@ -42,6 +60,215 @@ def _paginated_generator(
         data = func(self, *args, offset=offset, count=count, **kwargs)
 
 
+# Set while a paginated method is called with stream=True, call_api_get then
+# returns a StreamedPage of the items under this key
+_stream_key: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "stream_key", default=None
+)
+
+
+def _call_streamed(
+    self,
+    func: Callable[..., Any],
+    data_key: str,
+    offset: int,
+    count: int,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Any:
+    token = _stream_key.set(data_key)
+    try:
+        return func(self, *args, offset=offset, count=count, **kwargs)
+    finally:
+        _stream_key.reset(token)
+
+
+def _streamed_paginated_generator(
+    self,
+    func: Callable[..., Any],
+    data_key: str,
+    first_page: StreamedPage,
+    offset: int,
+    count: int,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Generator[dict[str, Any], None, None]:
+    """Like _paginated_generator, but the items of each page are decoded
+    while the page is downloaded."""
+    page = first_page
+    while True:
+        received = 0
+        try:
+            for item in page:
+                received += 1
+                yield item
+        finally:
+            page.close()
+
+        if received < count:
+            break
+
+        offset += count
+        page = _call_streamed(self, func, data_key, offset, count, args, kwargs)
+
+
+def _remaining_offsets(
+    first_data: dict[str, Any], offset: int, count: int, max_count: int | None
+) -> Iterator[int] | None:
+    """Offsets of the pages left after the first one, based on its ``total``.
+
+    Returns None when the response does not tell how many items there are.
+    """
+    total = first_data.get("total")
+    if not isinstance(total, int):
+        return None
+    end = total if max_count is None else min(total, offset + max_count)
+    return iter(range(offset + count, end, count))
+
+
+def _prefetching_paginated_generator(
+    self,
+    func: Callable[..., dict[str, Any]],
+    data_key: str,
+    first_data: dict[str, Any],
+    offset: int,
+    count: int,
+    max_count: int | None,
+    prefetch: int,
+    workers: int,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Generator[dict[str, Any], None, None]:
+    """Like _paginated_generator, but fetches up to ``prefetch`` pages ahead
+    on a thread pool. Items are still yielded in order."""
+    offsets = _remaining_offsets(first_data, offset, count, max_count)
+    if offsets is None:
+        yield from _paginated_generator(
+            self, func, data_key, first_data, offset, count, args, kwargs
+        )
+        return
+
+    items = first_data.get(data_key, [])
+    yield from items
+    if len(items) < count:
+        return
+
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="rocketchat_API"
+    )
+    pending = deque()
+
+    def submit_next():
+        next_offset = next(offsets, None)
+        if next_offset is not None:
+            pending.append(
+                executor.submit(
+                    func, self, *args, offset=next_offset, count=count, **kwargs
+                )
+            )
+
+    try:
+        for _ in range(prefetch):
+            submit_next()
+        while pending:
+            data = pending.popleft().result()
+            submit_next()
+            items = data.get(data_key, [])
+            yield from items
+            if len(items) < count:
+                break
+    finally:
+        # Also reached when the consumer stops iterating early
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _async_paginated_generator(
+    self,
+    func: Callable[..., Awaitable[dict[str, Any]]],
+    data_key: str,
+    first_data: Awaitable[dict[str, Any]],
+    offset: int,
+    count: int,
+    max_count: int | None,
+    prefetch: int,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Async counterpart of _paginated_generator used by the asyncio client."""
+    if max_count == 0:
+        return
+
+    data = await first_data
+    offsets = _remaining_offsets(data, offset, count, max_count) if prefetch else None
+    pending = deque()
+    yielded = 0
+    try:
+        while True:
+            items = data.get(data_key, [])
+            if not items:
+                return
+
+            for item in items:
+                if max_count is not None and yielded >= max_count:
+                    return
+                yield item
+                yielded += 1
+
+            if len(items) < count or (max_count is not None and yielded >= max_count):
+                return
+
+            if offsets is None:
+                offset += count
+                data = await func(self, *args, offset=offset, count=count, **kwargs)
+                continue
+
+            for next_offset in itertools.islice(offsets, prefetch - len(pending)):
+                pending.append(
+                    asyncio.ensure_future(
+                        func(self, *args, offset=next_offset, count=count, **kwargs)
+                    )
+                )
+            if not pending:
+                return
+            data = await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _limit(
+    items_gen: Iterator[dict[str, Any]], max_count: int | None, model: Any
+) -> Iterator[Any]:
+    if max_count is None and model is None:
+        return items_gen
+    return _limited(items_gen, max_count, model)
+
+
+def _limited(
+    items_gen: Iterator[dict[str, Any]], max_count: int | None, model: Any
+) -> Generator[Any, None, None]:
+    # A generator rather than islice/map, so that closing it (or reaching
+    # max_count) closes the walk and its pending requests
+    items = items_gen
+    if max_count is not None:
+        items = itertools.islice(items, max_count)
+    if model is not None:
+        items = map(model.from_dict, items)
+    try:
+        yield from items
+    finally:
+        close = getattr(items_gen, "close", None)
+        if close is not None:
+            close()
+
+
+async def _async_models(
+    items_gen: AsyncGenerator[dict[str, Any], None], model: Any
+) -> AsyncGenerator[Any, None]:
+    async for item in items_gen:
+        yield model.from_dict(item)
+
+
 def paginated(
     data_key: str,
 ) -> Callable[
@@ -63,6 +290,17 @@ def paginated(
         offset: Starting offset for pagination (default: 0)
         count: Number of items per page (default: 50)
         max_count: Maximum total number of items to return (default: None, returns all)
+        prefetch: Number of pages to request ahead of the consumer (default: 0,
+                  pages are requested one after the other). Requires the
+                  endpoint to report ``total`` in its response.
+        workers: Size of the thread pool used for prefetching
+                 (default: same as prefetch)
+        stream: Decode the items of each page while it is downloaded instead
+                of loading the whole page first (default: False). Lowers the
+                memory used by large pages. Can't be combined with prefetch.
+        model: A rocketchat_API.models class (e.g. Message, User) to convert
+               the items to. Only the keys it uses are requested from the
+               server, unless ``fields`` is given.
 
     Example:
         @paginated('groups')
@@ -74,36 +312,142 @@ def paginated(
 
         # Get at most 100 groups
         list(rocket.groups_list_all(max_count=100))
+
+        # Keep 4 pages in flight while iterating
+        for message in rocket.channels_history("GENERAL", prefetch=4):
+            ...
+
+        # Decode pages of 1000 users as they arrive
+        for user in rocket.users_list(count=1000, stream=True):
+            ...
+
+        # Get User objects with only the attributes they define
+        for user in rocket.users_list(model=User):
+            print(user.username)
+
+        # With AsyncRocketChat the same method is an async generator
+        async for group in async_rocket.groups_list_all():
+            ...
     """
 
     def decorator(func):
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            offset = kwargs.pop("offset", 0)
-            count = kwargs.pop("count", 50)
-            max_count = kwargs.pop("max_count", None)
-
-            # Call the original function eagerly to propagate any exceptions
-            first_data = func(self, *args, offset=offset, count=count, **kwargs)
+            # The decorator may be used on classes without a tracer
+            tracer = getattr(self, "tracer", None)
+            if tracer is None:
+                return _paginate(self, func, data_key, args, kwargs)
 
-            items_gen = _paginated_generator(
-                self, func, data_key, first_data, offset, count, args, kwargs
+            trace = PaginationTrace(
+                tracer,
+                func.__name__,
+                attributes={
+                    "rocketchat.page_size": kwargs.get("count", 50),
+                    "rocketchat.prefetch": kwargs.get("prefetch", 0),
+                    "rocketchat.stream": bool(kwargs.get("stream")),
+                },
             )
-
-            if max_count is not None:
-                return itertools.islice(items_gen, max_count)
-
-            return items_gen
+            fetch = trace.page_fetcher(
+                func, asynchronous=isinstance(self, AsyncRocketChatBase)
+            )
+            started = time.perf_counter()
+            try:
+                items = _paginate(self, fetch, data_key, args, kwargs)
+            except Exception as e:
+                trace.end(e)
+                raise
+            # The first page has been requested already
+            trace.wait_seconds += time.perf_counter() - started
+            return trace.iterate(items)
 
         return wrapper
 
     return decorator
 
 
-def json_or_error(r: requests.Response) -> Any:
+def _paginate(self, func, data_key, args, kwargs):
+    """Requests the first page of a paginated method and returns the
+    iterator of its items, see paginated."""
+    offset = kwargs.pop("offset", 0)
+    count = kwargs.pop("count", 50)
+    max_count = kwargs.pop("max_count", None)
+    prefetch = kwargs.pop("prefetch", 0)
+    workers = kwargs.pop("workers", None)
+    stream = kwargs.pop("stream", False)
+    model = kwargs.pop("model", None)
+    if workers and not prefetch:
+        prefetch = workers
+    if model is not None and "fields" not in kwargs:
+        kwargs["fields"] = model.projection()
+
+    if stream:
+        if prefetch:
+            raise ValueError("stream can't be combined with prefetch")
+        if isinstance(self, AsyncRocketChatBase):
+            raise ValueError("stream is not supported by the async client")
+        first_page = _call_streamed(self, func, data_key, offset, count, args, kwargs)
+        items_gen = _streamed_paginated_generator(
+            self, func, data_key, first_page, offset, count, args, kwargs
+        )
+        return _limit(items_gen, max_count, model)
+
+    # Call the original function eagerly to propagate any exceptions
+    first_data = func(self, *args, offset=offset, count=count, **kwargs)
+
+    if inspect.isawaitable(first_data):
+        if max_count == 0:
+            # Nothing will be yielded, don't even send the request
+            first_data.close()
+        items_gen = _async_paginated_generator(
+            self,
+            func,
+            data_key,
+            first_data,
+            offset,
+            count,
+            max_count,
+            prefetch,
+            args,
+            kwargs,
+        )
+        if model is not None:
+            return _async_models(items_gen, model)
+        return items_gen
+
+    if prefetch:
+        items_gen = _prefetching_paginated_generator(
+            self,
+            func,
+            data_key,
+            first_data,
+            offset,
+            count,
+            max_count,
+            prefetch,
+            workers or prefetch,
+            args,
+            kwargs,
+        )
+    else:
+        items_gen = _paginated_generator(
+            self, func, data_key, first_data, offset, count, args, kwargs
+        )
+
+    return _limit(items_gen, max_count, model)
+
+
+def _decode(r: requests.Response, codec: Any) -> Any:
+    content = getattr(r, "content", None)
+    # Responses of custom transports may only offer json()
+    if codec is not None and isinstance(content, bytes):
+        return codec.loads(content)
+    return r.json()
+
+
+def json_or_error(r: requests.Response, codec: Any = None) -> Any:
     if r.status_code > 399 or r.status_code < 200:
         try:
-            response_json = r.json()
+            response_json = _decode(r, codec)
             if (
                 isinstance(response_json, dict)
                 and response_json.get("success") is False
@@ -114,7 +458,7 @@ def json_or_error(r: requests.Response) -> Any:
         raise RocketBadStatusCodeException(r.status_code, r.text)
 
     try:
-        result = r.json()
+        result = _decode(r, codec)
     except JSONDecodeError:
         return r.text
 
@@ -136,20 +480,280 @@ class RocketChatBase:
         timeout=30,
         session=None,
         client_certs=None,
+        transport=None,
+        rate_limiter=None,
+        retry_policy=None,
+        cache=None,
+        conditional_requests=None,
+        room_directory=None,
+        codec=None,
+        observers=None,
+        tracer=None,
+        thread_safe=False,
+        relogin=False,
     ):
-        """Creates a RocketChat object and does login on the specified server"""
-        self.headers = {}
+        """Creates a RocketChat object and does login on the specified server
+
+        The HTTP requests are sent through ``transport`` (see
+        rocketchat_API.transport). By default a RequestsTransport wrapping
+        ``session`` is used.
+
+        ``rate_limiter`` paces the requests according to the rate limit
+        headers sent by the server and retries the ones rejected with 429.
+        A RateLimiter with default settings is used unless one is given;
+        pass False to disable it.
+
+        ``retry_policy`` (a rocketchat_API.retry.RetryPolicy) retries the
+        idempotent requests failing with transient errors. No retries are
+        made by default.
+
+        ``cache`` (a rocketchat_API.cache.ResponseCache) keeps the responses
+        of read-mostly GET methods. No responses are cached by default.
+
+        ``conditional_requests`` (a
+        rocketchat_API.cache.ConditionalRequestStore) revalidates the
+        responses of large, slowly changing GET methods with ETag and
+        Last-Modified instead of downloading them again.
+
+        ``room_directory`` (a rocketchat_API.directory.RoomDirectory) resolves
+        the room names given to the methods to room ids locally. Names are
+        sent to the server by default.
+
+        ``codec`` (see rocketchat_API.codec) encodes the JSON bodies of the
+        requests and decodes the responses. By default orjson or ujson is
+        used when installed, the json module otherwise.
+
+        ``observers`` (see rocketchat_API.instrumentation) are notified
+        before and after every request, e.g. an EndpointMetrics collecting
+        per endpoint latency histograms.
+
+        ``tracer`` (see rocketchat_API.tracing) makes a span for every
+        request and for every walk through a paginated method. No spans are
+        made by default.
+
+        With ``thread_safe`` set, the default transport gives each thread its
+        own session on top of a connection pool shared by all of them and
+        sized for THREAD_SAFE_POOL_SIZE concurrent requests. Logins and
+        logouts are always safe to run concurrently with other requests.
+
+        With ``relogin`` set, the user and password of the last login are
+        kept and used to log in again when the server rejects the token with
+        a 401 (e.g. once it expired). The rejected request is then sent
+        again, so paginated walks carry on where they were. Concurrent
+        requests rejected with the same token share a single login.
+        """
+        self._auth = ANONYMOUS
+        self._auth_lock = threading.Lock()
+        self.relogin = relogin
+        self._credentials = None
+        self._relogin_lock = threading.Lock()
         self.server_url = server_url
         self.proxies = proxies
         self.ssl_verify = ssl_verify
         self.cert = client_certs
         self.timeout = timeout
-        self.session = session or requests.Session()
+        if transport is None:
+            if thread_safe and session is None:
+                transport = RequestsTransport(
+                    pool_maxsize=THREAD_SAFE_POOL_SIZE, per_thread_sessions=True
+                )
+            else:
+                transport = RequestsTransport(session=session)
+        self.transport = transport
+        if rate_limiter is None:
+            rate_limiter = RateLimiter()
+        self.rate_limiter = rate_limiter or None
+        self.retry_policy = retry_policy
+        self.cache = cache
+        self.conditional_requests = conditional_requests
+        self.room_directory = room_directory
+        self.codec = codec or default_codec()
+        self.observers = list(observers or ())
+        self.tracer = tracer
         if user and password:
             self.login(user, password)  # skipcq: PTC-W1006
         if auth_token and user_id:
-            self.headers["X-Auth-Token"] = auth_token
-            self.headers["X-User-Id"] = user_id
+            self._auth = ANONYMOUS.with_auth(auth_token, user_id)
+
+    @property
+    def session(self):
+        return self.transport.session
+
+    @session.setter
+    def session(self, session):
+        """Sends the requests through ``session`` from now on, with a new
+        RequestsTransport."""
+        self.transport = RequestsTransport(session=session)
+
+    @property
+    def auth(self):
+        """The AuthState the requests are sent with."""
+        return self._auth
+
+    @property
+    def headers(self):
+        """Headers of the requests, the credentials included (see
+        rocketchat_API.auth.HeadersView)."""
+        return HeadersView(self)
+
+    @headers.setter
+    def headers(self, headers):
+        headers = dict(headers)
+        self._update_auth(lambda state: AuthState(headers))
+
+    def _update_auth(self, update):
+        """Replaces the AuthState with ``update(current state)``, returns the
+        new state."""
+        with self._auth_lock:
+            self._auth = update(self._auth)
+            return self._auth
+
+    def _request(self, http_method, method, url, **kwargs):
+        """Sends a request for the API ``method``, notifying the observers
+        and tracing it."""
+        observers = self.observers
+        tracer = self.tracer
+        if not observers and tracer is None:
+            return self._retrying_request(http_method, method, url, None, kwargs)
+
+        event = RequestEvent(method, http_method, body_size(kwargs))
+        span = None
+        if tracer is not None:
+            span = tracer.start_span(
+                method,
+                parent=current_span.get(),
+                attributes={"http.method": http_method.upper()},
+            )
+        for observer in observers:
+            observer.before_request(event)
+        started = time.perf_counter()
+        try:
+            response = self._retrying_request(http_method, method, url, event, kwargs)
+        except Exception as e:
+            event.exception = e
+            if span is not None:
+                span.record_exception(e)
+            raise
+        else:
+            event.status_code = response.status_code
+            if kwargs.get("stream"):
+                # Reading the content would consume the stream
+                length = response.headers.get("Content-Length")
+                event.bytes_received = int(length) if length else 0
+            else:
+                content = getattr(response, "content", None)
+                if isinstance(content, bytes):
+                    event.bytes_received = len(content)
+        finally:
+            event.elapsed = time.perf_counter() - started
+            for observer in observers:
+                observer.after_request(event)
+            if span is not None:
+                if event.status_code is not None:
+                    span.set_attribute("http.status_code", event.status_code)
+                span.set_attribute("rocketchat.retries", event.retries)
+                span.set_attribute("rocketchat.bytes_sent", event.bytes_sent)
+                span.set_attribute("rocketchat.bytes_received", event.bytes_received)
+                span.end()
+        return response
+
+    def _retrying_request(self, http_method, method, url, event, kwargs):
+        """Sends a request for the API ``method``, retrying it according to
+        the retry policy."""
+        retry_policy = self.retry_policy
+        # Uploaded files have been consumed, they can't be sent again
+        if (
+            retry_policy is None
+            or kwargs.get("files")
+            or not retry_policy.applies_to(http_method, method)
+        ):
+            return self._send(http_method, method, url, event, kwargs)
+
+        started = retry_policy.clock()
+        attempt = 1
+        while True:
+            if event is not None and attempt > 1:
+                event.retries += 1
+            try:
+                response = self._send(http_method, method, url, event, kwargs)
+            except retry_policy.retry_exceptions:
+                delay = retry_policy.next_delay(attempt, started)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in retry_policy.retry_statuses:
+                    return response
+                delay = retry_policy.next_delay(attempt, started)
+                if delay is None:
+                    return response
+                if kwargs.get("stream"):
+                    # Give the connection back to the pool before retrying
+                    response.close()
+            retry_policy.sleep(delay)
+            attempt += 1
+
+    def _send(self, http_method, method, url, event, kwargs):
+        """Sends a request for the API ``method`` through the transport,
+        honoring the rate limits and logging in again when the token is
+        rejected."""
+        rate_limiter = self.rate_limiter
+        retries = 0
+        relogged = False
+        while True:
+            if rate_limiter:
+                rate_limiter.acquire(method)
+            response = self.transport.request(
+                http_method,
+                url,
+                verify=self.ssl_verify,
+                cert=self.cert,
+                proxies=self.proxies,
+                timeout=self.timeout,
+                **kwargs,
+            )
+            if rate_limiter:
+                rate_limiter.update(method, response)
+            if (
+                response.status_code == 401
+                and not relogged
+                and self._relogin(method, kwargs)
+            ):
+                relogged = True
+                if kwargs.get("stream"):
+                    response.close()
+                if event is not None:
+                    event.retries += 1
+                continue
+            if (
+                not rate_limiter
+                or response.status_code != 429
+                or retries >= rate_limiter.max_retries
+                or kwargs.get("files")
+            ):
+                return response
+            retries += 1
+            if event is not None:
+                event.retries += 1
+            delay = rate_limiter.retry_after(method, response)
+            if kwargs.get("stream"):
+                response.close()
+            rate_limiter.sleep(delay)
+
+    def _relogin(self, method, kwargs):
+        """Logs in again after the token sent with ``kwargs`` was rejected,
+        unless a concurrent request already did. Returns whether the request
+        can be sent again, with the new token set in ``kwargs``."""
+        credentials = self._credentials
+        # Uploaded files have been consumed, they can't be sent again
+        if credentials is None or method in ("login", "logout") or kwargs.get("files"):
+            return False
+        headers = kwargs.get("headers") or {}
+        with self._relogin_lock:
+            if self._auth.auth_token == headers.get("X-Auth-Token"):
+                # Not the coroutine of the asyncio client
+                RocketChatBase.login(self, *credentials)
+        kwargs["headers"] = {**headers, **self._auth.headers}
+        return True
 
     @staticmethod
     def __reduce_kwargs(kwargs):
@@ -160,45 +764,106 @@ class RocketChatBase:
             del kwargs["kwargs"]
         return kwargs
 
+    def _invalidate_cache(self, method, args=None):
+        if self.cache is not None:
+            self.cache.invalidate(method, args)
+        directory = self.room_directory
+        if (
+            directory is not None
+            and args
+            and "roomId" in args
+            and method in ROOM_CHANGING_METHODS
+        ):
+            directory.forget(args["roomId"])
+
+    def _resolve_room_name(self, args):
+        """Replaces the roomName argument by the roomId found in the room
+        directory, if any."""
+        directory = self.room_directory
+        if directory is not None and "roomName" in args and "roomId" not in args:
+            room_id = directory.resolve(args["roomName"])
+            if room_id is not None:
+                del args["roomName"]
+                args["roomId"] = room_id
+        return args
+
+    def _json_body(self, payload, headers=None):
+        """Arguments of a request sending ``payload`` encoded by the codec."""
+        if headers is None:
+            headers = self._auth.headers
+        return {
+            "data": self.codec.dumps(payload),
+            "headers": {**headers, "Content-Type": "application/json"},
+        }
+
     def call_api_delete(self, method):
-        url = self.server_url + self.api_path + method
+        url = endpoint_url(self.server_url, self.api_path, method)
 
-        return json_or_error(
-            self.session.delete(
-                url,
-                headers=self.headers,
-                verify=self.ssl_verify,
-                cert=self.cert,
-                proxies=self.proxies,
-                timeout=self.timeout,
-            )
-        )
+        response = self._request("delete", method, url, headers=self._auth.headers)
+        self._invalidate_cache(method)
+        return json_or_error(response, self.codec)
 
     def call_api_get(self, method, api_path=None, **kwargs):
-        args = self.__reduce_kwargs(kwargs)
+        stream_key = _stream_key.get()
+        if stream_key is not None:
+            # Only this request is streamed, not the ones made while building
+            # it (e.g. the room directory refreshing). _call_streamed resets
+            # the variable once the page is requested.
+            _stream_key.set(None)
+        args = self._resolve_room_name(self.__reduce_kwargs(kwargs))
         if not api_path:
             api_path = self.api_path
-        url = self.server_url + api_path + method
-        # convert to key[]=val1&key[]=val2 for args like key=[val1, val2], else key=val
-        params = "&".join(
-            (
-                "&".join(i + "[]=" + j for j in args[i])
-                if isinstance(args[i], list)
-                else i + "=" + str(args[i])
-            )
-            for i in args
-        )
+        url = endpoint_url(self.server_url, api_path, method)
+        # key[]=val1&key[]=val2 for args like key=[val1, val2], else key=val
+        params = build_query(args)
 
-        return json_or_error(
-            self.session.get(
+        if stream_key is not None:
+            response = self._request(
+                "get",
+                method,
                 "%s?%s" % (url, params),
-                headers=self.headers,
-                verify=self.ssl_verify,
-                cert=self.cert,
-                proxies=self.proxies,
-                timeout=self.timeout,
+                headers=self._auth.headers,
+                stream=True,
             )
+            if response.status_code > 399 or response.status_code < 200:
+                json_or_error(response, self.codec)
+            return StreamedPage(response, stream_key)
+
+        cache = self.cache
+        cacheable = cache is not None and cache.is_cacheable(method)
+        if cacheable:
+            hit, result = cache.get(method, params)
+            if hit:
+                return result
+
+        conditional = self.conditional_requests
+        if conditional is not None and not conditional.applies_to(method):
+            conditional = None
+        headers = self._auth.headers
+        if conditional is not None:
+            headers = {**headers, **conditional.request_headers(method, params)}
+
+        response = self._request(
+            "get", method, "%s?%s" % (url, params), headers=headers
         )
+        if conditional is not None and response.status_code == 304:
+            hit, result = conditional.not_modified(method, params)
+            if hit:
+                return result
+            # The stored response is gone, ask for the full one
+            response = self._request(
+                "get", method, "%s?%s" % (url, params), headers=self._auth.headers
+            )
+
+        result = json_or_error(response, self.codec)
+        if cacheable or conditional is not None:
+            content = getattr(response, "content", None)
+            size = len(content) if isinstance(content, bytes) else 0
+            if cacheable:
+                cache.set(method, params, args, result, size)
+            if conditional is not None:
+                conditional.store(method, params, response, result, size)
+        return result
 
     def call_api_post(self, method, body=None, files=None, use_json=None, **kwargs):
         """Send a POST request to the API.
@@ -206,12 +871,12 @@ class RocketChatBase:
         There are two modes of operation:
 
         1. **Raw body** — pass ``body`` directly. The value is serialized as-is
-           via ``json=body``, which supports any JSON-serializable structure
-           (lists, dicts, etc.). ``kwargs`` are ignored in this mode.
+           by the codec of the client, which supports any JSON-serializable
+           structure (lists, dicts, etc.). ``kwargs`` are ignored in this mode.
 
         2. **Keyword arguments** (default) — individual kwargs are collected
            into a dict and sent as the request payload.  By default the payload
-           is sent as JSON (``json=``), but when ``files`` are provided it
+           is sent as JSON, but when ``files`` are provided it
            falls back to form-encoded ``data=`` because requests ignores the
            ``json`` parameter when ``files`` is set.  You can override this
            with ``use_json=True/False``.
@@ -224,22 +889,14 @@ class RocketChatBase:
         :param use_json: Force JSON (True) or form-encoded (False) encoding.
                          Defaults to JSON when no files are attached.
         """
-        url = self.server_url + self.api_path + method
+        url = endpoint_url(self.server_url, self.api_path, method)
 
         if body is not None:
-            return json_or_error(
-                self.session.post(
-                    url,
-                    json=body,
-                    headers=self.headers,
-                    verify=self.ssl_verify,
-                    cert=self.cert,
-                    proxies=self.proxies,
-                    timeout=self.timeout,
-                )
-            )
+            response = self._request("post", method, url, **self._json_body(body))
+            self._invalidate_cache(method)
+            return json_or_error(response, self.codec)
 
-        reduced_args = self.__reduce_kwargs(kwargs)
+        reduced_args = self._resolve_room_name(self.__reduce_kwargs(kwargs))
 
         # "pass" is a Python reserved word, but some endpoints (e.g.
         # users.register) expect it instead of "password".
@@ -249,19 +906,16 @@ class RocketChatBase:
         if use_json is None:
             use_json = files is None
 
-        return json_or_error(
-            self.session.post(
-                url,
-                json=reduced_args if use_json else None,
-                data=None if use_json else reduced_args,
-                files=files,
-                headers=self.headers,
-                verify=self.ssl_verify,
-                cert=self.cert,
-                proxies=self.proxies,
-                timeout=self.timeout,
-            )
-        )
+        if use_json and files is None:
+            body_kwargs = self._json_body(reduced_args)
+        elif use_json:
+            # requests ignores json when files are sent
+            body_kwargs = {"json": reduced_args, "headers": self._auth.headers}
+        else:
+            body_kwargs = {"data": reduced_args, "headers": self._auth.headers}
+        response = self._request("post", method, url, files=files, **body_kwargs)
+        self._invalidate_cache(method, reduced_args)
+        return json_or_error(response, self.codec)
 
     def call_api_put(self, method, files=None, use_json=None, **kwargs):
         reduced_args = self.__reduce_kwargs(kwargs)
@@ -270,32 +924,50 @@ class RocketChatBase:
             # > The json parameter is ignored if either data or files is passed.
             # If files are sent, json should not be used
             use_json = files is None
-        if use_json:
-            return json_or_error(
-                self.session.put(
-                    self.server_url + self.api_path + method,
-                    json=reduced_args,
-                    files=files,
-                    headers=self.headers,
-                    verify=self.ssl_verify,
-                    cert=self.cert,
-                    proxies=self.proxies,
-                    timeout=self.timeout,
-                )
+        if use_json and files is None:
+            response = self._request(
+                "put",
+                method,
+                endpoint_url(self.server_url, self.api_path, method),
+                **self._json_body(reduced_args),
             )
-
-        return json_or_error(
-            self.session.put(
-                self.server_url + self.api_path + method,
+        elif use_json:
+            response = self._request(
+                "put",
+                method,
+                endpoint_url(self.server_url, self.api_path, method),
+                json=reduced_args,
+                files=files,
+                headers=self._auth.headers,
+            )
+        else:
+            response = self._request(
+                "put",
+                method,
+                endpoint_url(self.server_url, self.api_path, method),
                 data=reduced_args,
                 files=files,
-                headers=self.headers,
-                verify=self.ssl_verify,
-                cert=self.cert,
-                proxies=self.proxies,
-                timeout=self.timeout,
+                headers=self._auth.headers,
             )
-        )
+        self._invalidate_cache(method, reduced_args)
+        return json_or_error(response, self.codec)
+
+    # Batches
+
+    def map_calls(self, calls, max_workers=8):
+        """Runs many calls concurrently, see rocketchat_API.batch.map_calls.
+
+        Example:
+            calls = (("channels_invite", (room_id, user_id)) for user_id in ids)
+            for result in rocket.map_calls(calls, max_workers=16):
+                if not result.ok:
+                    print(result.call, result.exception)
+        """
+        return map_calls(self, calls, max_workers)
+
+    def batch(self, calls, max_workers=8):
+        """Like map_calls, but returns the list of results."""
+        return list(map_calls(self, calls, max_workers))
 
     # Authentication
 
@@ -308,13 +980,11 @@ class RocketChatBase:
             request_data["user"] = user
         else:
             request_data["username"] = user
-        login_request = self.session.post(
-            self.server_url + self.api_path + "login",
+        login_request = self._request(
+            "post",
+            "login",
+            endpoint_url(self.server_url, self.api_path, "login"),
             json=request_data,
-            verify=self.ssl_verify,
-            proxies=self.proxies,
-            cert=self.cert,
-            timeout=self.timeout,
         )
         if login_request.status_code == 401:
             raise RocketAuthenticationException()
@@ -323,18 +993,168 @@ class RocketChatBase:
             login_request.status_code == 200
             and login_request.json().get("status") == "success"
         ):
-            self.headers["X-Auth-Token"] = (
-                login_request.json().get("data").get("authToken")
-            )
-            self.headers["X-User-Id"] = login_request.json().get("data").get("userId")
+            data = login_request.json().get("data")
+            auth_token, user_id = data.get("authToken"), data.get("userId")
+            self._update_auth(lambda state: state.with_auth(auth_token, user_id))
+            if self.relogin:
+                self._credentials = (user, password)
+            # Stored responses depend on the permissions of the user
+            if self.cache is not None:
+                self.cache.clear()
+            if self.conditional_requests is not None:
+                self.conditional_requests.clear()
             return login_request.json()
 
         raise RocketConnectionException()
 
     def logout(self, **kwargs):
-        """Invalidate your REST rocketchat_API authentication token."""
-        return self.call_api_post("logout", kwargs=kwargs)
+        """Invalidate your REST rocketchat_API authentication token.
+
+        The token is forgotten unless another one was obtained by a login
+        running meanwhile.
+        """
+        auth = self._auth
+        response = self._request(
+            "post",
+            "logout",
+            endpoint_url(self.server_url, self.api_path, "logout"),
+            **self._json_body(kwargs, auth.headers),
+        )
+        result = json_or_error(response, self.codec)
+
+        def forget(state):
+            if state.auth_token != auth.auth_token:
+                # Logged in again meanwhile
+                return state
+            return state.without_auth()
+
+        if not self._update_auth(forget).logged_in:
+            # Logged out on purpose, don't log in again on the next 401
+            self._credentials = None
+        return result
 
     def info(self, **kwargs):
         """Information about the Rocket.Chat server."""
         return self.call_api_get("info", api_path="/api/", kwargs=kwargs)
+
+
+class AsyncRocketChatBase(RocketChatBase):
+    """Base class for the asyncio flavour of the client.
+
+    Every ``call_api_*`` method (and therefore every API method built on top
+    of them) becomes a coroutine. Requests are executed on a dedicated thread
+    pool so that many of them can be in flight at the same time from a single
+    event loop; ``max_workers`` bounds that concurrency.
+    """
+
+    def __init__(self, user=None, password=None, *args, max_workers=32, **kwargs):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="rocketchat_API"
+        )
+        if kwargs.get("session") is None and kwargs.get("transport") is None:
+            # The default pool only keeps 10 connections alive, which would
+            # force new connections as soon as more workers are busy. Each
+            # worker gets its own session on top of the shared pool.
+            kwargs["transport"] = RequestsTransport(
+                pool_connections=max_workers,
+                pool_maxsize=max_workers,
+                per_thread_sessions=True,
+            )
+        super().__init__(None, None, *args, **kwargs)
+        if user and password:
+            # Login happens synchronously, the constructor can not be awaited
+            RocketChatBase.login(self, user, password)
+
+    async def _run_in_executor(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Run with the context of the caller, e.g. the span of a paginated
+        # walk
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.executor, context.run, functools.partial(func, *args, **kwargs)
+        )
+
+    async def call_api_delete(self, method):
+        return await self._run_in_executor(super().call_api_delete, method)
+
+    async def call_api_get(self, method, api_path=None, **kwargs):
+        return await self._run_in_executor(
+            super().call_api_get, method, api_path=api_path, **kwargs
+        )
+
+    async def call_api_post(
+        self, method, body=None, files=None, use_json=None, **kwargs
+    ):
+        return await self._run_in_executor(
+            super().call_api_post,
+            method,
+            body=body,
+            files=files,
+            use_json=use_json,
+            **kwargs,
+        )
+
+    async def call_api_put(self, method, files=None, use_json=None, **kwargs):
+        return await self._run_in_executor(
+            super().call_api_put, method, files=files, use_json=use_json, **kwargs
+        )
+
+    async def login(self, user, password):
+        return await self._run_in_executor(super().login, user, password)
+
+    async def logout(self, **kwargs):
+        return await self._run_in_executor(super().logout, **kwargs)
+
+    async def _run_call(self, call, semaphore):
+        async with semaphore:
+            try:
+                method, args, kwargs = resolve_call(self, call)
+                value = method(*args, **kwargs)
+                if inspect.isawaitable(value):
+                    value = await value
+                elif hasattr(value, "__anext__"):
+                    value = [item async for item in value]
+                return BatchResult(call, value=value)
+            except Exception as exception:  # skipcq: PYL-W0703
+                return BatchResult(call, exception=exception)
+
+    async def map_calls(self, calls, max_workers=8):
+        """Runs many calls concurrently, at most ``max_workers`` at a time.
+
+        Async generator of one BatchResult per call, in order, see
+        rocketchat_API.batch.map_calls. At most ``2 * max_workers`` calls
+        are started ahead of the results being consumed.
+
+        Example:
+            async for result in rocket.map_calls(calls, max_workers=16):
+                if not result.ok:
+                    print(result.call, result.exception)
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+        pending = deque()
+        try:
+            for call in calls:
+                pending.append(asyncio.ensure_future(self._run_call(call, semaphore)))
+                if len(pending) >= max_workers * 2:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # Stopped early, cancel the calls still pending
+            for task in pending:
+                task.cancel()
+
+    async def batch(self, calls, max_workers=8):
+        """Like map_calls, but returns the list of results."""
+        return [result async for result in self.map_calls(calls, max_workers)]
+
+    async def close(self):
+        """Release the worker threads and the HTTP connections."""
+        self.executor.shutdown(wait=False)
+        self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,96 @@
+from collections.abc import MutableMapping
+from types import MappingProxyType
+
+AUTH_HEADERS = ("X-Auth-Token", "X-User-Id")
+
+
+class AuthState:
+    """Headers sent with the requests of a client: the credentials and any
+    other header set by the user (e.g. ``x-2fa-code``).
+
+    An AuthState is never modified: logins, logouts and changes of the
+    headers replace the one of the client in a single assignment. A request
+    reads it once, so requests made concurrently with a login send either
+    the old token or the new one, each with its own user id, and never a
+    mix of both.
+    """
+
+    __slots__ = ("headers",)
+
+    def __init__(self, headers=None):
+        # Read-only, the same mapping is shared by every request
+        self.headers = MappingProxyType(dict(headers or {}))
+
+    @property
+    def auth_token(self):
+        return self.headers.get("X-Auth-Token")
+
+    @property
+    def user_id(self):
+        return self.headers.get("X-User-Id")
+
+    @property
+    def logged_in(self):
+        return bool(self.auth_token and self.user_id)
+
+    def with_auth(self, auth_token, user_id):
+        """A copy logged in with ``auth_token`` and ``user_id``."""
+        return AuthState(
+            {**self.headers, "X-Auth-Token": auth_token, "X-User-Id": user_id}
+        )
+
+    def without_auth(self):
+        """A copy without the credentials, other headers are kept."""
+        return AuthState(
+            {
+                key: value
+                for key, value in self.headers.items()
+                if key not in AUTH_HEADERS
+            }
+        )
+
+    def __repr__(self):
+        return "AuthState(user_id=%r, logged_in=%r)" % (self.user_id, self.logged_in)
+
+
+ANONYMOUS = AuthState()
+
+
+class HeadersView(MutableMapping):
+    """``client.headers``: the headers of the current AuthState of a client.
+
+    Setting or deleting a header replaces the AuthState of the client with
+    an updated copy, requests in flight keep the headers they were sent
+    with. ``copy()`` returns all the current headers at once.
+    """
+
+    __slots__ = ("_client",)
+
+    def __init__(self, client):
+        self._client = client
+
+    def _replace(self, update):
+        self._client._update_auth(lambda state: AuthState(update(dict(state.headers))))
+
+    def __getitem__(self, key):
+        return self._client.auth.headers[key]
+
+    def __setitem__(self, key, value):
+        self._replace(lambda headers: {**headers, key: value})
+
+    def __delitem__(self, key):
+        if key not in self._client.auth.headers:
+            raise KeyError(key)
+        self._replace(lambda headers: {k: v for k, v in headers.items() if k != key})
+
+    def __iter__(self):
+        return iter(self._client.auth.headers)
+
+    def __len__(self):
+        return len(self._client.auth.headers)
+
+    def copy(self):
+        return dict(self._client.auth.headers)
+
+    def __repr__(self):
+        return repr(self.copy())
@@ -0,0 +1,76 @@
+import inspect
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BatchResult:
+    """Outcome of one call of a batch: either ``value`` or ``exception``."""
+
+    __slots__ = ("call", "value", "exception")
+
+    def __init__(self, call, value=None, exception=None):
+        self.call = call
+        self.value = value
+        self.exception = exception
+
+    @property
+    def ok(self):
+        return self.exception is None
+
+    def result(self):
+        """Returns the value of the call, or raises its exception."""
+        if self.exception is not None:
+            raise self.exception
+        return self.value
+
+    def __repr__(self):
+        if self.exception is not None:
+            return f"BatchResult({self.call!r}, exception={self.exception!r})"
+        return f"BatchResult({self.call!r}, value={self.value!r})"
+
+
+def resolve_call(rocket, call):
+    """Splits ``call`` into the function to run and its arguments.
+
+    A call is a tuple ``(method, args)`` or ``(method, args, kwargs)`` where
+    ``method`` is the name of a client method or any callable.
+    """
+    method, *rest = call
+    args = rest[0] if rest else ()
+    kwargs = rest[1] if len(rest) > 1 else {}
+    if isinstance(method, str):
+        method = getattr(rocket, method)
+    return method, args, kwargs
+
+
+def _run(rocket, call):
+    try:
+        method, args, kwargs = resolve_call(rocket, call)
+        value = method(*args, **kwargs)
+        if inspect.isgenerator(value) or hasattr(value, "__next__"):
+            # Walk paginated results in the worker too
+            value = list(value)
+        return BatchResult(call, value=value)
+    except Exception as exception:  # skipcq: PYL-W0703
+        return BatchResult(call, exception=exception)
+
+
+def map_calls(rocket, calls, max_workers=8):
+    """Runs ``calls`` on ``rocket`` using ``max_workers`` threads.
+
+    Yields one BatchResult per call, in the order of ``calls``. An exception
+    raised by a call is stored in its result instead of stopping the others.
+    ``calls`` can be a generator: at most ``2 * max_workers`` calls are
+    started ahead of the results being consumed. Calls go through the rate
+    limiter of the client like any other.
+    """
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="rocketchat_API"
+    ) as executor:
+        pending = deque()
+        for call in calls:
+            pending.append(executor.submit(_run, rocket, call))
+            if len(pending) >= max_workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
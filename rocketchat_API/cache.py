@@ -0,0 +1,255 @@
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a response stays fresh, per API method. Methods not listed here are
+# never cached.
+DEFAULT_TTLS = {
+    "users.info": 60,
+    "channels.info": 60,
+    "groups.info": 60,
+    "rooms.info": 60,
+    "teams.info": 60,
+    "roles.list": 300,
+    "settings.public": 300,
+    "permissions.listAll": 300,
+}
+
+# A write to a section (the part of the method name before the first "." or
+# "/") may change what the reads of these sections return.
+RELATED_SECTIONS = {
+    "channels": ("channels", "rooms"),
+    "groups": ("groups", "rooms"),
+    "rooms": ("rooms", "channels", "groups"),
+    "teams": ("teams", "rooms"),
+    "users": ("users",),
+    "roles": ("roles", "users"),
+    "settings": ("settings",),
+    "permissions": ("permissions",),
+}
+
+# Parameters identifying the object a call reads or writes
+ID_PARAMS = ("roomId", "rid", "userId", "teamId", "roleId", "_id")
+
+
+def _section(method):
+    return re.split(r"[./]", method, maxsplit=1)[0]
+
+
+def _ids(args):
+    return {key: args[key] for key in ID_PARAMS if key in args}
+
+
+class _Entry:
+    __slots__ = ("method", "ids", "value", "size", "expires")
+
+    def __init__(self, method, ids, value, size, expires):
+        self.method = method
+        self.ids = ids
+        self.value = value
+        self.size = size
+        self.expires = expires
+
+
+class ResponseCache:
+    """In memory TTL/LRU cache for the responses of read-mostly GET methods.
+
+    Responses are keyed on the method and its query parameters and kept for
+    the TTL of their method (``ttls`` is merged over DEFAULT_TTLS, a TTL of
+    0 disables caching for a method). Once ``max_entries`` responses or
+    ``max_bytes`` bytes of response bodies are stored, the least recently
+    used ones are evicted.
+
+    Any POST, PUT or DELETE sent by the client invalidates the cached
+    responses of the related sections (see RELATED_SECTIONS). When the write
+    targets a specific object (e.g. ``channels.rename`` with a ``roomId``)
+    only the entries that can't belong to another object are dropped.
+    """
+
+    def __init__(self, ttls=None, max_entries=1024, max_bytes=None):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clock():
+        return time.monotonic()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_cacheable(self, method):
+        return bool(self.ttls.get(method))
+
+    def get(self, method, params):
+        """Returns ``(True, response)`` on a hit, ``(False, None)`` otherwise."""
+        key = (method, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry.expires <= self.clock():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            value = entry.value
+        # Callers are free to modify what they get
+        return True, copy.deepcopy(value)
+
+    def set(self, method, params, args, value, size=0):
+        key = (method, params)
+        entry = _Entry(
+            method,
+            _ids(args),
+            copy.deepcopy(value),
+            size,
+            self.clock() + self.ttls[method],
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.size += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self.size > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        self.size -= self._entries.pop(key).size
+
+    def invalidate(self, method, args=None):
+        """Drops the entries that a write to ``method`` with ``args`` may
+        have made stale."""
+        sections = RELATED_SECTIONS.get(_section(method))
+        if not sections:
+            return
+        ids = _ids(args or {})
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if _section(entry.method) not in sections:
+                    continue
+                if any(
+                    name in entry.ids and entry.ids[name] != value
+                    for name, value in ids.items()
+                ):
+                    # Cached for another object
+                    continue
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+# GET methods returning large payloads that rarely change
+DEFAULT_CONDITIONAL_METHODS = frozenset(
+    {
+        "settings",
+        "settings.public",
+        "permissions.listAll",
+        "emoji-custom.all",
+        "emoji-custom.list",
+        "custom-sounds.list",
+        "custom-user-status.list",
+    }
+)
+
+
+class _Validated:
+    __slots__ = ("etag", "last_modified", "value", "size")
+
+    def __init__(self, etag, last_modified, value, size):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.value = value
+        self.size = size
+
+
+class ConditionalRequestStore:
+    """Keeps the last response of some GET methods along with its validators.
+
+    When a response carries an ``ETag`` or ``Last-Modified`` header, the next
+    identical request is sent with ``If-None-Match``/``If-Modified-Since``.
+    If the server answers 304 Not Modified, the stored body is returned
+    instead of downloading it again. At most ``max_entries`` responses (and
+    ``max_bytes`` bytes of bodies, when set) are kept, least recently used
+    first out.
+    """
+
+    def __init__(
+        self, methods=DEFAULT_CONDITIONAL_METHODS, max_entries=256, max_bytes=None
+    ):
+        self.methods = methods
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def applies_to(self, method):
+        return method in self.methods
+
+    def request_headers(self, method, params):
+        """Conditional headers to send along with the request, if any."""
+        with self._lock:
+            entry = self._entries.get((method, params))
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def not_modified(self, method, params):
+        """Returns ``(True, response)`` with the stored response, or
+        ``(False, None)`` when it is no longer stored."""
+        key = (method, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(key)
+            value = entry.value
+        return True, copy.deepcopy(value)
+
+    def store(self, method, params, response, value, size=0):
+        headers = getattr(response, "headers", None) or {}
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not isinstance(etag, str):
+            etag = None
+        if not isinstance(last_modified, str):
+            last_modified = None
+        key = (method, params)
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key).size
+            if not etag and not last_modified:
+                return
+            self._entries[key] = _Validated(
+                etag, last_modified, copy.deepcopy(value), size
+            )
+            self.size += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self.size > self.max_bytes)
+            ):
+                self.size -= self._entries.popitem(last=False)[1].size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
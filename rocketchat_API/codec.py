@@ -0,0 +1,61 @@
+import json
+
+
+class JSONCodec:
+    """Encodes request bodies and decodes responses with the json module."""
+
+    name = "json"
+
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """Uses orjson (``pip install orjson``), usually several times faster
+    than the json module."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self.dumps = orjson.dumps
+        # orjson.JSONDecodeError is a json.JSONDecodeError
+        self.loads = orjson.loads
+
+
+class UjsonCodec:
+    """Uses ujson (``pip install ujson``)."""
+
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+
+    def dumps(self, obj):
+        return self._ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data):
+        try:
+            return self._ujson.loads(data)
+        except ValueError as e:
+            raise json.JSONDecodeError(str(e), "", 0) from e
+
+
+def default_codec():
+    """Returns the fastest codec available: orjson, ujson or json."""
+    for codec in (OrjsonCodec, UjsonCodec):
+        try:
+            return codec()
+        except ImportError:
+            pass
+    return JSONCodec()
@@ -0,0 +1,250 @@
+import json
+import threading
+import time
+
+from rocketchat_API.APIExceptions.RocketExceptions import (
+    RocketApiException,
+    RocketBadStatusCodeException,
+)
+
+USER_FIELDS = ("username", "name", "emails", "active", "type", "_updatedAt")
+
+
+def _updated_at(document):
+    value = document.get("_updatedAt")
+    if isinstance(value, dict):
+        value = value.get("$date")
+    return value if isinstance(value, str) else None
+
+
+class UserDirectory:
+    """In memory index of the users of the server.
+
+    ``load`` fetches every user once through ``users_list``, asking only for
+    ``fields``, and indexes them by ``_id``, ``username`` and email address
+    (case insensitive), so lookups don't need a round-trip. ``refresh`` then
+    only fetches the users updated since the most recent ``_updatedAt``
+    seen. Deleted users are only dropped by a full ``load``.
+
+    Example:
+        users = UserDirectory(rocket)
+        users.load()
+        user_id = users.by_username("john")["_id"]
+    """
+
+    def __init__(self, rocket, fields=USER_FIELDS, page_size=500):
+        self.rocket = rocket
+        self.fields = json.dumps({field: 1 for field in fields})
+        self.page_size = page_size
+        self.watermark = None
+        self._by_id = {}
+        self._by_username = {}
+        self._by_email = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, user_id):
+        return user_id in self._by_id
+
+    def _fetch(self, **kwargs):
+        return self.rocket.users_list(
+            fields=self.fields, count=self.page_size, **kwargs
+        )
+
+    def _add(self, user):
+        previous = self._by_id.get(user["_id"])
+        if previous is not None:
+            self._by_username.pop(previous.get("username"), None)
+            for email in previous.get("emails") or []:
+                self._by_email.pop(email.get("address", "").lower(), None)
+        self._by_id[user["_id"]] = user
+        if user.get("username"):
+            self._by_username[user["username"]] = user
+        for email in user.get("emails") or []:
+            if email.get("address"):
+                self._by_email[email["address"].lower()] = user
+        updated_at = _updated_at(user)
+        if updated_at and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def load(self):
+        """Replaces the index with all the users of the server."""
+        users = list(self._fetch())
+        with self._lock:
+            self._by_id, self._by_username, self._by_email = {}, {}, {}
+            self.watermark = None
+            for user in users:
+                self._add(user)
+        return len(users)
+
+    def refresh(self):
+        """Fetches the users updated since the last load or refresh.
+        Returns the number of users updated."""
+        if self.watermark is None:
+            return self.load()
+        query = json.dumps({"_updatedAt": {"$gt": {"$date": self.watermark}}})
+        try:
+            users = list(self._fetch(query=query))
+        except (RocketApiException, RocketBadStatusCodeException):
+            # Servers that don't accept the query parameter
+            return self.load()
+        with self._lock:
+            for user in users:
+                self._add(user)
+        return len(users)
+
+    def by_id(self, user_id):
+        return self._by_id.get(user_id)
+
+    def by_username(self, username):
+        return self._by_username.get(username)
+
+    def by_email(self, email):
+        return self._by_email.get(email.lower())
+
+
+# Methods after which the name a room id was indexed under may be stale
+ROOM_CHANGING_METHODS = {
+    "channels.delete",
+    "channels.rename",
+    "groups.delete",
+    "groups.rename",
+    "teams.delete",
+}
+
+
+def _room_watermark(room):
+    value = room.get("_updatedAt") or room.get("_deletedAt")
+    if isinstance(value, dict):
+        value = value.get("$date")
+    return value if isinstance(value, str) else None
+
+
+class RoomDirectory:
+    """In memory index of the rooms, to resolve room names to ids locally.
+
+    ``load`` fetches the rooms of the user with ``rooms_get`` (or, with
+    ``admin=True``, every room of the server with ``rooms_admin_rooms``) and
+    indexes them by ``_id`` and ``name``. ``refresh`` then asks ``rooms_get``
+    only for the rooms updated or removed since the last change seen. A
+    name that is not found triggers a refresh, at most once every
+    ``min_refresh_interval`` seconds.
+
+    When set as the ``room_directory`` of the client, the methods given a
+    room name (``channels_info(channel=...)``, ``groups_members(group=...)``,
+    ``rooms_favorite(room_name=...)``, ...) send the resolved id instead, so
+    the server doesn't have to look the name up. Names that can't be
+    resolved are sent as they are.
+
+    Example:
+        rooms = RoomDirectory(rocket)
+        rooms.load()
+        rocket.room_directory = rooms
+        rocket.channels_info(channel="general")  # sent as roomId=GENERAL
+    """
+
+    def __init__(self, rocket, page_size=500, min_refresh_interval=60):
+        self.rocket = rocket
+        self.page_size = page_size
+        self.min_refresh_interval = min_refresh_interval
+        self.watermark = None
+        self._by_id = {}
+        self._by_name = {}
+        self._last_refresh = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clock():
+        return time.monotonic()
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, room_id):
+        return room_id in self._by_id
+
+    def _add(self, room):
+        self._remove(room["_id"])
+        self._by_id[room["_id"]] = room
+        if room.get("name"):
+            self._by_name[room["name"]] = room
+        self._see(room)
+
+    def _remove(self, room_id):
+        previous = self._by_id.pop(room_id, None)
+        if previous is not None and previous.get("name"):
+            if self._by_name.get(previous["name"]) is previous:
+                del self._by_name[previous["name"]]
+
+    def _see(self, room):
+        watermark = _room_watermark(room)
+        if watermark and (self.watermark is None or watermark > self.watermark):
+            self.watermark = watermark
+
+    def load(self, admin=False):
+        """Replaces the index with the rooms of the user, or all the rooms
+        of the server when ``admin`` is True. Returns the number of rooms."""
+        if admin:
+            rooms = list(self.rocket.rooms_admin_rooms(count=self.page_size))
+        else:
+            rooms = self.rocket.rooms_get().get("update", [])
+        with self._lock:
+            self._by_id, self._by_name = {}, {}
+            self.watermark = None
+            for room in rooms:
+                self._add(room)
+            self._last_refresh = self.clock()
+        return len(rooms)
+
+    def refresh(self):
+        """Applies the rooms updated and removed since the last load or
+        refresh. Returns the number of rooms changed."""
+        if self.watermark is None:
+            return self.load()
+        changes = self.rocket.rooms_get(updatedSince=self.watermark)
+        updated = changes.get("update", [])
+        removed = changes.get("remove", [])
+        with self._lock:
+            for room in updated:
+                self._add(room)
+            for room in removed:
+                self._remove(room["_id"])
+                self._see(room)
+            self._last_refresh = self.clock()
+        return len(updated) + len(removed)
+
+    def forget(self, room_id):
+        """Drops a room from the index, e.g. after deleting or renaming it."""
+        with self._lock:
+            self._remove(room_id)
+
+    def by_id(self, room_id):
+        return self._by_id.get(room_id)
+
+    def by_name(self, name):
+        return self._by_name.get(name)
+
+    def resolve(self, name):
+        """Returns the id of the room called ``name``, or None."""
+        room = self._by_name.get(name)
+        if room is None and self._refresh_due():
+            self.refresh()
+            room = self._by_name.get(name)
+        return room["_id"] if room is not None else None
+
+    def _refresh_due(self):
+        """Tells if a refresh is due, claiming it so that concurrent misses
+        don't all refresh."""
+        if self.min_refresh_interval is None:
+            return False
+        with self._lock:
+            now = self.clock()
+            if (
+                self._last_refresh is not None
+                and now - self._last_refresh < self.min_refresh_interval
+            ):
+                return False
+            self._last_refresh = now
+            return True
@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Method returning the history of each room type
+HISTORY_METHODS = {
+    "c": "channels_history",
+    "p": "groups_history",
+    "d": "dm_history",
+}
+
+PARQUET_COLUMNS = ("_id", "rid", "ts", "u_id", "u_username", "msg", "json")
+
+
+class _JSONLinesWriter:
+    extension = ".jsonl"
+
+    def __init__(self, path, batch_size):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, message):
+        self.file.write(json.dumps(message, ensure_ascii=False))
+        self.file.write("\n")
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    extension = ".parquet"
+
+    def __init__(self, path, batch_size):
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pyarrow = pyarrow
+        self.schema = pyarrow.schema(
+            [(column, pyarrow.string()) for column in PARQUET_COLUMNS]
+        )
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self.batch_size = batch_size
+        self.rows = []
+
+    def write(self, message):
+        user = message.get("u") or {}
+        ts = message.get("ts")
+        self.rows.append(
+            {
+                "_id": message.get("_id"),
+                "rid": message.get("rid"),
+                "ts": ts if isinstance(ts, str) else json.dumps(ts),
+                "u_id": user.get("_id"),
+                "u_username": user.get("username"),
+                "msg": message.get("msg"),
+                "json": json.dumps(message, ensure_ascii=False),
+            }
+        )
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(
+                self.pyarrow.Table.from_pylist(self.rows, schema=self.schema)
+            )
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+_WRITERS = {"jsonl": _JSONLinesWriter, "parquet": _ParquetWriter}
+
+
+class MessageExporter:
+    """Exports the message history of every room to one file per room.
+
+    Rooms are listed with ``rooms_admin_rooms`` and their history is streamed
+    page by page through the paginated history methods straight to the
+    output file, so memory usage does not depend on the size of the history.
+    ``max_workers`` rooms are exported at the same time.
+
+    Files are written as ``<room_id>.jsonl`` (newline-delimited JSON) or, with
+    ``file_format="parquet"`` and pyarrow installed, ``<room_id>.parquet``.
+    A room is written to a ``.partial`` file first and renamed once complete.
+    Completed rooms are recorded in ``checkpoint.json`` inside
+    ``output_dir``, and are skipped when an interrupted export is started
+    again.
+    """
+
+    def __init__(
+        self,
+        rocket,
+        output_dir,
+        file_format="jsonl",
+        max_workers=4,
+        page_size=100,
+        prefetch=0,
+    ):
+        if file_format not in _WRITERS:
+            raise ValueError("file_format must be one of " + ", ".join(_WRITERS))
+        self.rocket = rocket
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.checkpoint_path = os.path.join(output_dir, "checkpoint.json")
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+        self.completed = self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as checkpoint:
+                return json.load(checkpoint)
+        except FileNotFoundError:
+            return {}
+
+    def _save_checkpoint(self, room_id, count):
+        with self._lock:
+            self.completed[room_id] = count
+            partial_path = self.checkpoint_path + ".partial"
+            with open(partial_path, "w", encoding="utf-8") as checkpoint:
+                json.dump(self.completed, checkpoint)
+            os.replace(partial_path, self.checkpoint_path)
+
+    def export_room(self, room):
+        """Exports the history of ``room`` (as returned by rooms_admin_rooms).
+        Returns the number of exported messages."""
+        history = getattr(self.rocket, HISTORY_METHODS[room["t"]])
+        writer_class = _WRITERS[self.file_format]
+        path = os.path.join(self.output_dir, room["_id"] + writer_class.extension)
+        count = 0
+        writer = writer_class(path + ".partial", self.page_size)
+        try:
+            for message in history(
+                room["_id"], count=self.page_size, prefetch=self.prefetch
+            ):
+                writer.write(message)
+                count += 1
+        finally:
+            writer.close()
+        os.replace(path + ".partial", path)
+        self._save_checkpoint(room["_id"], count)
+        return count
+
+    def export(self, rooms=None):
+        """Exports every room not exported yet. ``rooms`` defaults to all the
+        rooms of the server. Returns the number of messages per room."""
+        if rooms is None:
+            rooms = self.rocket.rooms_admin_rooms(count=self.page_size)
+        exported = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Bounded, so that the list of rooms is also streamed
+            pending = deque()
+            for room in rooms:
+                if room.get("t") not in HISTORY_METHODS:
+                    continue
+                if room["_id"] in self.completed:
+                    exported[room["_id"]] = self.completed[room["_id"]]
+                    continue
+                pending.append((room["_id"], executor.submit(self.export_room, room)))
+                if len(pending) >= self.max_workers * 2:
+                    room_id, future = pending.popleft()
+                    exported[room_id] = future.result()
+            for room_id, future in pending:
+                exported[room_id] = future.result()
+        return exported
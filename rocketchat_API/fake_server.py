@@ -0,0 +1,1312 @@
+import functools
+import itertools
+import json
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+# Error of the requests to the endpoints the fake server doesn't implement
+NOT_IMPLEMENTED = "Not implemented by the fake server"
+# Endpoints answered without authentication
+PUBLIC_METHODS = {"login", "users.register", "settings.public"}
+# Prefix of the room endpoints, room type and key of the room in responses
+ROOM_TYPES = (("channels", "c", "channel"), ("groups", "p", "group"))
+# Keys of the room documents that are not part of the API responses
+ROOM_STATE = ("usernames", "owners", "moderators", "leaders", "joinCode")
+MENTION = re.compile(r"@([\w.-]+)")
+
+
+def _timestamp(seconds):
+    value = EPOCH + timedelta(seconds=seconds)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + "%03dZ" % (value.microsecond // 1000)
+
+
+class FakeApiError(Exception):
+    """Raised by the handlers, sent as ``{"success": false, ...}``."""
+
+    def __init__(self, status_code, error, error_type=None):
+        super().__init__(error)
+        self.status_code = status_code
+        self.error = error
+        self.error_type = error_type
+
+    def payload(self):
+        payload = {"success": False, "error": self.error}
+        if self.error_type:
+            payload["errorType"] = self.error_type
+        return payload
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, don't wait for the ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # skipcq: PYL-W0622
+        pass
+
+    def do_GET(self):
+        self._handle("get")
+
+    def do_POST(self):
+        self._handle("post")
+
+    def do_PUT(self):
+        self._handle("put")
+
+    def do_DELETE(self):
+        self._handle("delete")
+
+    def _handle(self, http_method):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status_code, payload = self.server.fake.dispatch(
+            http_method, url.path, url.query, body, self.headers
+        )
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _parse_query(query):
+    params = {}
+    for key, value in parse_qsl(query, keep_blank_values=True):
+        if key.endswith("[]"):
+            params.setdefault(key[:-2], []).append(value)
+        else:
+            params[key] = value
+    return params
+
+
+def _parse_body(body, content_type):
+    if not body:
+        return {}
+    if content_type and content_type.startswith("application/json"):
+        return json.loads(body)
+    return _parse_query(body.decode("utf-8"))
+
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
+class FakeRocketChatServer:
+    """In-process stand-in for the REST API of a Rocket.Chat server.
+
+    It keeps users, rooms and messages in memory and implements the main
+    endpoints (login, users, channels, groups, direct messages, rooms,
+    subscriptions, chat and settings), with pagination
+    (``offset``/``count``/``total``), authentication headers, room roles
+    and the error responses of Rocket.Chat. ``latency`` (seconds) is added
+    to every request and ``max_page_size`` caps ``count`` like the
+    API_Upper_Count_Limit setting. Other endpoints answer 404 and are
+    recorded in ``missing``.
+
+    As on a new Rocket.Chat server, the first user registered with
+    users.register becomes an administrator and the owner of the default
+    rooms.
+
+    Example:
+        with FakeRocketChatServer() as server:
+            server.add_messages("GENERAL", 1000)
+            rocket = RocketChat("admin", "password", server_url=server.url)
+            messages = list(rocket.channels_history("GENERAL", count=100))
+    """
+
+    version = "7.0.0"
+
+    def __init__(self, latency=0, max_page_size=100, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.max_page_size = max_page_size
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.users = {}
+        self.rooms = {}
+        self.messages = {}
+        self.deleted = {}
+        self.receipts = []
+        self.reports = []
+        self.settings = {
+            "Site_Name": {"value": "Rocket.Chat", "public": True},
+            "API_Allow_Infinite_Count": {"value": True, "public": False},
+            "API_Upper_Count_Limit": {"value": max_page_size, "public": False},
+            "E2E_Enable": {"value": False, "public": True},
+            "Livechat_Routing_Method": {"value": "Auto_Selection", "public": False},
+        }
+        self.tokens = {}
+        self.missing = []
+        self._registered = False
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._httpd = None
+        self._thread = None
+        self.routes = {}
+        self._add_routes()
+        self.admin = self.add_user(
+            "admin", password="password", roles=["admin", "user"], user_id="admin"
+        )
+        self.add_room("general", room_id="GENERAL", default=True)
+
+    # Server
+
+    @property
+    def url(self):
+        return "http://%s:%d" % (self.host, self.port)
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Data
+
+    def _new_id(self, prefix):
+        return "%s%06d" % (prefix, next(self._ids))
+
+    def _now(self):
+        return _timestamp(next(self._ids))
+
+    def add_user(
+        self, username, password="password", roles=None, user_id=None, **fields
+    ):
+        """Adds a user, member of the default rooms."""
+        with self._lock:
+            user_id = user_id or self._new_id("U")
+            user = {
+                "_id": user_id,
+                "username": username,
+                "name": fields.pop("name", username),
+                "emails": [{"address": username + "@example.com", "verified": True}],
+                "status": "offline",
+                "active": True,
+                "type": "user",
+                "roles": roles or ["user"],
+                "_updatedAt": self._now(),
+                **fields,
+            }
+            user["password"] = password
+            self.users[user_id] = user
+            for room in self.rooms.values():
+                if room.get("default"):
+                    room["usernames"].append(username)
+                    room["usersCount"] = len(room["usernames"])
+                    joined = self._message(room["_id"], username, user, t="uj")
+                    self.messages[room["_id"]].append(joined)
+                    room["msgs"] = len(self.messages[room["_id"]])
+        return user
+
+    def expire_tokens(self):
+        """Revokes every authentication token, as when they expire."""
+        with self._lock:
+            self.tokens.clear()
+
+    def add_room(
+        self, name, room_type="c", room_id=None, members=None, owner=None, **fields
+    ):
+        """Adds a room, ``owner`` (a user document) being its creator and
+        owner."""
+        with self._lock:
+            room_id = room_id or self._new_id("R")
+            usernames = members or [user["username"] for user in self.users.values()]
+            creator = owner or self.users["admin"]
+            room = {
+                "_id": room_id,
+                "name": name,
+                "fname": name,
+                "t": room_type,
+                "msgs": 0,
+                "usersCount": len(usernames),
+                "u": {"_id": creator["_id"], "username": creator["username"]},
+                "ts": _timestamp(0),
+                "ro": False,
+                "sysMes": True,
+                "_updatedAt": self._now(),
+                "usernames": list(usernames),
+                "owners": [owner["_id"]] if owner else [],
+                "moderators": [],
+                "leaders": [],
+                **fields,
+            }
+            self.rooms[room_id] = room
+            self.messages[room_id] = []
+            self.deleted[room_id] = []
+        return room
+
+    def add_messages(self, room_id, number, text="message %d", user_id="admin"):
+        """Adds ``number`` messages to a room, the n-th one saying
+        ``text % n``."""
+        user = self.users[user_id]
+        with self._lock:
+            messages = self.messages[room_id]
+            start = len(messages)
+            for index in range(start, start + number):
+                messages.append(self._message(room_id, text % index, user))
+            self.rooms[room_id]["msgs"] = len(messages)
+
+    def _message(self, room_id, text, user, **fields):
+        ts = self._now()
+        return {
+            "_id": self._new_id("M"),
+            "rid": room_id,
+            "msg": text,
+            "ts": ts,
+            "u": {
+                "_id": user["_id"],
+                "username": user["username"],
+                "name": user["name"],
+            },
+            "_updatedAt": ts,
+            "urls": [],
+            "mentions": [],
+            "channels": [],
+            "md": [
+                {"type": "PARAGRAPH", "value": [{"type": "PLAIN_TEXT", "value": text}]}
+            ],
+            **fields,
+        }
+
+    # Requests
+
+    def dispatch(self, http_method, path, query, body, headers):
+        """Handles a request, returns the status code and the payload."""
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if path == "/api/info":
+            if self._authenticated(headers) is None:
+                return 200, {"version": self.version, "success": True}
+            return 200, {"info": {"version": self.version}, "success": True}
+        if not path.startswith("/api/v1/"):
+            return 404, {"success": False, "error": "Not found"}
+        method = path[len("/api/v1/") :]
+        handler = self.routes.get((http_method, method))
+        resource_id = None
+        if handler is None and "/" in method:
+            prefix, resource_id = method.split("/", 1)
+            handler = self.routes.get((http_method, prefix + "/"))
+        if handler is None:
+            self.missing.append((http_method, method))
+            return 404, {"success": False, "error": NOT_IMPLEMENTED}
+        try:
+            params = _parse_query(query)
+            params.update(_parse_body(body, headers.get("Content-Type")))
+        except ValueError:
+            return 400, {"success": False, "error": "Invalid body"}
+        if resource_id is not None:
+            params["_id"] = resource_id
+        if method == "logout":
+            # Only the token of the request is revoked
+            params["_token"] = headers.get("X-Auth-Token")
+        user = None
+        if method not in PUBLIC_METHODS:
+            user = self._authenticated(headers)
+            if user is None:
+                return 401, {
+                    "status": "error",
+                    "message": "You must be logged in to do this.",
+                }
+        try:
+            with self._lock:
+                payload = handler(params, user)
+        except FakeApiError as e:
+            return e.status_code, e.payload()
+        if method != "login":
+            payload["success"] = True
+        return 200, payload
+
+    def _authenticated(self, headers):
+        user = self.tokens.get(headers.get("X-Auth-Token"))
+        if user is None or user["_id"] != headers.get("X-User-Id"):
+            return None
+        return user
+
+    def _add_routes(self):
+        for name in dir(self):
+            if name.startswith(("get_", "post_")):
+                http_method, method = name.split("_", 1)
+                self.routes[(http_method, method.replace("__", "."))] = getattr(
+                    self, name
+                )
+            elif name.startswith(("room_get_", "room_post_")):
+                # Shared by channels.* and groups.*
+                _, http_method, method = name.split("_", 2)
+                for prefix, room_type, key in ROOM_TYPES:
+                    self.routes[(http_method, prefix + "." + method)] = (
+                        functools.partial(
+                            getattr(self, name), room_type=room_type, key=key
+                        )
+                    )
+        self.routes[("get", "settings/")] = self.get_setting
+        self.routes[("post", "settings/")] = self.post_setting
+
+    def _page(self, items, params, key):
+        offset = int(params.get("offset", 0))
+        count = int(params.get("count", 50))
+        if count <= 0 or count > self.max_page_size:
+            count = self.max_page_size
+        page = items[offset : offset + count]
+        return {key: page, "count": len(page), "offset": offset, "total": len(items)}
+
+    def take_missing(self):
+        """Returns the endpoints requested but not implemented since the
+        last call."""
+        missing, self.missing = self.missing, []
+        return missing
+
+    def _room(self, params, room_type=None):
+        room_id = params.get("roomId") or params.get("rid")
+        if room_id is not None:
+            room = self.rooms.get(room_id)
+        else:
+            name = params.get("roomName") or params.get("channel", "").lstrip("#")
+            room = self.rooms.get(name) or next(
+                (room for room in self.rooms.values() if room["name"] == name), None
+            )
+        if room is None or (room_type is not None and room["t"] != room_type):
+            raise FakeApiError(
+                400, "The required room was not found", "error-room-not-found"
+            )
+        return room
+
+    def _user(self, params):
+        user_id = params.get("userId")
+        username = params.get("username")
+        for user in self.users.values():
+            if user["_id"] == user_id or (username and user["username"] == username):
+                return user
+        raise FakeApiError(400, "User not found.", "error-invalid-user")
+
+    @staticmethod
+    def _public(user):
+        return {key: value for key, value in user.items() if key != "password"}
+
+    @staticmethod
+    def _room_info(room):
+        return {key: value for key, value in room.items() if key not in ROOM_STATE}
+
+    def _touch(self, room):
+        room["_updatedAt"] = self._now()
+        return room
+
+    # Authentication
+
+    def post_login(self, params, _):
+        login = params.get("user") or params.get("username")
+        for user in self.users.values():
+            addresses = [email.get("address") for email in user.get("emails", [])]
+            if (user["username"] == login or login in addresses) and user[
+                "password"
+            ] == params.get("password"):
+                token = secrets.token_hex(16)
+                self.tokens[token] = user
+                user["status"] = "online"
+                user["lastLogin"] = self._now()
+                return {
+                    "status": "success",
+                    "data": {
+                        "authToken": token,
+                        "userId": user["_id"],
+                        "me": self._public(user),
+                    },
+                }
+        raise FakeApiError(401, "Unauthorized")
+
+    def post_logout(self, params, user):
+        self.tokens.pop(params["_token"], None)
+        return {"status": "success", "data": {"message": "You've been logged out!"}}
+
+    def get_me(self, params, user):
+        return self._public(user)
+
+    def get_licenses__info(self, params, user):
+        # Community edition: no license
+        return {"license": {}}
+
+    # Users
+
+    def get_users__list(self, params, user):
+        users = [self._public(user) for user in self.users.values()]
+        return self._page(users, params, "users")
+
+    def get_users__info(self, params, user):
+        return {"user": self._public(self._user(params))}
+
+    def _check_username(self, username):
+        if any(u["username"] == username for u in self.users.values()):
+            raise FakeApiError(
+                400, "Username is already in use", "error-field-unavailable"
+            )
+
+    def post_users__register(self, params, user):
+        self._check_username(params.get("username"))
+        created = self.add_user(
+            params["username"],
+            password=params.get("pass", "password"),
+            name=params.get("name", params["username"]),
+            emails=[{"address": params.get("email"), "verified": False}],
+        )
+        if not self._registered:
+            self._registered = True
+            created["roles"] = ["admin", "user"]
+            for room in self.rooms.values():
+                if room.get("default"):
+                    room["owners"].append(created["_id"])
+        return {"user": self._public(created)}
+
+    def post_users__create(self, params, user):
+        self._check_username(params.get("username"))
+        created = self.add_user(
+            params["username"],
+            password=params.get("password", "password"),
+            name=params.get("name", params["username"]),
+            emails=[{"address": params.get("email"), "verified": False}],
+        )
+        return {"user": self._public(created)}
+
+    def post_users__delete(self, params, user):
+        deleted = self._user(params)
+        del self.users[deleted["_id"]]
+        for room in self.rooms.values():
+            self._remove_member(room, deleted)
+        return {}
+
+    def post_users__update(self, params, user):
+        updated = self._user(params)
+        data = dict(params.get("data", {}))
+        if "email" in data:
+            updated["emails"] = [{"address": data.pop("email"), "verified": False}]
+        updated.update(data)
+        updated["_updatedAt"] = self._now()
+        return {"user": self._public(updated)}
+
+    def post_users__setStatus(self, params, user):
+        if "status" in params:
+            user["status"] = params["status"]
+        user["statusText"] = params.get("message", "")
+        return {}
+
+    def get_users__getPresence(self, params, user):
+        target = self._user(params) if params else user
+        return {
+            "presence": target["status"],
+            "connectionStatus": target["status"],
+            "lastLogin": target.get("lastLogin"),
+        }
+
+    def post_users__setActiveStatus(self, params, user):
+        target = self._user(params)
+        target["active"] = _flag(params.get("activeStatus"))
+        return {"user": {"_id": target["_id"], "active": target["active"]}}
+
+    def get_users__getPreferences(self, params, user):
+        return {"preferences": user.get("settings", {}).get("preferences", {})}
+
+    def post_users__setPreferences(self, params, user):
+        target = self._user(params)
+        preferences = target.setdefault("settings", {}).setdefault("preferences", {})
+        preferences.update(params.get("data", {}))
+        return {"user": {"_id": target["_id"], "settings": target["settings"]}}
+
+    def post_users__createToken(self, params, user):
+        target = self._user(params)
+        token = secrets.token_hex(16)
+        self.tokens[token] = target
+        return {"data": {"userId": target["_id"], "authToken": token}}
+
+    def post_users__forgotPassword(self, params, user):
+        return {}
+
+    # Settings
+
+    def _settings(self, params, public):
+        settings = [
+            {"_id": _id, "value": setting["value"]}
+            for _id, setting in self.settings.items()
+            if setting["public"] or not public
+        ]
+        return self._page(settings, params, "settings")
+
+    def get_settings(self, params, user):
+        return self._settings(params, public=False)
+
+    def get_settings__public(self, params, user):
+        return self._settings(params, public=True)
+
+    def get_setting(self, params, user):
+        setting = self.settings.get(params["_id"])
+        if setting is None:
+            raise FakeApiError(400, "Setting not found", "error-setting-not-found")
+        return {"_id": params["_id"], "value": setting["value"]}
+
+    def post_setting(self, params, user):
+        setting = self.settings.setdefault(params["_id"], {"public": False})
+        setting["value"] = params.get("value")
+        return {}
+
+    # Rooms
+
+    def _remove_member(self, room, member):
+        if member["username"] in room["usernames"]:
+            room["usernames"].remove(member["username"])
+            room["usersCount"] = len(room["usernames"])
+        for role in ("owners", "moderators", "leaders"):
+            if member["_id"] in room[role]:
+                room[role].remove(member["_id"])
+
+    def _leave(self, room, user):
+        if room["owners"] == [user["_id"]]:
+            raise FakeApiError(
+                400,
+                "You are the last owner. Please set new owner before leaving "
+                "the room.",
+                "error-you-are-last-owner",
+            )
+        self._remove_member(room, user)
+        self._touch(room)
+
+    def get_rooms__info(self, params, user):
+        return {"room": self._room_info(self._room(params))}
+
+    def get_rooms__get(self, params, user):
+        since = params.get("updatedSince")
+        rooms = [
+            self._room_info(room)
+            for room in self.rooms.values()
+            if user["username"] in room["usernames"]
+            and (since is None or room["_updatedAt"] > since)
+        ]
+        return {"update": rooms, "remove": []}
+
+    def get_rooms__adminRooms(self, params, user):
+        name = params.get("filter", "")
+        types = params.get("types")
+        rooms = [
+            self._room_info(room)
+            for room in self.rooms.values()
+            if name in (room["fname"] or "") and (not types or room["t"] in types)
+        ]
+        return self._page(rooms, params, "rooms")
+
+    def post_rooms__leave(self, params, user):
+        self._leave(self._room(params), user)
+        return {}
+
+    def post_rooms__favorite(self, params, user):
+        self._room(params)["favorite"] = _flag(params.get("favorite"))
+        return {}
+
+    def post_rooms__createDiscussion(self, params, user):
+        parent = self._room(params | {"roomId": params.get("prid")})
+        name = params.get("t_name")
+        discussion = self.add_room(
+            self._new_id("discussion-"),
+            room_type=parent["t"],
+            members=[user["username"]] + list(params.get("users", [])),
+            owner=user,
+            fname=name,
+            prid=parent["_id"],
+        )
+        message = self._message(parent["_id"], name, user, t="discussion-created")
+        message["drid"] = discussion["_id"]
+        self.messages[parent["_id"]].append(message)
+        return {"discussion": self._room_info(discussion)}
+
+    def _create_room(self, params, user, room_type, key):
+        name = params.get("name")
+        if any(room["name"] == name for room in self.rooms.values()):
+            raise FakeApiError(
+                400,
+                "A channel with name '%s' exists" % name,
+                "error-duplicate-channel-name",
+            )
+        members = [user["username"]] + list(params.get("members", []))
+        room = self.add_room(
+            name,
+            room_type=room_type,
+            members=members,
+            owner=user,
+            ro=_flag(params.get("readOnly", False)),
+        )
+        return {key: self._room_info(room)}
+
+    def room_post_create(self, params, user, room_type, key):
+        return self._create_room(params, user, room_type, key)
+
+    def room_get_info(self, params, user, room_type, key):
+        return {key: self._room_info(self._room(params, room_type))}
+
+    def get_channels__list(self, params, user):
+        rooms = [
+            self._room_info(room) for room in self.rooms.values() if room["t"] == "c"
+        ]
+        return self._page(rooms, params, "channels")
+
+    def get_channels__list__joined(self, params, user):
+        rooms = [
+            self._room_info(room)
+            for room in self.rooms.values()
+            if room["t"] == "c" and user["username"] in room["usernames"]
+        ]
+        return self._page(rooms, params, "channels")
+
+    def get_groups__list(self, params, user):
+        rooms = [
+            self._room_info(room)
+            for room in self.rooms.values()
+            if room["t"] == "p" and user["username"] in room["usernames"]
+        ]
+        return self._page(rooms, params, "groups")
+
+    def get_groups__listAll(self, params, user):
+        rooms = [
+            self._room_info(room) for room in self.rooms.values() if room["t"] == "p"
+        ]
+        return self._page(rooms, params, "groups")
+
+    def room_post_delete(self, params, user, room_type, key):
+        room = self._room(params, room_type)
+        del self.rooms[room["_id"]]
+        del self.messages[room["_id"]]
+        return {}
+
+    def room_post_rename(self, params, user, room_type, key):
+        room = self._room(params, room_type)
+        room["name"] = room["fname"] = params.get("name")
+        return {key: self._room_info(self._touch(room))}
+
+    def _members(self, room, params):
+        members = [
+            {
+                key: member[key]
+                for key in ("_id", "username", "name", "status", "_updatedAt")
+            }
+            for member in self.users.values()
+            if member["username"] in room["usernames"]
+        ]
+        return self._page(members, params, "members")
+
+    def room_get_members(self, params, user, room_type, key):
+        return self._members(self._room(params, room_type), params)
+
+    def room_get_online(self, params, user, room_type, key):
+        room = self._room({"roomId": params.get("_id")} | params, room_type)
+        online = [
+            {"_id": member["_id"], "username": member["username"]}
+            for member in self.users.values()
+            if member["username"] in room["usernames"] and member["status"] != "offline"
+        ]
+        return {"online": online}
+
+    def room_post_invite(self, params, user, room_type, key):
+        room = self._room(params, room_type)
+        member = self._user(params)
+        if member["username"] not in room["usernames"]:
+            room["usernames"].append(member["username"])
+            room["usersCount"] = len(room["usernames"])
+        return {key: self._room_info(self._touch(room))}
+
+    def room_post_addAll(self, params, user, room_type, key):
+        room = self._room(params, room_type)
+        for member in self.users.values():
+            if member["username"] not in room["usernames"]:
+                room["usernames"].append(member["username"])
+        room["usersCount"] = len(room["usernames"])
+        return {key: self._room_info(self._touch(room))}
+
+    def room_post_kick(self, params, user, room_type, key):
+        room = self._room(params, room_type)
+        self._remove_member(room, self._user(params))
+        return {key: self._room_info(self._touch(room))}
+
+    def room_post_leave(self, params, user, room_type, key):
+        room = self._room(params, room_type)
+        self._leave(room, user)
+        return {key: self._room_info(room)}
+
+    def post_channels__join(self, params, user):
+        room = self._room(params, "c")
+        if room.get("joinCode") and params.get("joinCode") != room["joinCode"]:
+            raise FakeApiError(400, "Invalid Code", "error-code-invalid")
+        if user["username"] not in room["usernames"]:
+            room["usernames"].append(user["username"])
+            room["usersCount"] = len(room["usernames"])
+        return {"channel": self._room_info(self._touch(room))}
+
+    def post_channels__setJoinCode(self, params, user):
+        room = self._room(params, "c")
+        room["joinCode"] = params.get("joinCode")
+        room["joinCodeRequired"] = bool(room["joinCode"])
+        return {"channel": self._room_info(self._touch(room))}
+
+    def _add_role(self, params, room_type, key, role, name):
+        room = self._room(params, room_type)
+        member = self._user(params)
+        if member["username"] not in room["usernames"]:
+            raise FakeApiError(
+                400, "User is not in this room", "error-user-not-in-room"
+            )
+        if member["_id"] in room[role]:
+            raise FakeApiError(
+                400, "User is already %s" % name, "error-user-already-%s" % name
+            )
+        room[role].append(member["_id"])
+        return {}
+
+    def _remove_role(self, params, room_type, key, role, name):
+        room = self._room(params, room_type)
+        member = self._user(params)
+        if member["_id"] not in room[role]:
+            raise FakeApiError(400, "User is not %s" % name, "error-user-not-%s" % name)
+        if role == "owners" and len(room[role]) == 1:
+            raise FakeApiError(400, "This is the last owner", "error-remove-last-owner")
+        room[role].remove(member["_id"])
+        return {}
+
+    def room_post_addOwner(self, params, user, room_type, key):
+        return self._add_role(params, room_type, key, "owners", "owner")
+
+    def room_post_removeOwner(self, params, user, room_type, key):
+        return self._remove_role(params, room_type, key, "owners", "owner")
+
+    def room_post_addModerator(self, params, user, room_type, key):
+        return self._add_role(params, room_type, key, "moderators", "moderator")
+
+    def room_post_removeModerator(self, params, user, room_type, key):
+        return self._remove_role(params, room_type, key, "moderators", "moderator")
+
+    def room_post_addLeader(self, params, user, room_type, key):
+        return self._add_role(params, room_type, key, "leaders", "leader")
+
+    def room_post_removeLeader(self, params, user, room_type, key):
+        return self._remove_role(params, room_type, key, "leaders", "leader")
+
+    def room_get_moderators(self, params, user, room_type, key):
+        room = self._room(params, room_type)
+        moderators = [
+            {"_id": member["_id"], "username": member["username"]}
+            for member in self.users.values()
+            if member["_id"] in room["moderators"] or member["_id"] in room["owners"]
+        ]
+        return {"moderators": moderators}
+
+    def room_get_roles(self, params, user, room_type, key):
+        room = self._room(params, room_type)
+        roles = []
+        for member in self.users.values():
+            names = [
+                name
+                for role, name in (
+                    ("owners", "owner"),
+                    ("moderators", "moderator"),
+                    ("leaders", "leader"),
+                )
+                if member["_id"] in room[role]
+            ]
+            if names:
+                roles.append(
+                    {
+                        "rid": room["_id"],
+                        "u": {"_id": member["_id"], "username": member["username"]},
+                        "roles": names,
+                    }
+                )
+        return {"roles": roles}
+
+    def room_get_counters(self, params, user, room_type, key):
+        room = self._room(params, room_type)
+        return self._counters(room, user)
+
+    def _counters(self, room, user):
+        messages = self.messages[room["_id"]]
+        latest = messages[-1]["ts"] if messages else room["ts"]
+        return {
+            "joined": user["username"] in room["usernames"],
+            "members": room["usersCount"],
+            "unreads": 0,
+            "unreadsFrom": latest,
+            "msgs": len(messages),
+            "latest": latest,
+            "userMentions": 0,
+        }
+
+    def _set(self, params, room_type, field, param=None, value=None):
+        room = self._room(params, room_type)
+        room[field] = params.get(param or field) if value is None else value
+        self._touch(room)
+        return room
+
+    def room_post_archive(self, params, user, room_type, key):
+        self._set(params, room_type, "archived", value=True)
+        return {}
+
+    def room_post_unarchive(self, params, user, room_type, key):
+        self._set(params, room_type, "archived", value=False)
+        return {}
+
+    def room_post_close(self, params, user, room_type, key):
+        self._room(params, room_type)
+        return {}
+
+    def room_post_open(self, params, user, room_type, key):
+        self._room(params, room_type)
+        return {}
+
+    def room_post_setTopic(self, params, user, room_type, key):
+        return {"topic": self._set(params, room_type, "topic")["topic"]}
+
+    def room_post_setPurpose(self, params, user, room_type, key):
+        return {"purpose": self._set(params, room_type, "description", "purpose")}
+
+    def room_post_setDescription(self, params, user, room_type, key):
+        room = self._set(params, room_type, "description")
+        return {"description": room["description"]}
+
+    def room_post_setAnnouncement(self, params, user, room_type, key):
+        room = self._set(params, room_type, "announcement")
+        return {"announcement": room["announcement"]}
+
+    def room_post_setReadOnly(self, params, user, room_type, key):
+        room = self._set(params, room_type, "ro", value=_flag(params.get("readOnly")))
+        return {key: self._room_info(room)}
+
+    def room_post_setCustomFields(self, params, user, room_type, key):
+        room = self._set(params, room_type, "customFields")
+        return {key: self._room_info(room)}
+
+    def room_post_setType(self, params, user, room_type, key):
+        room = self._set(params, room_type, "t", "type")
+        return {key: self._room_info(room)}
+
+    def post_channels__setDefault(self, params, user):
+        room = self._set(params, "c", "default", value=_flag(params.get("default")))
+        return {"channel": self._room_info(room)}
+
+    def _history(self, room, params):
+        messages = self.messages[room["_id"]]
+        offset = int(params.get("offset", 0))
+        count = int(params.get("count", 50))
+        if count <= 0 or count > self.max_page_size:
+            count = self.max_page_size
+        # Newest first, without copying the whole history
+        last = len(messages) - 1
+        page = [
+            messages[last - index]
+            for index in range(offset, min(offset + count, len(messages)))
+        ]
+        return {
+            "messages": page,
+            "count": len(page),
+            "offset": offset,
+            "total": len(messages),
+        }
+
+    def room_get_history(self, params, user, room_type, key):
+        return self._history(self._room(params, room_type), params)
+
+    def room_get_files(self, params, user, room_type, key):
+        self._room(params, room_type)
+        return self._page([], params, "files")
+
+    # Direct messages
+
+    def _direct(self, params, user):
+        if params.get("username") and not params.get("roomId"):
+            other = self._user({"username": params["username"]})
+            room_id = "".join(sorted({user["_id"], other["_id"]}))
+            params = {"roomId": room_id}
+        return self._room(params, "d")
+
+    def post_dm__create(self, params, user):
+        usernames = params.get("usernames") or params.get("username")
+        others = [self._user({"username": name}) for name in usernames.split(",")]
+        members = {user["_id"]: user, **{other["_id"]: other for other in others}}
+        room_id = "".join(sorted(members))
+        room = self.rooms.get(room_id) or self.add_room(
+            None,
+            room_type="d",
+            room_id=room_id,
+            members=[member["username"] for member in members.values()],
+            owner=user,
+        )
+        return {"room": {"rid": room_id, **self._room_info(room)}}
+
+    def _direct_rooms(self, user=None):
+        return [
+            self._room_info(room)
+            for room in self.rooms.values()
+            if room["t"] == "d"
+            and (user is None or user["username"] in room["usernames"])
+        ]
+
+    def get_dm__list(self, params, user):
+        return self._page(self._direct_rooms(user), params, "ims")
+
+    def get_dm__list__everyone(self, params, user):
+        return self._page(self._direct_rooms(), params, "ims")
+
+    def get_dm__history(self, params, user):
+        return self._history(self._direct(params, user), params)
+
+    def get_dm__messages(self, params, user):
+        return self._history(self._direct(params, user), params)
+
+    def get_dm__messages__others(self, params, user):
+        raise FakeApiError(403, "Not allowed", "error-not-allowed")
+
+    def get_dm__members(self, params, user):
+        return self._members(self._direct(params, user), params)
+
+    def get_dm__files(self, params, user):
+        self._direct(params, user)
+        return self._page([], params, "files")
+
+    def get_dm__counters(self, params, user):
+        return self._counters(self._direct(params, user), user)
+
+    def post_dm__open(self, params, user):
+        self._direct(params, user)
+        return {}
+
+    def post_dm__close(self, params, user):
+        self._direct(params, user)
+        return {}
+
+    def post_dm__setTopic(self, params, user):
+        room = self._direct(params, user)
+        room["topic"] = params.get("topic")
+        return {"topic": room["topic"]}
+
+    def post_dm__delete(self, params, user):
+        room = self._direct(params, user)
+        del self.rooms[room["_id"]]
+        del self.messages[room["_id"]]
+        return {}
+
+    # Subscriptions
+
+    def _subscription(self, room, user):
+        return {
+            "_id": "S" + room["_id"],
+            "rid": room["_id"],
+            "name": room["name"],
+            "fname": room["fname"],
+            "t": room["t"],
+            "u": {"_id": user["_id"], "username": user["username"]},
+            "unread": 0,
+            "alert": False,
+            "open": True,
+            "_updatedAt": room["_updatedAt"],
+        }
+
+    def get_subscriptions__get(self, params, user):
+        subscriptions = [
+            self._subscription(room, user)
+            for room in self.rooms.values()
+            if user["username"] in room["usernames"]
+        ]
+        return {"update": subscriptions, "remove": []}
+
+    def get_subscriptions__getOne(self, params, user):
+        return {"subscription": self._subscription(self._room(params), user)}
+
+    def post_subscriptions__read(self, params, user):
+        room = self._room(params)
+        read = {receipt["messageId"] for receipt in self.receipts}
+        for message in self.messages[room["_id"]]:
+            if message["u"]["_id"] != user["_id"] and message["_id"] not in read:
+                self.receipts.append(
+                    {
+                        "_id": self._new_id("E"),
+                        "roomId": room["_id"],
+                        "userId": user["_id"],
+                        "messageId": message["_id"],
+                        "ts": self._now(),
+                    }
+                )
+        return {}
+
+    def post_subscriptions__unread(self, params, user):
+        self._room(params)
+        return {}
+
+    # Chat
+
+    def _post(self, room, user, text, **fields):
+        mentions = [
+            {"_id": mentioned["_id"], "username": mentioned["username"]}
+            for name in MENTION.findall(text)
+            for mentioned in self.users.values()
+            if mentioned["username"] == name
+        ]
+        message = self._message(
+            room["_id"],
+            text,
+            user,
+            mentions=mentions,
+            **{key: value for key, value in fields.items() if value is not None},
+        )
+        if "_id" in fields:
+            message["_id"] = fields["_id"]
+        self.messages[room["_id"]].append(message)
+        room["msgs"] = len(self.messages[room["_id"]])
+        room["lm"] = message["ts"]
+        if message.get("tmid"):
+            parent = self._find_message(message["tmid"])
+            parent["tcount"] = parent.get("tcount", 0) + 1
+            parent["tlm"] = message["ts"]
+            parent.setdefault("replies", [])
+            if user["_id"] not in parent["replies"]:
+                parent["replies"].append(user["_id"])
+        return message
+
+    def post_chat__postMessage(self, params, user):
+        room = self._room(params)
+        message = self._post(
+            room,
+            user,
+            params.get("text", ""),
+            tmid=params.get("tmid"),
+            alias=params.get("alias"),
+            emoji=params.get("emoji"),
+            avatar=params.get("avatar"),
+            attachments=params.get("attachments"),
+        )
+        return {
+            "ts": int(time.time() * 1000),
+            "channel": params.get("channel") or room["_id"],
+            "message": message,
+        }
+
+    def post_chat__sendMessage(self, params, user):
+        fields = dict(params.get("message", {}))
+        room = self._room({"roomId": fields.pop("rid", None)})
+        message = self._post(room, user, fields.pop("msg", ""), **fields)
+        return {"message": message}
+
+    def _find_message(self, message_id):
+        for messages in self.messages.values():
+            for message in messages:
+                if message["_id"] == message_id:
+                    return message
+        raise FakeApiError(400, "Message not found", "error-invalid-message")
+
+    def get_chat__getMessage(self, params, user):
+        return {"message": self._find_message(params.get("msgId"))}
+
+    def post_chat__update(self, params, user):
+        message = self._find_message(params.get("msgId"))
+        message["msg"] = params.get("text", "")
+        message["editedAt"] = message["_updatedAt"] = self._now()
+        message["editedBy"] = {"_id": user["_id"], "username": user["username"]}
+        return {"message": message}
+
+    def post_chat__delete(self, params, user):
+        message = self._find_message(params.get("msgId"))
+        self.messages[message["rid"]].remove(message)
+        self.deleted[message["rid"]].append(
+            {"_id": message["_id"], "_deletedAt": self._now()}
+        )
+        return {"_id": message["_id"], "ts": int(time.time() * 1000)}
+
+    def post_chat__pinMessage(self, params, user):
+        message = self._find_message(params.get("messageId"))
+        message["pinned"] = True
+        message["pinnedBy"] = {"_id": user["_id"], "username": user["username"]}
+        pinned = self._post(
+            self.rooms[message["rid"]],
+            user,
+            "",
+            t="message_pinned",
+            attachments=[{"text": message["msg"], "message_link": message["_id"]}],
+        )
+        return {"message": pinned}
+
+    def post_chat__unPinMessage(self, params, user):
+        self._find_message(params.get("messageId"))["pinned"] = False
+        return {}
+
+    def post_chat__starMessage(self, params, user):
+        message = self._find_message(params.get("messageId"))
+        starred = message.setdefault("starred", [])
+        if {"_id": user["_id"]} not in starred:
+            starred.append({"_id": user["_id"]})
+        return {}
+
+    def post_chat__unStarMessage(self, params, user):
+        message = self._find_message(params.get("messageId"))
+        message["starred"] = [
+            star for star in message.get("starred", []) if star["_id"] != user["_id"]
+        ]
+        return {}
+
+    def post_chat__react(self, params, user):
+        message = self._find_message(params.get("messageId"))
+        emoji = ":%s:" % params.get("emoji", "").strip(":")
+        reactions = message.setdefault("reactions", {})
+        usernames = reactions.setdefault(emoji, {"usernames": []})["usernames"]
+        if user["username"] in usernames:
+            usernames.remove(user["username"])
+            if not usernames:
+                del reactions[emoji]
+        else:
+            usernames.append(user["username"])
+        return {}
+
+    def post_chat__reportMessage(self, params, user):
+        self._find_message(params.get("messageId"))
+        self.reports.append(params)
+        return {}
+
+    def post_chat__followMessage(self, params, user):
+        message = self._find_message(params.get("mid"))
+        replies = message.setdefault("replies", [])
+        if user["_id"] not in replies:
+            replies.append(user["_id"])
+        return {}
+
+    def post_chat__unfollowMessage(self, params, user):
+        message = self._find_message(params.get("mid"))
+        if user["_id"] in message.get("replies", []):
+            message["replies"].remove(user["_id"])
+        return {}
+
+    def post_chat__ignoreUser(self, params, user):
+        self._room(params)
+        return {}
+
+    def _room_messages(self, params, predicate):
+        room = self._room(params)
+        messages = [
+            message
+            for message in reversed(self.messages[room["_id"]])
+            if predicate(message)
+        ]
+        return self._page(messages, params, "messages")
+
+    def get_chat__search(self, params, user):
+        text = params.get("searchText", "")
+        return self._room_messages(params, lambda message: text in message["msg"])
+
+    def get_chat__getStarredMessages(self, params, user):
+        star = {"_id": user["_id"]}
+        return self._room_messages(
+            params, lambda message: star in message.get("starred", [])
+        )
+
+    def get_chat__getPinnedMessages(self, params, user):
+        return self._room_messages(params, lambda message: message.get("pinned"))
+
+    def get_chat__getMentionedMessages(self, params, user):
+        return self._room_messages(
+            params,
+            lambda message: any(
+                mention["_id"] == user["_id"] for mention in message["mentions"]
+            ),
+        )
+
+    def get_chat__getDiscussions(self, params, user):
+        return self._room_messages(params, lambda message: "drid" in message)
+
+    def get_chat__getDeletedMessages(self, params, user):
+        room = self._room(params)
+        since = params.get("since", "")
+        deleted = [
+            message
+            for message in self.deleted[room["_id"]]
+            if message["_deletedAt"] > since
+        ]
+        return self._page(deleted, params, "messages")
+
+    def get_chat__getMessageReadReceipts(self, params, user):
+        receipts = [
+            receipt
+            for receipt in self.receipts
+            if receipt["messageId"] == params.get("messageId")
+        ]
+        return self._page(receipts, params, "receipts")
+
+    def _thread_messages(self, tmid):
+        parent = self._find_message(tmid)
+        return [
+            message
+            for message in self.messages[parent["rid"]]
+            if message.get("tmid") == tmid
+        ]
+
+    def get_chat__getThreadMessages(self, params, user):
+        return self._page(self._thread_messages(params.get("tmid")), params, "messages")
+
+    def get_chat__getThreadsList(self, params, user):
+        room = self._room(params)
+        threads = [
+            message for message in self.messages[room["_id"]] if "tcount" in message
+        ]
+        return self._page(threads, params, "threads")
+
+    def get_chat__syncThreadsList(self, params, user):
+        room = self._room(params)
+        since = params.get("updatedSince", "")
+        threads = [
+            message
+            for message in self.messages[room["_id"]]
+            if "tcount" in message and message["_updatedAt"] > since
+        ]
+        return {"threads": {"update": threads, "remove": []}}
+
+    def get_chat__syncThreadMessages(self, params, user):
+        since = params.get("updatedSince", "")
+        messages = [
+            message
+            for message in self._thread_messages(params.get("tmid"))
+            if message["_updatedAt"] > since
+        ]
+        return {"messages": {"update": messages, "remove": []}}
+
+    def get_chat__syncMessages(self, params, user):
+        room = self._room(params)
+        since = params.get("lastUpdate", "")
+        return {
+            "result": {
+                "updated": [
+                    message
+                    for message in self.messages[room["_id"]]
+                    if message["_updatedAt"] > since
+                ],
+                "deleted": [
+                    message
+                    for message in self.deleted[room["_id"]]
+                    if message["_deletedAt"] > since
+                ],
+            }
+        }
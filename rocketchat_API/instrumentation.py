@@ -0,0 +1,233 @@
+import bisect
+import threading
+
+# Upper bounds (seconds) of the buckets of the request duration histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Methods with ids in their path, reported as "<prefix>:id" so that the
+# number of endpoints stays bounded
+ID_PATH_PREFIXES = ("settings/", "rooms.media/", "rooms.mediaConfirm/")
+
+
+def endpoint_label(method):
+    for prefix in ID_PATH_PREFIXES:
+        if method.startswith(prefix):
+            return prefix + ":id"
+    return method
+
+
+def body_size(kwargs):
+    """Size of the body of a request sent with ``kwargs``, 0 when it is not
+    known in advance (form data, files)."""
+    data = kwargs.get("data")
+    if isinstance(data, bytes):
+        return len(data)
+    if isinstance(data, str):
+        return len(data.encode("utf-8"))
+    return 0
+
+
+class RequestEvent:
+    """One request to the API, given to the observers before it is sent and
+    after its response (or error) is received.
+
+    ``elapsed`` is the wall time in seconds, including the retries, which
+    ``retries`` counts (the ones of the retry policy and the ones after 429
+    answers). ``bytes_received`` is the size of the response body, or its
+    Content-Length for streamed responses. ``status_code`` is None and
+    ``exception`` is set when no response was received.
+    """
+
+    __slots__ = (
+        "method",
+        "http_method",
+        "elapsed",
+        "bytes_sent",
+        "bytes_received",
+        "status_code",
+        "retries",
+        "exception",
+    )
+
+    def __init__(self, method, http_method, bytes_sent=0):
+        self.method = method
+        self.http_method = http_method
+        self.elapsed = None
+        self.bytes_sent = bytes_sent
+        self.bytes_received = 0
+        self.status_code = None
+        self.retries = 0
+        self.exception = None
+
+    def __repr__(self):
+        return "RequestEvent(%s %s, status_code=%r, elapsed=%r, retries=%d)" % (
+            self.http_method.upper(),
+            self.method,
+            self.status_code,
+            self.elapsed,
+            self.retries,
+        )
+
+
+class RequestObserver:
+    """Base class of the observers given to the client with ``observers=``.
+
+    Both hooks run on the thread sending the request, before it is sent and
+    once it is done. They should be fast and must not raise.
+    """
+
+    def before_request(self, event):
+        pass
+
+    def after_request(self, event):
+        pass
+
+
+class _EndpointStats:
+    __slots__ = (
+        "buckets",
+        "seconds",
+        "count",
+        "statuses",
+        "bytes_sent",
+        "bytes_received",
+        "retries",
+    )
+
+    def __init__(self, bucket_count):
+        # The last bucket is +Inf
+        self.buckets = [0] * (bucket_count + 1)
+        self.seconds = 0.0
+        self.count = 0
+        self.statuses = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+
+
+class EndpointMetrics(RequestObserver):
+    """Aggregates the requests per endpoint (API method and HTTP method):
+    a histogram of their duration, their number per status code (``error``
+    when no response was received), the bytes sent and received and the
+    retries.
+
+    Example:
+        metrics = EndpointMetrics()
+        rocket = RocketChat(user, password, observers=[metrics])
+        ...
+        for (method, http_method), stats in metrics.snapshot().items():
+            print(method, stats["count"], stats["seconds"])
+        text = metrics.to_prometheus()
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def after_request(self, event):
+        key = (endpoint_label(event.method), event.http_method)
+        status = "error" if event.status_code is None else str(event.status_code)
+        elapsed = event.elapsed or 0.0
+        bucket = bisect.bisect_left(self.buckets, elapsed)
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = _EndpointStats(len(self.buckets))
+            stats.buckets[bucket] += 1
+            stats.seconds += elapsed
+            stats.count += 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.bytes_sent += event.bytes_sent
+            stats.bytes_received += event.bytes_received
+            stats.retries += event.retries
+
+    def snapshot(self):
+        """The statistics of every endpoint, keyed on (method, http_method).
+
+        ``buckets`` holds (upper bound, cumulative count) pairs, the last
+        upper bound being infinity.
+        """
+        bounds = self.buckets + (float("inf"),)
+        with self._lock:
+            snapshot = {}
+            for key, stats in self._endpoints.items():
+                cumulative = 0
+                buckets = []
+                for bound, count in zip(bounds, stats.buckets):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+                snapshot[key] = {
+                    "count": stats.count,
+                    "seconds": stats.seconds,
+                    "statuses": dict(stats.statuses),
+                    "bytes_sent": stats.bytes_sent,
+                    "bytes_received": stats.bytes_received,
+                    "retries": stats.retries,
+                    "buckets": buckets,
+                }
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def to_prometheus(self, prefix="rocketchat_api"):
+        """The metrics in the Prometheus text exposition format."""
+        snapshot = sorted(self.snapshot().items())
+        lines = [
+            "# HELP %s_request_duration_seconds Duration of the requests, "
+            "retries included." % prefix,
+            "# TYPE %s_request_duration_seconds histogram" % prefix,
+        ]
+        for key, stats in snapshot:
+            labels = _labels(key)
+            for bound, count in stats["buckets"]:
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(
+                    '%s_request_duration_seconds_bucket{%s,le="%s"} %d'
+                    % (prefix, labels, le, count)
+                )
+            lines.append(
+                "%s_request_duration_seconds_sum{%s} %s"
+                % (prefix, labels, _number(stats["seconds"]))
+            )
+            lines.append(
+                "%s_request_duration_seconds_count{%s} %d"
+                % (prefix, labels, stats["count"])
+            )
+
+        lines.append("# HELP %s_requests_total Requests by status code." % prefix)
+        lines.append("# TYPE %s_requests_total counter" % prefix)
+        for key, stats in snapshot:
+            for status, count in sorted(stats["statuses"].items()):
+                lines.append(
+                    '%s_requests_total{%s,status="%s"} %d'
+                    % (prefix, _labels(key), status, count)
+                )
+
+        for name, field, help_text in (
+            ("request_bytes_total", "bytes_sent", "Bytes of request bodies."),
+            ("response_bytes_total", "bytes_received", "Bytes of response bodies."),
+            ("retries_total", "retries", "Requests sent again."),
+        ):
+            lines.append("# HELP %s_%s %s" % (prefix, name, help_text))
+            lines.append("# TYPE %s_%s counter" % (prefix, name))
+            for key, stats in snapshot:
+                lines.append(
+                    "%s_%s{%s} %d" % (prefix, name, _labels(key), stats[field])
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key):
+    method, http_method = key
+    return 'endpoint="%s",http_method="%s"' % (_escape(method), http_method)
+
+
+def _number(value):
+    return repr(float(value))
@@ -0,0 +1,78 @@
+ROOM_SECTIONS = {"channel": "channels", "group": "groups"}
+
+
+def _current_members(rocket, room_type, room_id, page_size):
+    if room_type == "team":
+        members = rocket.teams_members(team_id=room_id, count=page_size)
+        return {member["user"]["_id"] for member in members}
+    list_members = getattr(rocket, ROOM_SECTIONS[room_type] + "_members")
+    return {member["_id"] for member in list_members(room_id=room_id, count=page_size)}
+
+
+def _membership_calls(room_type, room_id, to_add, to_remove, chunk_size):
+    """Yields ``(outcome, user_ids, call)`` for the calls to make."""
+    if room_type == "team":
+        # teams.addMembers takes a list, add the users in chunks
+        for start in range(0, len(to_add), chunk_size):
+            chunk = to_add[start : start + chunk_size]
+            members = [{"userId": user_id, "roles": ["member"]} for user_id in chunk]
+            call = ("teams_add_members", (), {"team_id": room_id, "members": members})
+            yield "added", chunk, call
+        for user_id in to_remove:
+            call = ("teams_remove_member", (), {"team_id": room_id, "user_id": user_id})
+            yield "removed", [user_id], call
+        return
+
+    section = ROOM_SECTIONS[room_type]
+    for user_id in to_add:
+        yield "added", [user_id], (section + "_invite", (room_id, user_id))
+    for user_id in to_remove:
+        yield "removed", [user_id], (section + "_kick", (room_id, user_id))
+
+
+def sync_room_members(
+    rocket,
+    room_id,
+    desired_user_ids,
+    room_type="channel",
+    remove=True,
+    max_workers=8,
+    page_size=500,
+):
+    """Makes the members of a room match ``desired_user_ids``.
+
+    The current members are listed once, then only the missing users are
+    added and, when ``remove`` is True, the extra ones removed. The calls
+    run concurrently on ``max_workers`` threads. ``room_type`` is
+    "channel", "group" or "team" (``room_id`` being then the team id); new
+    team members are added ``page_size`` at a time with teams.addMembers.
+
+    Returns a dict with the ``added`` and ``removed`` user ids, the number of
+    ``unchanged`` members and the ``errors`` (the exception per user id) of
+    the calls that failed.
+    """
+    if room_type != "team" and room_type not in ROOM_SECTIONS:
+        raise ValueError("room_type must be channel, group or team")
+
+    current = _current_members(rocket, room_type, room_id, page_size)
+    desired = set(desired_user_ids)
+    to_add = sorted(desired - current)
+    to_remove = sorted(current - desired) if remove else []
+
+    summary = {
+        "added": [],
+        "removed": [],
+        "unchanged": len(current & desired),
+        "errors": {},
+    }
+    planned = list(_membership_calls(room_type, room_id, to_add, to_remove, page_size))
+    results = rocket.map_calls(
+        (call for _, _, call in planned), max_workers=max_workers
+    )
+    for (outcome, user_ids, _), result in zip(planned, results):
+        if result.ok:
+            summary[outcome].extend(user_ids)
+        else:
+            for user_id in user_ids:
+                summary["errors"][user_id] = result.exception
+    return summary
@@ -0,0 +1,126 @@
+import json
+
+
+def _lookup(data, path):
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+class Model:
+    """Base of the lightweight result models.
+
+    A model keeps only the attributes listed in ``_keys`` (attribute name
+    -> key of the API document, dotted for nested keys) in ``__slots__``, so
+    it takes a fraction of the memory of the dict it is built from. Missing
+    keys are set to None.
+
+    Paginated methods take a ``model`` argument that converts each item and
+    asks the server only for the keys the model uses (``fields=``):
+
+        for message in rocket.channels_history("GENERAL", model=Message):
+            print(message.username, message.text)
+    """
+
+    __slots__ = ()
+    _keys = {}
+    _paths = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._paths = tuple(
+            (name, tuple(key.split("."))) for name, key in cls._keys.items()
+        )
+
+    def __init__(self, **attributes):
+        for name in self._keys:
+            setattr(self, name, attributes.get(name))
+
+    @classmethod
+    def from_dict(cls, data):
+        instance = cls.__new__(cls)
+        for name, path in cls._paths:
+            setattr(instance, name, _lookup(data, path))
+        return instance
+
+    @classmethod
+    def projection(cls):
+        """The ``fields`` parameter requesting only the keys of the model."""
+        keys = dict.fromkeys(path[0] for _, path in cls._paths)
+        return json.dumps({key: 1 for key in keys})
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self._keys}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        attributes = ", ".join(
+            "%s=%r" % (name, getattr(self, name)) for name in self._keys
+        )
+        return "%s(%s)" % (type(self).__name__, attributes)
+
+
+class Message(Model):
+    _keys = {
+        "id": "_id",
+        "room_id": "rid",
+        "text": "msg",
+        "ts": "ts",
+        "user_id": "u._id",
+        "username": "u.username",
+        "thread_id": "tmid",
+        "updated_at": "_updatedAt",
+    }
+    __slots__ = tuple(_keys)
+
+
+class User(Model):
+    _keys = {
+        "id": "_id",
+        "username": "username",
+        "name": "name",
+        "status": "status",
+        "active": "active",
+        "type": "type",
+        "roles": "roles",
+        "updated_at": "_updatedAt",
+    }
+    __slots__ = tuple(_keys)
+
+
+class Room(Model):
+    _keys = {
+        "id": "_id",
+        "name": "name",
+        "fname": "fname",
+        "type": "t",
+        "topic": "topic",
+        "users_count": "usersCount",
+        "messages_count": "msgs",
+        "read_only": "ro",
+        "updated_at": "_updatedAt",
+    }
+    __slots__ = tuple(_keys)
+
+
+class Subscription(Model):
+    _keys = {
+        "id": "_id",
+        "room_id": "rid",
+        "name": "name",
+        "fname": "fname",
+        "type": "t",
+        "unread": "unread",
+        "alert": "alert",
+        "open": "open",
+        "user_mentions": "userMentions",
+        "last_seen": "ls",
+        "updated_at": "_updatedAt",
+    }
+    __slots__ = tuple(_keys)
@@ -0,0 +1,166 @@
+import threading
+from contextlib import contextmanager
+
+from rocketchat_API.APISections.base import RocketChatBase
+from rocketchat_API.batch import map_calls
+from rocketchat_API.rate_limit import RateLimiter
+from rocketchat_API.rocketchat import RocketChat
+
+ROUND_ROBIN = "round_robin"
+LEAST_LOADED = "least_loaded"
+
+
+class RocketChatPool:
+    """Spreads the calls over several accounts, e.g. bot identities.
+
+    Rocket.Chat limits the rate of the requests of each user. The pool
+    holds one client per account, each with its own RateLimiter, so the
+    throughput grows with the number of accounts. ``accounts`` are clients,
+    ``(user, password)`` pairs or dicts of arguments of the client (e.g.
+    ``{"auth_token": ..., "user_id": ...}``). ``client_kwargs`` are given
+    to every client created by the pool, thread safe by default.
+
+    Every method of the client can be called on the pool. Each call is sent
+    by the next client in turn (``strategy="round_robin"``) or by the one
+    with the fewest calls in progress (``strategy="least_loaded"``). The
+    generators of paginated methods stay on the client that started them
+    and count as in progress until exhausted, closed or garbage collected.
+
+    Example:
+        pool = RocketChatPool(
+            [("bot1", "pass1"), ("bot2", "pass2")],
+            server_url="https://chat.example.com",
+        )
+        for user_id in user_ids:
+            pool.chat_post_message("hello", channel="@" + user_id)
+    """
+
+    def __init__(self, accounts, strategy=ROUND_ROBIN, **client_kwargs):
+        if strategy not in (ROUND_ROBIN, LEAST_LOADED):
+            raise ValueError("Unknown strategy: %r" % (strategy,))
+        if isinstance(client_kwargs.get("rate_limiter"), RateLimiter):
+            raise ValueError("Each client of the pool needs its own rate limiter")
+        client_kwargs.setdefault("thread_safe", True)
+        self.strategy = strategy
+        self.clients = [self._client(account, client_kwargs) for account in accounts]
+        if not self.clients:
+            raise ValueError("A pool needs at least one account")
+        self._in_flight = [0] * len(self.clients)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _client(account, client_kwargs):
+        if isinstance(account, RocketChatBase):
+            return account
+        if isinstance(account, dict):
+            return RocketChat(**{**client_kwargs, **account})
+        user, password = account
+        return RocketChat(user, password, **client_kwargs)
+
+    def _acquire(self):
+        with self._lock:
+            size = len(self.clients)
+            index = self._next
+            if self.strategy == LEAST_LOADED:
+                # Ties go to the next client in turn
+                index = min(
+                    ((self._next + offset) % size for offset in range(size)),
+                    key=self._in_flight.__getitem__,
+                )
+            self._next = (index + 1) % size
+            self._in_flight[index] += 1
+            return index
+
+    def _release(self, index):
+        with self._lock:
+            self._in_flight[index] -= 1
+
+    def in_flight(self):
+        """Number of calls in progress, per client."""
+        with self._lock:
+            return list(self._in_flight)
+
+    @contextmanager
+    def lease(self):
+        """Picks a client for several calls, which then share an identity.
+
+        Example:
+            with pool.lease() as rocket:
+                room_id = rocket.channels_create("room")["channel"]["_id"]
+                rocket.channels_invite(room_id, user_id)
+        """
+        index = self._acquire()
+        try:
+            yield self.clients[index]
+        finally:
+            self._release(index)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or not callable(getattr(RocketChat, name, None)):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            index = self._acquire()
+            try:
+                value = getattr(self.clients[index], name)(*args, **kwargs)
+            except BaseException:
+                self._release(index)
+                raise
+            if hasattr(value, "__next__"):
+                return _LeasedIterator(value, lambda: self._release(index))
+            self._release(index)
+            return value
+
+        call.__name__ = name
+        return call
+
+    def map_calls(self, calls, max_workers=8):
+        """Runs many calls concurrently over the clients of the pool, see
+        rocketchat_API.batch.map_calls."""
+        return map_calls(self, calls, max_workers)
+
+    def batch(self, calls, max_workers=8):
+        """Like map_calls, but returns the list of results."""
+        return list(map_calls(self, calls, max_workers))
+
+    def close(self):
+        """Release the HTTP connections of every client."""
+        for client in self.clients:
+            client.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _LeasedIterator:
+    """Items of a paginated method, counted as a call in progress of its
+    client until exhausted, closed or garbage collected."""
+
+    def __init__(self, iterator, release):
+        self._iterator = iterator
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        close = getattr(self._iterator, "close", None)
+        if close is not None:
+            close()
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,125 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+def _header_number(headers, name):
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Bucket:
+    __slots__ = ("limit", "remaining", "reset", "window")
+
+    def __init__(self, limit, remaining, reset, window):
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        # Length of a window, the longest time to reset seen so far
+        self.window = window
+
+
+class RateLimiter:
+    """Client side token bucket fed by the X-RateLimit-* response headers.
+
+    Rocket.Chat reports, per endpoint, how many calls are allowed in the
+    current window (X-RateLimit-Limit), how many are left
+    (X-RateLimit-Remaining) and when the window ends (X-RateLimit-Reset).
+    Every request reserves one token of its endpoint before being sent, and
+    waits for the window to reset when none are left, so concurrent callers
+    don't overshoot the budget. Responses with status 429 are retried after
+    the reset time, at most ``max_retries`` times.
+
+    Endpoints for which the server sends no headers, or a limit of 0, are
+    never delayed.
+    """
+
+    def __init__(self, max_retries=3, default_retry_after=1.0):
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clock():
+        return time.monotonic()
+
+    @staticmethod
+    def sleep(seconds):
+        time.sleep(seconds)
+
+    def acquire(self, endpoint):
+        """Blocks until the budget of ``endpoint`` allows one more request."""
+        while True:
+            with self._lock:
+                bucket = self._buckets.get(endpoint)
+                if bucket is None or bucket.limit <= 0:
+                    return
+                now = self.clock()
+                if now >= bucket.reset:
+                    # New window, the server will tell us the exact state
+                    # soon. Until then the budget is the one of a full window.
+                    bucket.remaining = bucket.limit
+                    bucket.reset = now + (bucket.window or self.default_retry_after)
+                if bucket.remaining > 0:
+                    bucket.remaining -= 1
+                    return
+                wait = max(bucket.reset - now, 0)
+            self.sleep(wait)
+
+    def _reset_in(self, headers):
+        """Seconds until the window reported by ``headers`` ends."""
+        reset = _header_number(headers, "X-RateLimit-Reset")
+        if reset is None:
+            return None
+        if reset < 1e9:
+            # Already relative, in seconds
+            return max(reset, 0)
+        if reset > 1e11:
+            # Epoch in milliseconds, as sent by Rocket.Chat
+            reset /= 1000
+        now = time.time()
+        try:
+            # Compare against the server clock when we know it
+            now = parsedate_to_datetime(headers.get("Date")).timestamp()
+        except (TypeError, ValueError):
+            pass
+        return max(reset - now, 0)
+
+    def update(self, endpoint, response):
+        """Records the budget reported by the headers of ``response``."""
+        headers = getattr(response, "headers", None) or {}
+        limit = _header_number(headers, "X-RateLimit-Limit")
+        remaining = _header_number(headers, "X-RateLimit-Remaining")
+        reset_in = self._reset_in(headers)
+        if limit is None or remaining is None or reset_in is None:
+            return
+        with self._lock:
+            reset = self.clock() + reset_in
+            bucket = self._buckets.get(endpoint)
+            if bucket is None or abs(bucket.reset - reset) > 1:
+                window = reset_in if bucket is None else max(bucket.window, reset_in)
+                self._buckets[endpoint] = _Bucket(
+                    int(limit), int(remaining), reset, window
+                )
+            else:
+                # Same window: requests still in flight have already been
+                # taken out of our local count
+                bucket.remaining = min(bucket.remaining, int(remaining))
+
+    def retry_after(self, endpoint, response):
+        """Seconds to wait before retrying a request rejected with 429."""
+        headers = getattr(response, "headers", None) or {}
+        retry_after = _header_number(headers, "Retry-After")
+        if retry_after is not None:
+            return retry_after
+        reset_in = self._reset_in(headers)
+        if reset_in is not None:
+            with self._lock:
+                bucket = self._buckets.get(endpoint)
+                if bucket is not None:
+                    bucket.remaining = 0
+            return reset_in
+        return self.default_retry_after
@@ -0,0 +1,265 @@
+import asyncio
+import itertools
+import json
+
+from rocketchat_API.APIExceptions.RocketExceptions import (
+    RocketAuthenticationException,
+    RocketConnectionException,
+)
+
+
+class RealtimeEvent:
+    """An event delivered by a stream subscription.
+
+    Attributes:
+        stream: Name of the stream (e.g. "stream-room-messages")
+        event_name: Event within the stream (e.g. the room id)
+        args: Payload of the event, for room messages ``[message]``
+    """
+
+    __slots__ = ("stream", "event_name", "args")
+
+    def __init__(self, stream, event_name, args):
+        self.stream = stream
+        self.event_name = event_name
+        self.args = args
+
+    def __repr__(self):
+        return f"RealtimeEvent({self.stream!r}, {self.event_name!r}, {self.args!r})"
+
+
+class Subscription:
+    """A subscription to a stream, iterable with ``async for``.
+
+    Events are queued until they are consumed, and also passed to
+    ``callback`` (a function or a coroutine function) when one was given.
+    The iteration ends when the subscription is stopped or the connection
+    is closed.
+    """
+
+    _closed = object()
+
+    def __init__(self, client, sub_id, stream, event_name, callback=None):
+        self.client = client
+        self.id = sub_id
+        self.stream = stream
+        self.event_name = event_name
+        self.callback = callback
+        self.ready = asyncio.get_running_loop().create_future()
+        self._queue = asyncio.Queue()
+
+    async def _deliver(self, event):
+        self._queue.put_nowait(event)
+        if self.callback is not None:
+            result = self.callback(event)
+            if asyncio.iscoroutine(result):
+                await result
+
+    def _close(self):
+        self._queue.put_nowait(self._closed)
+
+    async def stop(self):
+        await self.client.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self._queue.get()
+        if event is self._closed:
+            raise StopAsyncIteration
+        return event
+
+
+class RocketChatRealtime:
+    """Client for the realtime (DDP over WebSocket) API of Rocket.Chat.
+
+    It authenticates with the same token as the REST client and delivers
+    stream events (new messages, notifications, ...) as soon as the server
+    pushes them, through callbacks or async iterators. Requires the
+    ``websockets`` package (``pip install rocketchat_API[realtime]``).
+
+    Example:
+        async with RocketChatRealtime.from_rest(rocket) as realtime:
+            messages = await realtime.subscribe_room_messages("GENERAL")
+            async for event in messages:
+                print(event.args[0]["msg"])
+    """
+
+    def __init__(
+        self, server_url="http://127.0.0.1:3000", auth_token=None, user_id=None
+    ):
+        self.url = (
+            server_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+            + "/websocket"
+        )
+        self.auth_token = auth_token
+        self.user_id = user_id
+        self._ids = itertools.count(1)
+        self._calls = {}
+        self._subscriptions = {}
+        self._websocket = None
+        self._reader = None
+
+    @classmethod
+    def from_rest(cls, rocket):
+        """Creates a client using the server and the credentials of ``rocket``."""
+        # A consistent copy, the headers of the client are replaced on login
+        headers = rocket.headers.copy()
+        return cls(
+            rocket.server_url,
+            auth_token=headers.get("X-Auth-Token"),
+            user_id=headers.get("X-User-Id"),
+        )
+
+    async def _send(self, message):
+        await self._websocket.send(json.dumps(message))
+
+    async def _pong(self, ping):
+        pong = {"msg": "pong"}
+        if "id" in ping:
+            pong["id"] = ping["id"]
+        await self._send(pong)
+
+    async def connect(self):
+        """Opens the connection and logs in with the auth token."""
+        import websockets
+
+        self._websocket = await websockets.connect(self.url)
+        await self._send({"msg": "connect", "version": "1", "support": ["1"]})
+        while True:
+            message = json.loads(await self._websocket.recv())
+            if message.get("msg") == "connected":
+                break
+            if message.get("msg") == "ping":
+                await self._pong(message)
+            if message.get("msg") == "failed":
+                await self._websocket.close()
+                raise RocketConnectionException()
+        self._reader = asyncio.ensure_future(self._read())
+        if self.auth_token:
+            try:
+                await self.call("login", {"resume": self.auth_token})
+            except RocketConnectionException:
+                await self.close()
+                raise RocketAuthenticationException()
+        return self
+
+    async def close(self):
+        if self._websocket is not None:
+            await self._websocket.close()
+        if self._reader is not None:
+            await self._reader
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _read(self):
+        try:
+            async for raw in self._websocket:
+                await self._dispatch(json.loads(raw))
+        except Exception:  # skipcq: PYL-W0703
+            # The connection dropped, release whoever is waiting on it below
+            pass
+        finally:
+            for future in self._calls.values():
+                if not future.done():
+                    future.set_exception(RocketConnectionException())
+            self._calls.clear()
+            for subscription in self._subscriptions.values():
+                if not subscription.ready.done():
+                    subscription.ready.set_exception(RocketConnectionException())
+                subscription._close()
+            self._subscriptions.clear()
+
+    async def _dispatch(self, message):
+        kind = message.get("msg")
+        if kind == "ping":
+            await self._pong(message)
+        elif kind == "result":
+            future = self._calls.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                if "error" in message:
+                    future.set_exception(RocketConnectionException(message["error"]))
+                else:
+                    future.set_result(message.get("result"))
+        elif kind == "ready":
+            for sub_id in message.get("subs", []):
+                subscription = self._subscriptions.get(sub_id)
+                if subscription is not None and not subscription.ready.done():
+                    subscription.ready.set_result(None)
+        elif kind == "nosub":
+            subscription = self._subscriptions.pop(message.get("id"), None)
+            if subscription is not None:
+                if not subscription.ready.done():
+                    subscription.ready.set_exception(
+                        RocketConnectionException(message.get("error"))
+                    )
+                subscription._close()
+        elif kind == "changed":
+            fields = message.get("fields", {})
+            event = RealtimeEvent(
+                message.get("collection"),
+                fields.get("eventName"),
+                fields.get("args", []),
+            )
+            for subscription in list(self._subscriptions.values()):
+                if (
+                    subscription.stream == event.stream
+                    and subscription.event_name == event.event_name
+                ):
+                    await subscription._deliver(event)
+
+    async def call(self, method, *params):
+        """Calls a server method and returns its result."""
+        call_id = str(next(self._ids))
+        future = asyncio.get_running_loop().create_future()
+        self._calls[call_id] = future
+        await self._send(
+            {"msg": "method", "method": method, "id": call_id, "params": list(params)}
+        )
+        return await future
+
+    async def subscribe(self, stream, event_name, *params, callback=None):
+        """Subscribes to ``event_name`` of ``stream`` and waits until the
+        server accepts the subscription."""
+        sub_id = str(next(self._ids))
+        subscription = Subscription(self, sub_id, stream, event_name, callback)
+        self._subscriptions[sub_id] = subscription
+        await self._send(
+            {
+                "msg": "sub",
+                "id": sub_id,
+                "name": stream,
+                "params": [event_name, *params],
+            }
+        )
+        await subscription.ready
+        return subscription
+
+    async def unsubscribe(self, subscription):
+        if self._subscriptions.pop(subscription.id, None) is not None:
+            await self._send({"msg": "unsub", "id": subscription.id})
+            subscription._close()
+
+    async def subscribe_room_messages(self, room_id, callback=None):
+        """New and edited messages of a room."""
+        return await self.subscribe(
+            "stream-room-messages", room_id, False, callback=callback
+        )
+
+    async def subscribe_user(self, event="notification", callback=None):
+        """Events of the logged user, e.g. "notification", "message",
+        "rooms-changed" or "subscriptions-changed"."""
+        return await self.subscribe(
+            "stream-notify-user", f"{self.user_id}/{event}", False, callback=callback
+        )
+
+    async def subscribe_room(self, room_id, event="typing", callback=None):
+        """Events of a room, e.g. "typing" or "deleteMessage"."""
+        return await self.subscribe(
+            "stream-notify-room", f"{room_id}/{event}", False, callback=callback
+        )
@@ -0,0 +1,90 @@
+import random
+import time
+
+import requests
+
+# POST endpoints that can safely be sent twice. chat.react is left out on
+# purpose: unless shouldReact is given it toggles the reaction.
+IDEMPOTENT_POST_METHODS = frozenset(
+    {
+        "subscriptions.read",
+        "subscriptions.unread",
+        "rooms.favorite",
+        "users.setStatus",
+        "users.setActiveStatus",
+        "users.setPreferences",
+        "permissions.update",
+    }
+)
+
+
+class RetryPolicy:
+    """Retries requests failing with transient errors, with exponential backoff.
+
+    A request is retried when it fails with one of ``retry_exceptions`` or
+    the server answers with one of ``retry_statuses``, as long as:
+
+    - its HTTP method is in ``retry_http_methods`` or its API method is in
+      ``idempotent_methods`` (by default only GETs and IDEMPOTENT_POST_METHODS),
+    - fewer than ``max_attempts`` attempts have been made,
+    - the next attempt would start before ``deadline`` seconds have elapsed
+      since the first one (when a deadline is set).
+
+    The n-th retry waits ``backoff_factor * 2 ** (n - 1)`` seconds, capped to
+    ``max_backoff``. With ``jitter`` a random delay between 0 and that value
+    is used instead, which spreads the retries of concurrent clients.
+    """
+
+    def __init__(
+        self,
+        max_attempts=3,
+        backoff_factor=0.5,
+        max_backoff=30,
+        jitter=True,
+        retry_statuses=frozenset({502, 503, 504}),
+        retry_exceptions=(requests.ConnectionError, requests.Timeout),
+        retry_http_methods=frozenset({"get"}),
+        idempotent_methods=IDEMPOTENT_POST_METHODS,
+        deadline=None,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = retry_statuses
+        self.retry_exceptions = retry_exceptions
+        self.retry_http_methods = retry_http_methods
+        self.idempotent_methods = idempotent_methods
+        self.deadline = deadline
+
+    @staticmethod
+    def clock():
+        return time.monotonic()
+
+    @staticmethod
+    def sleep(seconds):
+        time.sleep(seconds)
+
+    def applies_to(self, http_method, method):
+        """Whether requests of ``http_method`` to ``method`` may be retried."""
+        return (
+            http_method in self.retry_http_methods or method in self.idempotent_methods
+        )
+
+    def backoff(self, attempt):
+        """Seconds to wait after the failed ``attempt`` (starting at 1)."""
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)  # nosec B311
+        return delay
+
+    def next_delay(self, attempt, started):
+        """Seconds to wait before the next attempt, or None to give up."""
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        if self.deadline is not None and (
+            self.clock() + delay - started >= self.deadline
+        ):
+            return None
+        return delay
@@ -2,6 +2,7 @@
 
 from rocketchat_API.APISections.assets import RocketChatAssets
 from rocketchat_API.APISections.banners import RocketChatBanners
+from rocketchat_API.APISections.base import AsyncRocketChatBase
 from rocketchat_API.APISections.channels import RocketChatChannels
 from rocketchat_API.APISections.chat import RocketChatChat
 from rocketchat_API.APISections.dm import RocketChatDM
@@ -53,3 +54,13 @@ class RocketChat(
     RocketChatUsersEngagement,
 ):
     pass
+
+
+class AsyncRocketChat(AsyncRocketChatBase, RocketChat):
+    """RocketChat client for asyncio code.
+
+    Exposes the same methods as RocketChat, but they return coroutines and the
+    paginated ones return async generators.
+    """
+
+    pass
@@ -0,0 +1,128 @@
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """Text buffer filled with the chunks of a response body as needed."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Appends the next chunk to the buffer, dropping what was already
+        consumed. Returns False once the body has been read entirely."""
+        if self.eof:
+            return False
+        self.buffer = self.buffer[self.pos :]
+        self.pos = 0
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self.buffer += text
+                return True
+        self.buffer += self._decoder.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        """Returns the next non whitespace character, None at the end."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, chars):
+        char = self.peek()
+        if char is None or char not in chars:
+            raise json.JSONDecodeError(
+                "Expecting one of %r" % chars, self.buffer, self.pos
+            )
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decodes the next JSON value, reading more chunks until it is
+        complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number ending the buffer may go on in the next chunk
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_items(chunks, key):
+    """Yields the items of the ``key`` array of the JSON object whose text
+    is split in ``chunks`` (bytes), decoding them one at a time.
+
+    Returns (as the value of the generator) a dict with the other members
+    of the object.
+    """
+    reader = _Reader(chunks)
+    fields = {}
+    reader.expect("{")
+    if reader.peek() == "}":
+        return fields
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.pos += 1
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.expect(",]") == "]":
+                        break
+        else:
+            fields[name] = reader.value()
+        if reader.expect(",}") == "}":
+            return fields
+
+
+class StreamedPage:
+    """A page of a paginated method read from a streamed response.
+
+    Iterating it yields the items of ``data_key`` while the body is being
+    downloaded, without holding the whole body nor the whole decoded page
+    in memory. Once iterated, ``fields`` holds the other members of the
+    response (``total``, ``offset``, ...). The response is closed at the end
+    of the iteration.
+    """
+
+    def __init__(self, response, data_key, chunk_size=CHUNK_SIZE):
+        self.response = response
+        self.data_key = data_key
+        self.chunk_size = chunk_size
+        self.fields = {}
+
+    def __iter__(self):
+        try:
+            self.fields = yield from iter_json_items(
+                self.response.iter_content(self.chunk_size), self.data_key
+            )
+        finally:
+            self.close()
+
+    def close(self):
+        self.response.close()
@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+EPOCH = "1970-01-01T00:00:00.000Z"
+
+
+def _latest(current, documents, *fields):
+    """Most recent of ``current`` and the ``fields`` dates of ``documents``.
+
+    Dates are the ISO 8601 strings sent by Rocket.Chat, which sort
+    chronologically.
+    """
+    for document in documents:
+        for field in fields:
+            value = document.get(field)
+            if isinstance(value, dict):
+                # {"$date": ...} as sent by some older endpoints
+                value = value.get("$date")
+            if isinstance(value, str) and (current is None or value > current):
+                current = value
+    return current
+
+
+class MemoryStore:
+    """Keeps the synchronized documents in memory.
+
+    Documents are grouped in collections (one per room for messages, one per
+    room and per thread for threads, plus "roles" and "subscriptions") and
+    indexed by ``_id``. Any object with the same methods can be given to
+    SyncEngine to persist them elsewhere.
+    """
+
+    def __init__(self):
+        self.collections = {}
+        self.watermarks = {}
+        self._lock = threading.Lock()
+
+    def get(self, collection):
+        """Documents of ``collection`` by ``_id``."""
+        with self._lock:
+            return dict(self.collections.get(collection, {}))
+
+    def apply(self, collection, updated, deleted_ids):
+        with self._lock:
+            documents = self.collections.setdefault(collection, {})
+            for document in updated:
+                documents[document["_id"]] = document
+            for _id in deleted_ids:
+                documents.pop(_id, None)
+
+    def get_watermark(self, collection):
+        with self._lock:
+            return self.watermarks.get(collection)
+
+    def set_watermark(self, collection, watermark):
+        with self._lock:
+            self.watermarks[collection] = watermark
+
+
+class SyncEngine:
+    """Mirrors rooms, roles and subscriptions by fetching only what changed.
+
+    Each collection has a watermark, the most recent update date seen in it.
+    The next sync only asks the server for the documents updated or deleted
+    after it, so its cost depends on the number of changes, not on the size
+    of the history. ``since`` is the date the first sync of a room starts
+    from.
+
+    Example:
+        engine = SyncEngine(rocket)
+        engine.sync_rooms(room_ids)  # every minute
+        messages = engine.store.get(room_id)
+    """
+
+    def __init__(self, rocket, store=None, since=EPOCH, max_workers=8):
+        self.rocket = rocket
+        self.store = store if store is not None else MemoryStore()
+        self.since = since
+        self.max_workers = max_workers
+
+    def _since(self, collection):
+        return self.store.get_watermark(collection) or self.since
+
+    def _apply(self, collection, since, updated, deleted):
+        self.store.apply(collection, updated, [doc["_id"] for doc in deleted])
+        watermark = _latest(since, updated, "_updatedAt")
+        watermark = _latest(watermark, deleted, "_deletedAt", "_updatedAt")
+        self.store.set_watermark(collection, watermark)
+        return len(updated), len(deleted)
+
+    def sync_room(self, room_id):
+        """Applies the messages of ``room_id`` updated or deleted since the
+        last sync. Returns the number of updated and deleted messages."""
+        since = self._since(room_id)
+        result = self.rocket.chat_sync_messages(room_id, since).get("result", {})
+        deleted = result.get("deleted")
+        if deleted is None:
+            # Older servers only report deletions through this endpoint
+            deleted = list(self.rocket.chat_get_deleted_messages(room_id, since))
+        return self._apply(room_id, since, result.get("updated", []), deleted)
+
+    def sync_rooms(self, room_ids):
+        """Syncs ``room_ids`` concurrently. Returns the changes per room."""
+        room_ids = list(room_ids)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(room_ids, executor.map(self.sync_room, room_ids)))
+
+    def sync_threads(self, room_id):
+        """Applies the threads of ``room_id`` updated or removed since the
+        last sync, in the "threads:<room_id>" collection."""
+        collection = "threads:" + room_id
+        since = self._since(collection)
+        changes = self.rocket.chat_sync_thread_list(room_id, since).get("threads", {})
+        return self._apply(
+            collection, since, changes.get("update", []), changes.get("remove", [])
+        )
+
+    def sync_thread_messages(self, thread_id):
+        """Applies the messages of thread ``thread_id`` updated or removed
+        since the last sync, in the "thread:<thread_id>" collection."""
+        collection = "thread:" + thread_id
+        since = self._since(collection)
+        changes = self.rocket.chat_sync_thread_messages(thread_id, since).get(
+            "messages", {}
+        )
+        return self._apply(
+            collection, since, changes.get("update", []), changes.get("remove", [])
+        )
+
+    def sync_roles(self):
+        """Applies the roles updated or removed since the last sync."""
+        since = self._since("roles")
+        changes = self.rocket.roles_sync(since).get("roles", {})
+        return self._apply(
+            "roles", since, changes.get("update", []), changes.get("remove", [])
+        )
+
+    def sync_subscriptions(self):
+        """Applies the subscriptions updated or removed since the last sync."""
+        since = self._since("subscriptions")
+        changes = self.rocket.subscriptions_get(updatedSince=since)
+        return self._apply(
+            "subscriptions",
+            since,
+            changes.get("update", []),
+            changes.get("remove", []),
+        )
@@ -0,0 +1,183 @@
+import contextvars
+import threading
+import time
+from functools import wraps
+
+# Span of the paginated walk in progress, parent of the spans of its requests
+current_span = contextvars.ContextVar("rocketchat_span", default=None)
+
+
+class Tracer:
+    """Interface of the tracers given to the client with ``tracer=``.
+
+    ``start_span`` returns a started span, child of ``parent`` (a span
+    returned by the same tracer) when given. Spans need three methods:
+    ``set_attribute(key, value)``, ``record_exception(exception)`` and
+    ``end()``.
+
+    The client makes one span per request, named after the API method
+    (e.g. ``channels.history``), and one per walk through a paginated
+    method, named after the Python method (e.g. ``channels_history``).
+    """
+
+    def start_span(self, name, parent=None, attributes=None):
+        raise NotImplementedError
+
+
+class _OpenTelemetrySpan:
+    __slots__ = ("span", "_error")
+
+    def __init__(self, span, error):
+        self.span = span
+        self._error = error
+
+    def set_attribute(self, key, value):
+        self.span.set_attribute(key, value)
+
+    def record_exception(self, exception):
+        self.span.record_exception(exception)
+        self.span.set_status(self._error)
+
+    def end(self):
+        self.span.end()
+
+
+class OpenTelemetryTracer(Tracer):
+    """Creates the spans with OpenTelemetry (``pip install
+    opentelemetry-api``), by default with the tracer named
+    ``rocketchat_API`` of the global tracer provider."""
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("rocketchat_API")
+        self._error = trace.Status(trace.StatusCode.ERROR)
+
+    def start_span(self, name, parent=None, attributes=None):
+        context = None
+        if parent is not None:
+            context = self._trace.set_span_in_context(parent.span)
+        span = self._tracer.start_span(name, context=context, attributes=attributes)
+        return _OpenTelemetrySpan(span, self._error)
+
+
+class PaginationTrace:
+    """Span of a walk through a paginated method.
+
+    The requests of its pages are made children of the span, which ends
+    when the walk is exhausted, closed or fails, with these attributes:
+
+    - ``rocketchat.pages``: number of pages requested
+    - ``rocketchat.items``: number of items yielded
+    - ``rocketchat.wait_seconds``: time the consumer waited for items,
+      i.e. spent in the requests and decoding the pages
+    - ``rocketchat.consumer_seconds``: time spent by the consumer between
+      two items
+    """
+
+    def __init__(self, tracer, name, attributes=None):
+        self.span = tracer.start_span(
+            name, parent=current_span.get(), attributes=attributes
+        )
+        self.pages = 0
+        self.items = 0
+        self.wait_seconds = 0.0
+        self.consumer_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def page_fetcher(self, func, asynchronous=False):
+        """Wraps the function requesting the pages, which may run on other
+        threads when pages are prefetched."""
+        if asynchronous:
+
+            @wraps(func)
+            async def fetch_async(*args, **kwargs):
+                token = current_span.set(self.span)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    current_span.reset(token)
+                    self._count_page()
+
+            return fetch_async
+
+        @wraps(func)
+        def fetch(*args, **kwargs):
+            token = current_span.set(self.span)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current_span.reset(token)
+                self._count_page()
+
+        return fetch
+
+    def _count_page(self):
+        with self._lock:
+            self.pages += 1
+
+    def iterate(self, items):
+        """Yields ``items`` (an iterator or async iterator), timing the
+        walk and the consumer."""
+        if hasattr(items, "__anext__"):
+            return self._iterate_async(items)
+        return self._iterate(items)
+
+    def _iterate(self, items):
+        clock = time.perf_counter
+        exception = None
+        try:
+            while True:
+                started = clock()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    break
+                resumed = clock()
+                self.wait_seconds += resumed - started
+                self.items += 1
+                yield item
+                self.consumer_seconds += clock() - resumed
+        except Exception as e:
+            exception = e
+            raise
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+            self.end(exception)
+
+    async def _iterate_async(self, items):
+        clock = time.perf_counter
+        exception = None
+        try:
+            while True:
+                started = clock()
+                try:
+                    item = await items.__anext__()
+                except StopAsyncIteration:
+                    break
+                resumed = clock()
+                self.wait_seconds += resumed - started
+                self.items += 1
+                yield item
+                self.consumer_seconds += clock() - resumed
+        except Exception as e:
+            exception = e
+            raise
+        finally:
+            aclose = getattr(items, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            self.end(exception)
+
+    def end(self, exception=None):
+        span = self.span
+        span.set_attribute("rocketchat.pages", self.pages)
+        span.set_attribute("rocketchat.items", self.items)
+        span.set_attribute("rocketchat.wait_seconds", self.wait_seconds)
+        span.set_attribute("rocketchat.consumer_seconds", self.consumer_seconds)
+        if exception is not None:
+            span.record_exception(exception)
+        span.end()
@@ -0,0 +1,98 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connections kept per host by the transport of thread safe clients
+THREAD_SAFE_POOL_SIZE = 32
+
+
+class RocketChatTransport:
+    """Interface used by RocketChatBase to send HTTP requests.
+
+    ``request`` receives the HTTP method ("get", "post", "put" or "delete"),
+    the full URL and the keyword arguments understood by ``requests``
+    (headers, json, data, files, verify, cert, proxies, timeout). It must
+    return a response object exposing ``status_code``, ``headers``, ``text``,
+    ``content`` and ``json()``.
+
+    Implementing this interface is all it takes to use a different HTTP
+    backend (e.g. an HTTP/2 capable client) with every API section.
+    """
+
+    def request(self, method, url, **kwargs):
+        raise NotImplementedError
+
+    def close(self):
+        """Release the resources (e.g. open connections) held by the transport."""
+        pass
+
+
+class RequestsTransport(RocketChatTransport):
+    """Transport backed by a ``requests.Session``.
+
+    When no session is given, one is created with an adapter whose connection
+    pool holds ``pool_maxsize`` connections per host (``pool_connections``
+    hosts are cached). Size it to the number of threads sharing the client
+    to avoid "Connection pool is full" churn. ``max_retries`` configures the
+    connection level retries of the adapter (an int or a urllib3 ``Retry``).
+    Set ``keep_alive`` to False to close the connection after every request.
+
+    ``requests.Session`` is not documented as thread safe. With
+    ``per_thread_sessions`` set, each thread sending requests gets a session
+    of its own, all of them mounting the same adapter so that the connection
+    pool is shared. It can't be combined with a given ``session``.
+    """
+
+    def __init__(
+        self,
+        session=None,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        max_retries=0,
+        keep_alive=True,
+        per_thread_sessions=False,
+    ):
+        self.keep_alive = keep_alive
+        self.adapter = None
+        self._local = None
+        if session is None:
+            self.adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=max_retries,
+                pool_block=pool_block,
+            )
+            session = self._new_session()
+        elif per_thread_sessions:
+            raise ValueError("per_thread_sessions can't be used with a session")
+        if per_thread_sessions:
+            self._local = threading.local()
+            self._local.session = session
+        self.session = session
+
+    def _new_session(self):
+        session = requests.Session()
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
+        return session
+
+    def thread_session(self):
+        """The session used by the calling thread."""
+        local = self._local
+        if local is None:
+            return self.session
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = self._new_session()
+        return session
+
+    def request(self, method, url, **kwargs):
+        if not self.keep_alive:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), "Connection": "close"}
+        return getattr(self.thread_session(), method)(url, **kwargs)
+
+    def close(self):
+        # Closes the shared adapter, and with it the pooled connections
+        self.session.close()
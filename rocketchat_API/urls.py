@@ -0,0 +1,50 @@
+import re
+from functools import lru_cache
+from urllib.parse import quote
+
+# Characters left as they are in query values. "&", "=", "+", "#", "%" and
+# spaces are always encoded.
+SAFE = ":/@,$!*'()"
+_NEEDS_QUOTING = re.compile(r"[^A-Za-z0-9_.~:/@,$!*'()-]").search
+
+
+def endpoint_url(server_url, api_path, method):
+    """Returns the URL of the API ``method``."""
+    # Plain concatenation is cheaper than any cache lookup
+    return server_url + api_path + method
+
+
+@lru_cache(maxsize=1024)
+def _key_prefixes(key):
+    quoted = quote(key, safe="")
+    return quoted + "=", quoted + "[]="
+
+
+def encode_value(value):
+    if type(value) is int:
+        return str(value)
+    value = str(value)
+    # Most values (ids, dates, numbers) have nothing to encode
+    if _NEEDS_QUOTING(value) is None:
+        return value
+    return quote(value, safe=SAFE)
+
+
+def build_query(args):
+    """Encodes ``args`` as a query string. Lists are sent in the
+    ``key[]=val1&key[]=val2`` form, other values as ``key=val``.
+
+    Example:
+        >>> build_query({"roomId": "GENERAL", "searchText": "a&b #c"})
+        'roomId=GENERAL&searchText=a%26b%20%23c'
+        >>> build_query({"ids": ["1", "2"]})
+        'ids[]=1&ids[]=2'
+    """
+    parts = []
+    for key, value in args.items():
+        prefix, list_prefix = _key_prefixes(key)
+        if isinstance(value, list):
+            parts.extend(list_prefix + encode_value(item) for item in value)
+        else:
+            parts.append(prefix + encode_value(value))
+    return "&".join(parts)
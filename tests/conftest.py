@@ -1,4 +1,7 @@
+import json
+import os
 import uuid
+from unittest.mock import Mock
 
 import pytest
 
@@ -6,12 +9,110 @@ from rocketchat_API.APIExceptions.RocketExceptions import (
     RocketApiException,
     RocketBadStatusCodeException,
 )
+from rocketchat_API.fake_server import NOT_IMPLEMENTED, FakeRocketChatServer
 from rocketchat_API.rocketchat import RocketChat
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--fake-server",
+        action="store_true",
+        default=os.environ.get("ROCKETCHAT_FAKE_SERVER") == "1",
+        help="Run the tests against the in-process fake Rocket.Chat server "
+        "instead of the one at 127.0.0.1:3000",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "real_server_only(reason): skip the test when running against the fake "
+        "server, which does not implement what it checks",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption("--fake-server"):
+        return
+    for item in items:
+        marker = item.get_closest_marker("real_server_only")
+        if marker is not None:
+            reason = marker.args[0] if marker.args else "needs a real server"
+            item.add_marker(pytest.mark.skip(reason=reason))
+
+
+fake_server_key = pytest.StashKey[FakeRocketChatServer]()
+
+
+def _not_implemented(excinfo):
+    return (
+        excinfo is not None
+        and isinstance(excinfo.value, RocketApiException)
+        and excinfo.value.error == NOT_IMPLEMENTED
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    server = item.config.stash.get(fake_server_key, None)
+    if server is None:
+        return
+    missing = server.take_missing()
+    # Tests failing because the fake server lacks an endpoint are skipped.
+    # Any other failure is reported, even in a test that hit such endpoint.
+    if report.failed and missing and _not_implemented(call.excinfo):
+        report.outcome = "skipped"
+        report.longrepr = (
+            str(item.path),
+            item.location[1],
+            "Skipped: not implemented by the fake server: "
+            + ", ".join(sorted({method for _, method in missing})),
+        )
+
+
+def mock_response(
+    payload=None, status_code=200, headers=None, content=None, chunk_size=None
+):
+    """Mock of a requests.Response for the tests using a mocked session.
+
+    The body is ``content``, or ``payload`` (by default a success message)
+    encoded as JSON. It is readable with ``content``, ``text``, ``json()``
+    and, when streamed, ``iter_content()``, in chunks of ``chunk_size``
+    bytes when given instead of the size asked by the client.
+    """
+    if content is None:
+        content = json.dumps({"success": True} if payload is None else payload)
+        content = content.encode()
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = content
+    response.text = content.decode()
+    response.json.side_effect = lambda: json.loads(content)
+
+    def iter_content(size=1):
+        size = chunk_size or size
+        return iter([content[i : i + size] for i in range(0, len(content), size)])
+
+    response.iter_content.side_effect = iter_content
+    return response
+
+
+@pytest.fixture(scope="session")
+def server_url(request):
+    if not request.config.getoption("--fake-server"):
+        yield "http://127.0.0.1:3000"
+        return
+    with FakeRocketChatServer() as server:
+        request.config.stash[fake_server_key] = server
+        yield server.url
+
+
 @pytest.fixture(scope="session")
-def rocket():
-    _rocket = RocketChat()
+def rocket(server_url):
+    _rocket = RocketChat(server_url=server_url)
 
     return _rocket
 
@@ -53,8 +154,8 @@ def user(create_user):
 
 
 @pytest.fixture(scope="session")
-def logged_rocket(user):
-    _rocket = RocketChat(user.name, user.password)
+def logged_rocket(rocket, user):
+    _rocket = RocketChat(user.name, user.password, server_url=rocket.server_url)
 
     return _rocket
 
@@ -0,0 +1,74 @@
+import asyncio
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from rocketchat_API.APIExceptions.RocketExceptions import (
+    RocketMissingParamException,
+)
+from rocketchat_API.rocketchat import AsyncRocketChat
+from tests.conftest import mock_response
+
+
+def test_async_methods_are_coroutines():
+    session = Mock()
+    session.get.return_value = mock_response({"channel": {"_id": "GENERAL"}})
+    rocket = AsyncRocketChat(session=session)
+
+    result = asyncio.run(rocket.channels_info(room_id="GENERAL"))
+
+    assert result["channel"]["_id"] == "GENERAL"
+    assert "roomId=GENERAL" in session.get.call_args[0][0]
+
+
+def test_async_concurrent_calls():
+    session = Mock()
+    session.post.side_effect = lambda url, **kwargs: mock_response(
+        {"success": True, "body": json.loads(kwargs["data"])}
+    )
+
+    async def invite_all():
+        async with AsyncRocketChat(session=session, max_workers=8) as rocket:
+            return await asyncio.gather(
+                *(rocket.channels_invite("GENERAL", str(i)) for i in range(20))
+            )
+
+    results = asyncio.run(invite_all())
+
+    assert [r["body"]["userId"] for r in results] == [str(i) for i in range(20)]
+
+
+def test_async_paginated_method():
+    pages = [
+        mock_response({"messages": [{"_id": "1"}, {"_id": "2"}], "success": True}),
+        mock_response({"messages": [{"_id": "3"}], "success": True}),
+    ]
+    session = Mock()
+    session.get.side_effect = pages
+    rocket = AsyncRocketChat(session=session)
+
+    async def walk():
+        return [m["_id"] async for m in rocket.channels_history("GENERAL", count=2)]
+
+    assert asyncio.run(walk()) == ["1", "2", "3"]
+
+
+def test_async_missing_param_raises_eagerly():
+    rocket = AsyncRocketChat(session=Mock())
+
+    with pytest.raises(RocketMissingParamException):
+        rocket.channels_info()
+
+
+def test_async_login():
+    session = Mock()
+    session.post.return_value = mock_response(
+        {"status": "success", "data": {"authToken": "token", "userId": "uid"}}
+    )
+
+    rocket = AsyncRocketChat("user", "password", session=session)
+
+    assert rocket.headers["X-Auth-Token"] == "token"
+    asyncio.run(rocket.login("user", "password"))
+    assert rocket.headers["X-User-Id"] == "uid"
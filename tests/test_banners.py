@@ -3,6 +3,8 @@ from datetime import datetime, timezone
 import pytest
 from pymongo import MongoClient
 
+pytestmark = pytest.mark.real_server_only("needs the MongoDB of a Rocket.Chat server")
+
 
 @pytest.fixture
 def test_banner():
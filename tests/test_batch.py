@@ -0,0 +1,116 @@
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from rocketchat_API.APIExceptions.RocketExceptions import (
+    RocketMissingParamException,
+)
+from rocketchat_API.rocketchat import AsyncRocketChat, RocketChat
+from tests.conftest import mock_response
+
+
+def _session(delay=0):
+    session = Mock()
+
+    def post(url, **kwargs):
+        time.sleep(delay)
+        return mock_response({"user": json.loads(kwargs["data"])["userId"]})
+
+    session.post.side_effect = post
+    session.get.return_value = mock_response({"messages": [{"_id": "1"}]})
+    return session
+
+
+def test_results_are_in_order_with_errors_captured():
+    rocket = RocketChat(session=_session())
+    calls = [("channels_invite", ("GENERAL", str(i))) for i in range(50)]
+    calls.insert(10, ("channels_info", (), {}))
+
+    results = rocket.batch(calls, max_workers=8)
+
+    assert len(results) == 51
+    assert not results[10].ok
+    assert isinstance(results[10].exception, RocketMissingParamException)
+    with pytest.raises(RocketMissingParamException):
+        results[10].result()
+    values = [result.result()["user"] for result in results if result.ok]
+    assert values == [str(i) for i in range(50)]
+
+
+def test_calls_run_concurrently():
+    rocket = RocketChat(session=_session(delay=0.05))
+    start = time.monotonic()
+
+    rocket.batch(
+        (("channels_invite", ("GENERAL", str(i))) for i in range(20)), max_workers=20
+    )
+
+    assert time.monotonic() - start < 0.05 * 5
+
+
+def test_generator_input_is_consumed_lazily():
+    rocket = RocketChat(session=_session())
+    consumed = []
+
+    def calls():
+        for i in range(100):
+            consumed.append(i)
+            yield "channels_invite", ("GENERAL", str(i))
+
+    results = rocket.map_calls(calls(), max_workers=2)
+    next(results)
+
+    assert len(consumed) <= 5
+
+
+def test_paginated_methods_are_walked():
+    rocket = RocketChat(session=_session())
+
+    (result,) = rocket.batch([("channels_history", ("GENERAL",))])
+
+    assert result.value == [{"_id": "1"}]
+
+
+def test_callables_are_accepted():
+    lock = threading.Lock()
+
+    def locked_sum(a, b):
+        with lock:
+            return a + b
+
+    (result,) = RocketChat(session=Mock()).batch([(locked_sum, (1, 2))])
+
+    assert result.value == 3
+
+
+def test_async_batch():
+    rocket = AsyncRocketChat(session=_session())
+    calls = [("channels_invite", ("GENERAL", str(i))) for i in range(20)]
+    calls.append(("channels_history", ("GENERAL",)))
+    calls.append(("channels_info", ()))
+
+    results = asyncio.run(rocket.batch(calls, max_workers=4))
+
+    assert [r.value["user"] for r in results[:20]] == [str(i) for i in range(20)]
+    assert results[20].value == [{"_id": "1"}]
+    assert isinstance(results[21].exception, RocketMissingParamException)
+
+
+def test_async_map_calls():
+    rocket = AsyncRocketChat(session=_session())
+
+    def calls():
+        for i in range(10):
+            yield ("channels_invite", ("GENERAL", str(i)))
+
+    async def run():
+        return [result async for result in rocket.map_calls(calls(), max_workers=2)]
+
+    results = asyncio.run(run())
+
+    assert all(result.ok for result in results)
+    assert [r.value["user"] for r in results] == [str(i) for i in range(10)]
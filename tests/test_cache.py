@@ -0,0 +1,183 @@
+import json
+from unittest.mock import Mock
+
+from rocketchat_API.cache import ConditionalRequestStore, ResponseCache
+from rocketchat_API.rocketchat import RocketChat
+from tests.conftest import mock_response
+
+
+class FakeClockCache(ResponseCache):
+    now = 0.0
+
+    def clock(self):
+        return self.now
+
+
+def _response(payload, **kwargs):
+    # Bodies of 100 bytes, for the size accounting of the cache
+    return mock_response(content=json.dumps(payload).encode().ljust(100), **kwargs)
+
+
+def _rocket(cache):
+    session = Mock()
+    session.get.side_effect = lambda url, **kwargs: _response({"url": url})
+    session.post.side_effect = lambda url, **kwargs: _response({"success": True})
+    return RocketChat(session=session, cache=cache), session
+
+
+def test_repeated_reads_are_served_from_cache():
+    rocket, session = _rocket(ResponseCache())
+
+    first = rocket.channels_info(room_id="GENERAL")
+    second = rocket.channels_info(room_id="GENERAL")
+
+    assert first == second
+    assert session.get.call_count == 1
+
+
+def test_cache_key_includes_params():
+    rocket, session = _rocket(ResponseCache())
+
+    rocket.channels_info(room_id="GENERAL")
+    rocket.channels_info(room_id="OTHER")
+
+    assert session.get.call_count == 2
+
+
+def test_methods_without_ttl_are_not_cached():
+    rocket, session = _rocket(ResponseCache())
+
+    rocket.me()
+    rocket.me()
+
+    assert session.get.call_count == 2
+
+
+def test_cached_values_are_copies():
+    rocket, _ = _rocket(ResponseCache())
+
+    rocket.channels_info(room_id="GENERAL")["url"] = "changed"
+
+    assert rocket.channels_info(room_id="GENERAL")["url"] != "changed"
+
+
+def test_entries_expire():
+    cache = FakeClockCache(ttls={"channels.info": 10})
+    rocket, session = _rocket(cache)
+
+    rocket.channels_info(room_id="GENERAL")
+    cache.now = 11
+    rocket.channels_info(room_id="GENERAL")
+
+    assert session.get.call_count == 2
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = ResponseCache(max_entries=2)
+    rocket, session = _rocket(cache)
+    rocket.channels_info(room_id="A")
+    rocket.channels_info(room_id="B")
+    rocket.channels_info(room_id="A")
+    rocket.channels_info(room_id="C")
+
+    assert len(cache) == 2
+    rocket.channels_info(room_id="A")
+    assert session.get.call_count == 3
+
+    cache = ResponseCache(max_bytes=250)
+    rocket, _ = _rocket(cache)
+    for room_id in "ABCD":
+        rocket.channels_info(room_id=room_id)
+    assert len(cache) == 2
+    assert cache.size == 200
+
+
+def test_write_invalidates_the_same_room_only():
+    rocket, session = _rocket(ResponseCache())
+    rocket.channels_info(room_id="GENERAL")
+    rocket.channels_info(room_id="OTHER")
+    rocket.rooms_info(room_name="general")
+
+    rocket.channels_rename("GENERAL", "general2")
+    rocket.channels_info(room_id="GENERAL")
+    rocket.channels_info(room_id="OTHER")
+    rocket.rooms_info(room_name="general")
+
+    # GENERAL and the lookup by name are fetched again, OTHER is still cached
+    assert session.get.call_count == 5
+
+
+def test_unrelated_write_keeps_entries():
+    rocket, session = _rocket(ResponseCache())
+    rocket.channels_info(room_id="GENERAL")
+
+    rocket.chat_post_message("hello", room_id="GENERAL")
+    rocket.channels_info(room_id="GENERAL")
+
+    assert session.get.call_count == 1
+
+
+def _conditional_rocket():
+    session = Mock()
+    store = ConditionalRequestStore()
+    return RocketChat(session=session, conditional_requests=store), session, store
+
+
+def _validated_response(payload, etag='"v1"', status_code=200):
+    return _response(payload, status_code=status_code, headers={"ETag": etag})
+
+
+def test_not_modified_response_is_served_from_store():
+    rocket, session, _ = _conditional_rocket()
+    session.get.side_effect = [
+        _validated_response({"permissions": [1, 2, 3]}),
+        _validated_response(None, status_code=304),
+    ]
+
+    first = rocket.permissions_list_all()
+    second = rocket.permissions_list_all()
+
+    assert first == second == {"permissions": [1, 2, 3]}
+    assert "If-None-Match" not in session.get.call_args_list[0][1]["headers"]
+    assert session.get.call_args_list[1][1]["headers"]["If-None-Match"] == '"v1"'
+
+
+def test_modified_response_replaces_stored_one():
+    rocket, session, _ = _conditional_rocket()
+    session.get.side_effect = [
+        _validated_response({"permissions": [1]}),
+        _validated_response({"permissions": [1, 2]}, etag='"v2"'),
+        _validated_response(None, status_code=304),
+    ]
+
+    rocket.permissions_list_all()
+    rocket.permissions_list_all()
+
+    assert rocket.permissions_list_all() == {"permissions": [1, 2]}
+    assert session.get.call_args_list[2][1]["headers"]["If-None-Match"] == '"v2"'
+
+
+def test_conditional_headers_only_for_configured_methods():
+    rocket, session, store = _conditional_rocket()
+    session.get.return_value = _validated_response({"success": True})
+
+    rocket.me()
+    rocket.me()
+
+    assert "If-None-Match" not in session.get.call_args[1]["headers"]
+    assert len(store) == 0
+
+
+def test_not_modified_without_stored_response_refetches():
+    rocket, session, store = _conditional_rocket()
+    session.get.side_effect = [
+        _validated_response({"permissions": [1]}),
+        _validated_response(None, status_code=304),
+        _validated_response({"permissions": [1]}),
+    ]
+
+    rocket.permissions_list_all()
+    store.not_modified = lambda method, params: (False, None)
+
+    assert rocket.permissions_list_all() == {"permissions": [1]}
+    assert session.get.call_count == 3
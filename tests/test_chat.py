@@ -144,7 +144,9 @@ def test_chat_get_message_read_receipts(
         .get("_id")
     )
 
-    second_rocket = RocketChat("secondary", get_tests_passowrd())
+    second_rocket = RocketChat(
+        "secondary", get_tests_passowrd(), server_url=logged_rocket.server_url
+    )
     second_rocket.subscriptions_read(rid="GENERAL")
 
     receipts = list(logged_rocket.chat_get_message_read_receipts(message_id=message_id))
@@ -0,0 +1,75 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from rocketchat_API.codec import JSONCodec, OrjsonCodec, UjsonCodec, default_codec
+from rocketchat_API.rocketchat import RocketChat
+from tests.conftest import mock_response
+
+PAYLOAD = {"text": "héllo 🚀", "ids": [1, 2], "nested": {"ok": True, "none": None}}
+
+
+def _codecs():
+    codecs = [JSONCodec]
+    for codec, module in ((OrjsonCodec, "orjson"), (UjsonCodec, "ujson")):
+        codecs.append(
+            pytest.param(
+                codec,
+                marks=pytest.mark.skipif(
+                    not _installed(module), reason=module + " not installed"
+                ),
+            )
+        )
+    return codecs
+
+
+def _installed(module):
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("codec_class", _codecs())
+def test_codec_round_trip(codec_class):
+    codec = codec_class()
+
+    data = codec.dumps(PAYLOAD)
+
+    assert isinstance(data, bytes)
+    assert json.loads(data) == PAYLOAD
+    assert codec.loads(data) == PAYLOAD
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads(b"<html>Bad Gateway</html>")
+
+
+def test_default_codec_prefers_fast_libraries():
+    codec = default_codec()
+
+    if _installed("orjson"):
+        assert codec.name == "orjson"
+    elif _installed("ujson"):
+        assert codec.name == "ujson"
+    else:
+        assert codec.name == "json"
+
+
+def test_client_encodes_and_decodes_with_codec():
+    codec = Mock(wraps=JSONCodec())
+    session = Mock()
+    session.post.return_value = mock_response(
+        content=b'{"success": true, "message": {}}'
+    )
+    session.get.return_value = mock_response(content=b"not json")
+    rocket = RocketChat(session=session, codec=codec)
+
+    assert rocket.chat_post_message("hi", room_id="GENERAL")["success"] is True
+    kwargs = session.post.call_args[1]
+    assert json.loads(kwargs["data"]) == {"roomId": "GENERAL", "text": "hi"}
+    assert kwargs["headers"]["Content-Type"] == "application/json"
+    codec.dumps.assert_called_once_with({"roomId": "GENERAL", "text": "hi"})
+    codec.loads.assert_called_once_with(b'{"success": true, "message": {}}')
+
+    assert rocket.channels_info(room_id="GENERAL") == "not json"
@@ -0,0 +1,170 @@
+import json
+from unittest.mock import Mock
+
+from rocketchat_API.APIExceptions.RocketExceptions import RocketApiException
+from rocketchat_API.directory import RoomDirectory, UserDirectory
+from rocketchat_API.rocketchat import RocketChat
+from tests.conftest import mock_response
+
+
+def _user(_id, username, email, updated_at):
+    return {
+        "_id": _id,
+        "username": username,
+        "emails": [{"address": email}],
+        "_updatedAt": updated_at,
+    }
+
+
+USERS = [
+    _user("1", "john", "John@Example.com", "2024-01-01T00:00:00.000Z"),
+    _user("2", "jane", "jane@example.com", "2024-01-02T00:00:00.000Z"),
+]
+
+
+def _rocket():
+    rocket = Mock()
+    rocket.users_list.side_effect = lambda **kwargs: iter(USERS)
+    return rocket
+
+
+def test_load_indexes_users():
+    users = UserDirectory(_rocket())
+
+    assert users.load() == 2
+    assert users.by_id("1")["username"] == "john"
+    assert users.by_username("jane")["_id"] == "2"
+    assert users.by_email("john@example.COM")["_id"] == "1"
+    assert users.by_username("nobody") is None
+    assert "2" in users and len(users) == 2
+
+
+def test_load_requests_only_needed_fields():
+    rocket = _rocket()
+    UserDirectory(rocket, fields=("username",), page_size=100).load()
+
+    kwargs = rocket.users_list.call_args[1]
+    assert json.loads(kwargs["fields"]) == {"username": 1}
+    assert kwargs["count"] == 100
+
+
+def test_refresh_fetches_updated_users_only():
+    rocket = _rocket()
+    users = UserDirectory(rocket)
+    users.load()
+    rocket.users_list.side_effect = lambda **kwargs: iter(
+        [_user("1", "johnny", "johnny@example.com", "2024-01-03T00:00:00.000Z")]
+    )
+
+    assert users.refresh() == 1
+
+    query = json.loads(rocket.users_list.call_args[1]["query"])
+    assert query == {"_updatedAt": {"$gt": {"$date": "2024-01-02T00:00:00.000Z"}}}
+    assert users.by_username("john") is None
+    assert users.by_email("john@example.com") is None
+    assert users.by_username("johnny")["_id"] == "1"
+    assert users.watermark == "2024-01-03T00:00:00.000Z"
+
+
+def test_refresh_falls_back_to_full_load():
+    rocket = _rocket()
+    users = UserDirectory(rocket)
+    users.load()
+
+    def users_list(**kwargs):
+        if "query" in kwargs:
+            raise RocketApiException(400, "", {"success": False})
+        return iter(USERS[:1])
+
+    rocket.users_list.side_effect = users_list
+
+    assert users.refresh() == 1
+    assert users.by_id("2") is None
+
+
+ROOMS = [
+    {"_id": "GENERAL", "name": "general", "t": "c", "_updatedAt": "2024-01-01"},
+    {"_id": "P1", "name": "private", "t": "p", "_updatedAt": "2024-01-02"},
+    {"_id": "D1", "t": "d", "_updatedAt": "2024-01-03"},
+]
+
+
+class FakeClockRoomDirectory(RoomDirectory):
+    now = 0.0
+
+    def clock(self):
+        return self.now
+
+
+def _rooms_rocket():
+    rocket = Mock()
+    rocket.rooms_get.return_value = {"update": ROOMS, "remove": []}
+    return rocket
+
+
+def test_room_directory_load_and_refresh():
+    rocket = _rooms_rocket()
+    rooms = RoomDirectory(rocket)
+
+    assert rooms.load() == 3
+    assert rooms.resolve("general") == "GENERAL"
+    assert rooms.by_id("D1")["t"] == "d"
+    assert rooms.watermark == "2024-01-03"
+
+    rocket.rooms_get.return_value = {
+        "update": [{"_id": "GENERAL", "name": "lobby", "_updatedAt": "2024-01-04"}],
+        "remove": [{"_id": "P1", "_deletedAt": "2024-01-05"}],
+    }
+    assert rooms.refresh() == 2
+
+    rocket.rooms_get.assert_called_with(updatedSince="2024-01-03")
+    assert rooms.by_name("general") is None
+    assert rooms.by_name("lobby")["_id"] == "GENERAL"
+    assert "P1" not in rooms and len(rooms) == 2
+    assert rooms.watermark == "2024-01-05"
+
+
+def test_room_directory_admin_load():
+    rocket = Mock()
+    rocket.rooms_admin_rooms.return_value = iter(ROOMS[:2])
+
+    assert RoomDirectory(rocket, page_size=100).load(admin=True) == 2
+    rocket.rooms_admin_rooms.assert_called_once_with(count=100)
+
+
+def test_room_directory_refreshes_on_miss_at_most_once_per_interval():
+    rocket = _rooms_rocket()
+    rooms = FakeClockRoomDirectory(rocket, min_refresh_interval=60)
+    rooms.load()
+    rocket.rooms_get.return_value = {"update": [], "remove": []}
+
+    rooms.now = 30
+    assert rooms.resolve("unknown") is None
+    assert rocket.rooms_get.call_count == 1
+
+    rooms.now = 61
+    rocket.rooms_get.return_value = {
+        "update": [{"_id": "NEW", "name": "unknown", "_updatedAt": "2024-02-01"}]
+    }
+    assert rooms.resolve("unknown") == "NEW"
+    assert rooms.resolve("other") is None
+    assert rocket.rooms_get.call_count == 2
+
+
+def test_client_sends_resolved_room_ids():
+    session = Mock()
+    session.get.return_value = mock_response()
+    session.post.return_value = mock_response()
+    rooms = RoomDirectory(_rooms_rocket(), min_refresh_interval=None)
+    rooms.load()
+    rocket = RocketChat(session=session, room_directory=rooms)
+
+    rocket.channels_info(channel="general")
+    assert session.get.call_args[0][0].endswith("/channels.info?roomId=GENERAL")
+
+    rocket.groups_members(group="unknown")
+    assert "roomName=unknown" in session.get.call_args[0][0]
+
+    rocket.groups_delete(group="private")
+    assert json.loads(session.post.call_args[1]["data"]) == {"roomId": "P1"}
+    assert rooms.by_name("private") is None
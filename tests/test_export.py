@@ -0,0 +1,71 @@
+import json
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from rocketchat_API.export import MessageExporter
+
+ROOMS = [
+    {"_id": "channel", "t": "c"},
+    {"_id": "group", "t": "p"},
+    {"_id": "direct", "t": "d"},
+    {"_id": "omnichannel", "t": "l"},
+]
+
+
+def _history(room_id, **kwargs):
+    return iter(
+        {"_id": f"{room_id}-{i}", "rid": room_id, "msg": "hi"} for i in range(3)
+    )
+
+
+def _rocket():
+    rocket = Mock()
+    rocket.rooms_admin_rooms.side_effect = lambda **kwargs: iter(ROOMS)
+    rocket.channels_history.side_effect = _history
+    rocket.groups_history.side_effect = _history
+    rocket.dm_history.side_effect = _history
+    return rocket
+
+
+def test_export_writes_one_jsonl_file_per_room(tmp_path):
+    exporter = MessageExporter(_rocket(), str(tmp_path), max_workers=2)
+
+    assert exporter.export() == {"channel": 3, "group": 3, "direct": 3}
+    with open(tmp_path / "group.jsonl", encoding="utf-8") as exported:
+        messages = [json.loads(line) for line in exported]
+    assert [message["_id"] for message in messages] == ["group-0", "group-1", "group-2"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".partial")]
+
+
+def test_export_resumes_from_checkpoint(tmp_path):
+    rocket = _rocket()
+    rocket.dm_history.side_effect = RuntimeError("connection lost")
+    with pytest.raises(RuntimeError):
+        MessageExporter(rocket, str(tmp_path), max_workers=1).export()
+
+    rocket = _rocket()
+    exporter = MessageExporter(rocket, str(tmp_path))
+
+    assert exporter.export() == {"channel": 3, "group": 3, "direct": 3}
+    rocket.channels_history.assert_not_called()
+    rocket.groups_history.assert_not_called()
+    rocket.dm_history.assert_called_once()
+
+
+def test_export_parquet(tmp_path):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    exporter = MessageExporter(
+        _rocket(), str(tmp_path), file_format="parquet", page_size=2
+    )
+
+    exporter.export(rooms=ROOMS[:1])
+    table = pyarrow_parquet.read_table(tmp_path / "channel.parquet")
+
+    assert table.column("_id").to_pylist() == ["channel-0", "channel-1", "channel-2"]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        MessageExporter(Mock(), "unused", file_format="csv")
@@ -0,0 +1,91 @@
+import pytest
+
+from rocketchat_API.APIExceptions.RocketExceptions import (
+    RocketApiException,
+    RocketAuthenticationException,
+    RocketBadStatusCodeException,
+)
+from rocketchat_API.fake_server import FakeRocketChatServer
+from rocketchat_API.rocketchat import RocketChat
+
+
+@pytest.fixture
+def server():
+    with FakeRocketChatServer(max_page_size=20) as fake:
+        yield fake
+
+
+def test_login_and_auth_headers(server):
+    rocket = RocketChat("admin", "password", server_url=server.url)
+
+    assert rocket.me()["username"] == "admin"
+    with pytest.raises(RocketAuthenticationException):
+        RocketChat("admin", "wrong", server_url=server.url)
+    with pytest.raises(RocketBadStatusCodeException) as exc_info:
+        RocketChat(server_url=server.url).me()
+    assert exc_info.value.status_code == 401
+
+
+def test_history_pagination(server):
+    server.add_messages("GENERAL", 45)
+    rocket = RocketChat("admin", "password", server_url=server.url)
+
+    messages = list(rocket.channels_history("GENERAL", count=20))
+
+    assert [m["msg"] for m in messages[:2]] == ["message 44", "message 43"]
+    assert len(messages) == 45
+    assert len(list(rocket.channels_history("GENERAL", count=50))) == 20
+
+
+def test_errors_match_rocket_chat(server):
+    rocket = RocketChat("admin", "password", server_url=server.url)
+
+    with pytest.raises(RocketApiException) as exc_info:
+        rocket.channels_info(room_id="missing")
+    assert exc_info.value.error_type == "error-room-not-found"
+
+
+def test_rooms_and_messages(server):
+    rocket = RocketChat("admin", "password", server_url=server.url)
+    user_id = rocket.users_create("bob@example.com", "bob", "pw", "bob")["user"]["_id"]
+    room_id = rocket.channels_create("dev")["channel"]["_id"]
+
+    rocket.channels_invite(room_id, user_id)
+    rocket.chat_post_message("fish & chips", room_id=room_id)
+
+    members = list(rocket.channels_members(room_id=room_id))
+    assert {member["username"] for member in members} == {"admin", "bob"}
+    found = list(rocket.chat_search(room_id, "fish & chips"))
+    assert found[0]["msg"] == "fish & chips"
+    assert server.rooms[room_id]["msgs"] == 1
+
+
+def test_room_roles(server):
+    rocket = RocketChat("admin", "password", server_url=server.url)
+    user_id = rocket.users_create("bob@example.com", "bob", "pw", "bob")["user"]["_id"]
+    room_id = rocket.channels_create("dev")["channel"]["_id"]
+
+    with pytest.raises(RocketApiException) as exc_info:
+        rocket.channels_leave(room_id)
+    assert exc_info.value.error_type == "error-you-are-last-owner"
+
+    rocket.channels_invite(room_id, user_id)
+    rocket.channels_add_owner(room_id, user_id=user_id)
+    with pytest.raises(RocketApiException) as exc_info:
+        rocket.channels_add_owner(room_id, username="bob")
+    assert exc_info.value.error_type == "error-user-already-owner"
+
+    roles = rocket.channels_roles(room_id=room_id)["roles"]
+    assert {role["u"]["username"] for role in roles} == {"admin", "bob"}
+    rocket.channels_leave(room_id)
+    assert "admin" not in server.rooms[room_id]["usernames"]
+
+
+def test_unknown_endpoints_are_recorded(server):
+    rocket = RocketChat("admin", "password", server_url=server.url)
+
+    with pytest.raises(RocketApiException):
+        rocket.teams_create("team", 0)
+
+    assert server.take_missing() == [("post", "teams.create")]
+    assert server.take_missing() == []
@@ -14,7 +14,7 @@ def testuser_id(logged_rocket):
     try:
         testuser = logged_rocket.users_info(username="testuser1")
     except RocketApiException as e:
-        if e.error == "User not found":
+        if e.error == "User not found.":
             testuser = logged_rocket.users_create(
                 "testuser1@domain.com",
                 "testuser1",
@@ -0,0 +1,137 @@
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from rocketchat_API.fake_server import FakeRocketChatServer
+from rocketchat_API.instrumentation import (
+    EndpointMetrics,
+    RequestEvent,
+    RequestObserver,
+)
+from rocketchat_API.retry import RetryPolicy
+from rocketchat_API.rocketchat import RocketChat
+from tests.conftest import mock_response
+
+
+class RecordingObserver(RequestObserver):
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, event):
+        self.calls.append(("before", event.method, event.status_code))
+
+    def after_request(self, event):
+        self.calls.append(("after", event.method, event.status_code))
+
+
+class NoSleepRetryPolicy(RetryPolicy):
+    def sleep(self, seconds):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeRocketChatServer() as fake:
+        yield fake
+
+
+def test_observers_see_every_request(server):
+    observer = RecordingObserver()
+    metrics = EndpointMetrics()
+    rocket = RocketChat(
+        "admin", "password", server_url=server.url, observers=[observer, metrics]
+    )
+
+    rocket.channels_info(room_id="GENERAL")
+    rocket.chat_post_message("hello", room_id="GENERAL")
+
+    assert observer.calls == [
+        ("before", "login", None),
+        ("after", "login", 200),
+        ("before", "channels.info", None),
+        ("after", "channels.info", 200),
+        ("before", "chat.postMessage", None),
+        ("after", "chat.postMessage", 200),
+    ]
+    snapshot = metrics.snapshot()
+    info = snapshot[("channels.info", "get")]
+    assert info["count"] == 1
+    assert info["statuses"] == {"200": 1}
+    assert info["bytes_sent"] == 0
+    assert info["bytes_received"] > 0
+    assert info["buckets"][-1] == (float("inf"), 1)
+    assert snapshot[("chat.postMessage", "post")]["bytes_sent"] > 0
+
+
+def test_errors_and_retries_are_counted():
+    session = Mock()
+    session.get.side_effect = [
+        mock_response(status_code=503),
+        mock_response(status_code=429),
+        mock_response(),
+        requests.ConnectionError(),
+        requests.ConnectionError(),
+    ]
+    metrics = EndpointMetrics()
+    rocket = RocketChat(
+        session=session,
+        retry_policy=NoSleepRetryPolicy(max_attempts=2),
+        observers=[metrics],
+    )
+    rocket.rate_limiter.sleep = lambda seconds: None
+
+    rocket.channels_info(room_id="GENERAL")
+    with pytest.raises(requests.ConnectionError):
+        rocket.channels_info(room_id="GENERAL")
+
+    stats = metrics.snapshot()[("channels.info", "get")]
+    assert stats["statuses"] == {"200": 1, "error": 1}
+    # One retry after the 503 and one after the 429, then one for the error
+    assert stats["retries"] == 3
+
+
+def test_histogram_buckets():
+    metrics = EndpointMetrics(buckets=(0.1, 1))
+    for elapsed in (0.05, 0.1, 0.5, 3):
+        event = RequestEvent("users.info", "get")
+        event.elapsed = elapsed
+        event.status_code = 200
+        metrics.after_request(event)
+
+    stats = metrics.snapshot()[("users.info", "get")]
+    assert stats["buckets"] == [(0.1, 2), (1, 3), (float("inf"), 4)]
+    assert stats["seconds"] == pytest.approx(3.65)
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_prometheus_exposition():
+    metrics = EndpointMetrics(buckets=(0.5,))
+    for method, status_code in (
+        ("settings/Site_Name", 200),
+        ("settings/Other", 403),
+        ('odd"name', 200),
+    ):
+        event = RequestEvent(method, "get")
+        event.elapsed = 0.25
+        event.status_code = status_code
+        event.bytes_received = 10
+        metrics.after_request(event)
+
+    text = metrics.to_prometheus()
+
+    assert "# TYPE rocketchat_api_request_duration_seconds histogram" in text
+    labels = 'endpoint="settings/:id",http_method="get"'
+    assert (
+        'rocketchat_api_request_duration_seconds_bucket{%s,le="0.5"} 2' % labels
+    ) in text
+    assert (
+        'rocketchat_api_request_duration_seconds_bucket{%s,le="+Inf"} 2' % labels
+    ) in text
+    assert "rocketchat_api_request_duration_seconds_sum{%s} 0.5" % labels in text
+    assert 'rocketchat_api_requests_total{%s,status="403"} 1' % labels in text
+    assert "rocketchat_api_response_bytes_total{%s} 20" % labels in text
+    assert 'endpoint="odd\\"name"' in text
+    assert text.endswith("\n")
@@ -13,6 +13,7 @@ def test_livechat_inquiries_list(logged_rocket):
     logged_rocket.livechat_inquiries_list()
 
 
+@pytest.mark.real_server_only("the fake server has no livechat inquiries")
 def test_livechat_inquiries_take_non_existent(logged_rocket):
     with pytest.raises(RocketApiException) as exc_info:
         logged_rocket.livechat_inquiries_take(inquiry_id="NotARealThing")
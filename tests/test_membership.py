@@ -0,0 +1,125 @@
+from unittest.mock import Mock
+
+import pytest
+
+from rocketchat_API.batch import map_calls
+from rocketchat_API.fake_server import FakeRocketChatServer
+from rocketchat_API.membership import sync_room_members
+from rocketchat_API.rocketchat import RocketChat
+
+
+def _rocket(members):
+    rocket = Mock()
+    rocket.map_calls.side_effect = lambda calls, max_workers: map_calls(
+        rocket, calls, max_workers
+    )
+
+    def list_members(room_id, count):
+        # Paginated methods return an iterator of the members of all pages
+        return iter({"_id": _id} for _id in members)
+
+    rocket.channels_members.side_effect = list_members
+    rocket.groups_members.side_effect = list_members
+    rocket.teams_members.return_value = iter({"user": {"_id": _id}} for _id in members)
+    return rocket
+
+
+def test_only_differences_are_applied():
+    rocket = _rocket(["a", "b", "c"])
+
+    summary = sync_room_members(rocket, "GENERAL", ["b", "c", "d", "e"])
+
+    assert summary == {
+        "added": ["d", "e"],
+        "removed": ["a"],
+        "unchanged": 2,
+        "errors": {},
+    }
+    assert rocket.channels_invite.call_count == 2
+    rocket.channels_kick.assert_called_once_with("GENERAL", "a")
+
+
+def test_members_are_listed_with_page_size():
+    members = [str(i) for i in range(25)]
+    rocket = _rocket(members)
+
+    summary = sync_room_members(
+        rocket, "room", members, room_type="group", page_size=10
+    )
+
+    assert summary["unchanged"] == 25
+    rocket.groups_members.assert_called_once_with(room_id="room", count=10)
+    rocket.groups_invite.assert_not_called()
+    rocket.groups_kick.assert_not_called()
+
+
+def test_remove_can_be_disabled():
+    rocket = _rocket(["a"])
+
+    summary = sync_room_members(rocket, "GENERAL", ["b"], remove=False)
+
+    assert summary["removed"] == []
+    rocket.channels_kick.assert_not_called()
+
+
+def test_errors_are_reported_per_user():
+    rocket = _rocket([])
+
+    def invite(room_id, user_id):
+        if user_id == "b":
+            raise RuntimeError("invite failed")
+        return {"success": True}
+
+    rocket.channels_invite.side_effect = invite
+
+    summary = sync_room_members(rocket, "GENERAL", ["a", "b"])
+
+    assert summary["added"] == ["a"]
+    assert list(summary["errors"]) == ["b"]
+
+
+def test_team_additions_are_grouped():
+    rocket = _rocket(["a"])
+
+    summary = sync_room_members(
+        rocket, "team", ["b", "c", "d"], room_type="team", page_size=2
+    )
+
+    assert summary["added"] == ["b", "c", "d"]
+    assert summary["removed"] == ["a"]
+    assert rocket.teams_add_members.call_count == 2
+    rocket.teams_remove_member.assert_called_once_with(team_id="team", user_id="a")
+
+
+def test_unknown_room_type():
+    with pytest.raises(ValueError):
+        sync_room_members(Mock(), "room", [], room_type="dm")
+
+
+@pytest.mark.parametrize("room_type", ["channel", "group"])
+def test_sync_against_fake_server(room_type):
+    with FakeRocketChatServer() as server:
+        alice = server.add_user("alice")
+        bob = server.add_user("bob")
+        room_id = "GENERAL"
+        if room_type == "group":
+            room_id = server.add_room("private", room_type="p", members=["admin"])[
+                "_id"
+            ]
+        rocket = RocketChat("admin", "password", server_url=server.url)
+        admin_id = rocket.auth.user_id
+
+        summary = sync_room_members(
+            rocket, room_id, [admin_id, alice["_id"]], room_type=room_type
+        )
+        members = {
+            member["_id"]
+            for member in getattr(rocket, room_type + "s_members")(room_id=room_id)
+        }
+
+    assert summary["errors"] == {}
+    assert members == {admin_id, alice["_id"]}
+    if room_type == "channel":
+        assert summary["removed"] == [bob["_id"]]
+    else:
+        assert summary["added"] == [alice["_id"]]
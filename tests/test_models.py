@@ -0,0 +1,100 @@
+import asyncio
+import json
+import sys
+from unittest.mock import Mock
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from rocketchat_API.models import Message, Room, Subscription, User
+from rocketchat_API.rocketchat import AsyncRocketChat, RocketChat
+from tests.conftest import mock_response
+
+MESSAGE = {
+    "_id": "m1",
+    "rid": "GENERAL",
+    "msg": "hello",
+    "ts": "2024-01-01T00:00:00.000Z",
+    "u": {"_id": "u1", "username": "john", "name": "John"},
+    "_updatedAt": "2024-01-01T00:00:00.000Z",
+    "urls": [],
+    "mentions": [],
+    "channels": [],
+    "md": [{"type": "PARAGRAPH", "value": [{"type": "PLAIN_TEXT", "value": "hello"}]}],
+}
+
+
+def test_from_dict_keeps_only_model_attributes():
+    message = Message.from_dict(MESSAGE)
+
+    assert message.id == "m1"
+    assert message.username == "john"
+    assert message.user_id == "u1"
+    assert message.thread_id is None
+    assert not hasattr(message, "__dict__")
+    with pytest.raises(AttributeError):
+        message.md = []
+    assert message == Message(**message.to_dict())
+    assert repr(message).startswith("Message(id='m1', room_id='GENERAL'")
+
+
+def _containers_size(value):
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(map(_containers_size, value.values()))
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(map(_containers_size, value))
+    return 0
+
+
+def test_models_use_less_memory_than_dicts():
+    message = Message.from_dict(MESSAGE)
+
+    assert sys.getsizeof(message) * 3 < _containers_size(MESSAGE)
+
+
+def test_projection_requests_top_level_keys():
+    assert json.loads(Message.projection()) == {
+        "_id": 1,
+        "rid": 1,
+        "msg": 1,
+        "ts": 1,
+        "u": 1,
+        "tmid": 1,
+        "_updatedAt": 1,
+    }
+    assert Room.from_dict({"_id": "r", "t": "c", "usersCount": 3}).users_count == 3
+    subscription = Subscription.from_dict({"rid": "r", "unread": 2})
+    assert subscription.room_id == "r" and subscription.unread == 2
+
+
+def _query(session):
+    return parse_qs(urlsplit(session.get.call_args[0][0]).query)
+
+
+def _session():
+    session = Mock()
+    session.get.return_value = mock_response(
+        {"users": [{"_id": "1", "username": "john"}]}
+    )
+    return session
+
+
+def test_paginated_methods_convert_and_project():
+    session = _session()
+    rocket = RocketChat(session=session)
+
+    users = list(rocket.users_list(model=User))
+
+    assert users == [User(id="1", username="john")]
+    assert "username" in json.loads(_query(session)["fields"][0])
+
+    list(rocket.users_list(model=User, fields='{"name": 1}'))
+    assert json.loads(_query(session)["fields"][0]) == {"name": 1}
+
+
+def test_async_paginated_methods_convert():
+    async def collect():
+        async with AsyncRocketChat(session=_session()) as rocket:
+            return [user async for user in rocket.users_list(model=User)]
+
+    assert [user.username for user in asyncio.run(collect())] == ["john"]
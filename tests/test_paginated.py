@@ -1,3 +1,6 @@
+import asyncio
+import threading
+import time
 from typing import Any
 
 from rocketchat_API.APISections.base import paginated
@@ -133,3 +136,127 @@ def test_empty_response_with_max_count():
 
     assert len(result) == 0
     assert api.call_count == 1
+
+
+class AsyncMockAPI(MockAPI):
+    async def _fetch(self, offset: int, count: int) -> Any:
+        self.call_count += 1
+        end = min(offset + count, self.total_items)
+        return {"items": [{"id": i} for i in range(offset, end)], "success": True}
+
+    @paginated("items")
+    def get_items(self, **kwargs: Any) -> Any:
+        return self._fetch(kwargs.get("offset", 0), kwargs.get("count", 50))
+
+
+async def _collect(gen: Any) -> list[Any]:
+    return [item async for item in gen]
+
+
+def test_async_pagination():
+    api = AsyncMockAPI(total_items=150)
+    result = asyncio.run(_collect(api.get_items(count=50)))
+
+    assert [item["id"] for item in result] == list(range(150))
+    assert api.call_count == 4
+
+
+def test_async_pagination_max_count():
+    api = AsyncMockAPI(total_items=150)
+    result = asyncio.run(_collect(api.get_items(count=50, max_count=100)))
+
+    assert len(result) == 100
+    assert api.call_count == 2
+
+
+def test_async_pagination_max_count_zero():
+    api = AsyncMockAPI(total_items=150)
+    result = asyncio.run(_collect(api.get_items(max_count=0)))
+
+    assert len(result) == 0
+    assert api.call_count == 0
+
+
+class TotalMockAPI(MockAPI):
+    def __init__(self, total_items: int, delay: float = 0) -> None:
+        super().__init__(total_items)
+        self.delay = delay
+        self.threads: set[str] = set()
+        self.lock = threading.Lock()
+
+    @paginated("items")
+    def get_items(self, **kwargs: Any) -> Any:
+        with self.lock:
+            self.call_count += 1
+            self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        offset = kwargs.get("offset", 0)
+        end = min(offset + kwargs.get("count", 50), self.total_items)
+        items = [{"id": i} for i in range(offset, end)]
+        return {"items": items, "total": self.total_items, "success": True}
+
+
+def test_prefetch_keeps_order():
+    api = TotalMockAPI(total_items=1000)
+    result = list(api.get_items(count=10, prefetch=4))
+
+    assert [item["id"] for item in result] == list(range(1000))
+    assert api.call_count == 100
+    assert len(api.threads) > 1
+
+
+def test_prefetch_is_concurrent():
+    api = TotalMockAPI(total_items=100, delay=0.05)
+    start = time.monotonic()
+    result = list(api.get_items(count=10, workers=10))
+
+    assert len(result) == 100
+    assert time.monotonic() - start < 0.05 * 5
+
+
+def test_prefetch_with_max_count_does_not_overfetch():
+    api = TotalMockAPI(total_items=150)
+    result = list(api.get_items(count=50, max_count=100, prefetch=8))
+
+    assert len(result) == 100
+    assert api.call_count == 2
+
+
+def test_prefetch_with_offset():
+    api = TotalMockAPI(total_items=150)
+    result = list(api.get_items(offset=25, count=50, prefetch=2))
+
+    assert [item["id"] for item in result] == list(range(25, 150))
+
+
+def test_prefetch_falls_back_without_total():
+    api = MockAPI(total_items=150)
+    result = list(api.get_items(count=50, prefetch=4))
+
+    assert len(result) == 150
+    assert api.call_count == 4
+
+
+def test_prefetch_stops_on_early_exit():
+    api = TotalMockAPI(total_items=1000)
+    gen = api.get_items(count=10, prefetch=2)
+    first = [next(gen) for _ in range(15)]
+    gen.close()
+
+    assert first[-1]["id"] == 14
+    assert api.call_count <= 4
+
+
+class AsyncTotalMockAPI(AsyncMockAPI):
+    async def _fetch(self, offset: int, count: int) -> Any:
+        data = await super()._fetch(offset, count)
+        data["total"] = self.total_items
+        return data
+
+
+def test_async_prefetch():
+    api = AsyncTotalMockAPI(total_items=1000)
+    result = asyncio.run(_collect(api.get_items(count=10, prefetch=4)))
+
+    assert [item["id"] for item in result] == list(range(1000))
+    assert api.call_count == 100
@@ -0,0 +1,101 @@
+import pytest
+
+from rocketchat_API.fake_server import FakeRocketChatServer
+from rocketchat_API.models import Message
+from rocketchat_API.pool import LEAST_LOADED, RocketChatPool
+from rocketchat_API.rate_limit import RateLimiter
+from rocketchat_API.rocketchat import RocketChat
+
+BOTS = ["bot1", "bot2", "bot3"]
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeRocketChatServer() as fake:
+        for bot in BOTS:
+            fake.add_user(bot)
+        fake.add_messages("GENERAL", 20)
+        yield fake
+
+
+def _pool(server, **kwargs):
+    accounts = [(bot, "password") for bot in BOTS]
+    return RocketChatPool(accounts, server_url=server.url, **kwargs)
+
+
+def test_round_robin(server):
+    with _pool(server) as pool:
+        usernames = [pool.me()["username"] for _ in range(6)]
+
+    assert usernames == BOTS * 2
+
+
+def test_least_loaded(server):
+    pool = _pool(server, strategy=LEAST_LOADED)
+
+    walk = pool.channels_history("GENERAL", count=5)
+    next(walk)
+    assert pool.in_flight() == [1, 0, 0]
+    usernames = [pool.me()["username"] for _ in range(3)]
+    walk.close()
+
+    assert usernames == ["bot2", "bot3", "bot2"]
+    assert pool.in_flight() == [0, 0, 0]
+
+
+@pytest.mark.parametrize("kwargs", [{"max_count": 3}, {"model": Message}])
+def test_limited_walk_is_counted_until_closed(server, kwargs):
+    pool = _pool(server, strategy=LEAST_LOADED)
+
+    walk = pool.channels_history("GENERAL", count=5, **kwargs)
+    next(walk)
+    assert pool.in_flight() == [1, 0, 0]
+    walk.close()
+
+    assert pool.in_flight() == [0, 0, 0]
+
+
+def test_exhausted_walk_is_released(server):
+    pool = _pool(server)
+
+    messages = list(pool.channels_history("GENERAL", count=5))
+
+    assert len(messages) == len(server.messages["GENERAL"])
+    with pool.lease() as rocket:
+        assert pool.in_flight() == [0, 1, 0]
+        assert rocket.me()["username"] == "bot2"
+    assert pool.in_flight() == [0, 0, 0]
+
+
+def test_accounts_from_tokens_and_clients(server):
+    logged = RocketChat("bot1", "password", server_url=server.url)
+    token = RocketChat("bot2", "password", server_url=server.url).auth
+    pool = RocketChatPool(
+        [logged, {"auth_token": token.auth_token, "user_id": token.user_id}],
+        server_url=server.url,
+    )
+
+    assert pool.clients[0] is logged
+    assert [pool.me()["username"] for _ in range(2)] == ["bot1", "bot2"]
+
+
+def test_each_client_has_its_own_rate_limiter(server):
+    pool = _pool(server)
+
+    assert len({id(client.rate_limiter) for client in pool.clients}) == 3
+    with pytest.raises(ValueError):
+        _pool(server, rate_limiter=RateLimiter())
+
+
+def test_batch_is_spread_over_the_accounts(server):
+    pool = _pool(server)
+
+    results = pool.batch([("me", ())] * 9, max_workers=3)
+
+    assert sorted(result.result()["username"] for result in results) == sorted(BOTS * 3)
+    assert pool.in_flight() == [0, 0, 0]
+
+
+def test_unknown_attribute(server):
+    with pytest.raises(AttributeError):
+        _pool(server).no_such_method()
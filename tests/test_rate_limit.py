@@ -0,0 +1,132 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from rocketchat_API.APIExceptions.RocketExceptions import (
+    RocketBadStatusCodeException,
+)
+from rocketchat_API.rate_limit import RateLimiter
+from rocketchat_API.rocketchat import RocketChat
+from tests.conftest import mock_response
+
+
+class FakeClockRateLimiter(RateLimiter):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limit_headers(limit, remaining, reset_in):
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int((time.time() + reset_in) * 1000)),
+    }
+
+
+def test_unknown_endpoint_is_not_delayed():
+    limiter = FakeClockRateLimiter()
+    for _ in range(100):
+        limiter.acquire("channels.info")
+
+    assert limiter.sleeps == []
+
+
+def test_budget_is_refilled_once_per_window():
+    limiter = FakeClockRateLimiter()
+    limiter.update("channels.info", mock_response(headers=_limit_headers(10, 10, 5)))
+
+    for _ in range(30):
+        limiter.acquire("channels.info")
+
+    # No fresh headers came in, every window still allows 10 requests
+    assert len(limiter.sleeps) == 2
+    assert sum(limiter.sleeps) == pytest.approx(10, abs=0.1)
+
+
+def test_zero_limit_is_not_enforced():
+    limiter = FakeClockRateLimiter()
+    limiter.update("channels.info", mock_response(headers=_limit_headers(0, 0, 5)))
+
+    limiter.acquire("channels.info")
+
+    assert limiter.sleeps == []
+
+
+def test_waits_for_reset_when_budget_is_used():
+    limiter = FakeClockRateLimiter()
+    limiter.update("channels.info", mock_response(headers=_limit_headers(10, 2, 5)))
+
+    limiter.acquire("channels.info")
+    limiter.acquire("channels.info")
+    assert limiter.sleeps == []
+
+    limiter.acquire("channels.info")
+    assert len(limiter.sleeps) == 1
+    assert 4 < limiter.sleeps[0] <= 5
+
+
+def test_budget_is_tracked_per_endpoint():
+    limiter = FakeClockRateLimiter()
+    limiter.update("channels.info", mock_response(headers=_limit_headers(10, 0, 5)))
+
+    limiter.acquire("users.info")
+    assert limiter.sleeps == []
+
+
+def test_headers_that_are_not_numbers_are_ignored():
+    limiter = FakeClockRateLimiter()
+    limiter.update("channels.info", Mock())
+    limiter.acquire("channels.info")
+
+    assert limiter.sleeps == []
+
+
+def test_429_is_retried_after_reset():
+    limiter = FakeClockRateLimiter()
+    session = Mock()
+    session.get.side_effect = [
+        mock_response(status_code=429, headers={"Retry-After": "2"}),
+        mock_response(payload={"channel": {"_id": "GENERAL"}}),
+    ]
+    rocket = RocketChat(session=session, rate_limiter=limiter)
+
+    result = rocket.channels_info(room_id="GENERAL")
+
+    assert result["channel"]["_id"] == "GENERAL"
+    assert session.get.call_count == 2
+    assert limiter.sleeps == [2]
+
+
+def test_429_retries_are_bounded():
+    limiter = FakeClockRateLimiter(max_retries=2)
+    session = Mock()
+    session.get.return_value = mock_response(
+        status_code=429, headers={"Retry-After": "1"}
+    )
+    rocket = RocketChat(session=session, rate_limiter=limiter)
+
+    with pytest.raises(RocketBadStatusCodeException):
+        rocket.channels_info(room_id="GENERAL")
+    assert session.get.call_count == 3
+
+
+def test_rate_limiter_can_be_disabled():
+    session = Mock()
+    session.get.return_value = mock_response(
+        status_code=429, headers={"Retry-After": "1"}
+    )
+    rocket = RocketChat(session=session, rate_limiter=False)
+
+    with pytest.raises(RocketBadStatusCodeException):
+        rocket.channels_info(room_id="GENERAL")
+    assert session.get.call_count == 1
@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+
+from rocketchat_API.APIExceptions.RocketExceptions import (
+    RocketAuthenticationException,
+)
+from rocketchat_API.realtime import RocketChatRealtime
+
+websockets = pytest.importorskip("websockets")
+
+TOKEN = "token"
+
+
+class FakeDDPServer:
+    """Minimal DDP server: accepts logins with TOKEN and answers every
+    subscription by pushing one event for it."""
+
+    def __init__(self):
+        self.received = []
+
+    async def handler(self, websocket):
+        async for raw in websocket:
+            message = json.loads(raw)
+            self.received.append(message)
+            kind = message.get("msg")
+            if kind == "connect":
+                await websocket.send(json.dumps({"msg": "ping"}))
+                await websocket.send(json.dumps({"msg": "connected", "session": "s"}))
+            elif kind == "method":
+                if message["params"][0].get("resume") == TOKEN:
+                    reply = {"msg": "result", "id": message["id"], "result": {}}
+                else:
+                    reply = {"msg": "result", "id": message["id"], "error": {}}
+                await websocket.send(json.dumps(reply))
+            elif kind == "sub":
+                await websocket.send(
+                    json.dumps({"msg": "ready", "subs": [message["id"]]})
+                )
+                event = {
+                    "msg": "changed",
+                    "collection": message["name"],
+                    "id": "id",
+                    "fields": {
+                        "eventName": message["params"][0],
+                        "args": [{"msg": "hello"}],
+                    },
+                }
+                await websocket.send(json.dumps(event))
+
+
+def _run(scenario):
+    async def main():
+        server = FakeDDPServer()
+        async with websockets.serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            url = f"http://127.0.0.1:{port}"
+            return await asyncio.wait_for(scenario(server, url), 5)
+
+    return asyncio.run(main())
+
+
+def test_room_messages_async_iterator():
+    async def scenario(server, url):
+        async with RocketChatRealtime(url, TOKEN, "uid") as realtime:
+            subscription = await realtime.subscribe_room_messages("GENERAL")
+            event = await subscription.__anext__()
+        assert {"msg": "pong"} in server.received
+        return event
+
+    event = _run(scenario)
+
+    assert event.stream == "stream-room-messages"
+    assert event.event_name == "GENERAL"
+    assert event.args == [{"msg": "hello"}]
+
+
+def test_user_events_callback():
+    async def scenario(server, url):
+        events = asyncio.Queue()
+        async with RocketChatRealtime(url, TOKEN, "uid") as realtime:
+            await realtime.subscribe_user("notification", callback=events.put)
+            return await events.get()
+
+    event = _run(scenario)
+
+    assert event.event_name == "uid/notification"
+
+
+def test_iteration_ends_when_connection_closes():
+    async def scenario(server, url):
+        realtime = await RocketChatRealtime(url, TOKEN, "uid").connect()
+        subscription = await realtime.subscribe_room_messages("GENERAL")
+        await realtime.close()
+        return [event async for event in subscription]
+
+    assert len(_run(scenario)) == 1
+
+
+def test_invalid_token():
+    async def scenario(server, url):
+        await RocketChatRealtime(url, "wrong", "uid").connect()
+
+    with pytest.raises(RocketAuthenticationException):
+        _run(scenario)
+
+
+def test_from_rest_client():
+    rocket = type("Rocket", (), {})()
+    rocket.server_url = "https://chat.example.com"
+    rocket.headers = {"X-Auth-Token": TOKEN, "X-User-Id": "uid"}
+
+    realtime = RocketChatRealtime.from_rest(rocket)
+
+    assert realtime.url == "wss://chat.example.com/websocket"
+    assert realtime.auth_token == TOKEN
+    assert realtime.user_id == "uid"
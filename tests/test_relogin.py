@@ -0,0 +1,107 @@
+import asyncio
+import threading
+
+import pytest
+
+from rocketchat_API.APIExceptions.RocketExceptions import (
+    RocketBadStatusCodeException,
+)
+from rocketchat_API.fake_server import FakeRocketChatServer
+from rocketchat_API.instrumentation import RequestObserver
+from rocketchat_API.rocketchat import AsyncRocketChat, RocketChat
+
+
+class CallCounter(RequestObserver):
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def after_request(self, event):
+        with self._lock:
+            self.calls.append((event.method, event.status_code, event.retries))
+
+    def count(self, method):
+        return sum(1 for call in self.calls if call[0] == method)
+
+
+@pytest.fixture
+def server():
+    with FakeRocketChatServer(max_page_size=10) as fake:
+        fake.add_messages("GENERAL", 35)
+        yield fake
+
+
+def _rocket(server, **kwargs):
+    counter = CallCounter()
+    rocket = RocketChat(
+        "admin", "password", server_url=server.url, observers=[counter], **kwargs
+    )
+    return rocket, counter
+
+
+def test_walk_continues_after_the_token_expired(server):
+    rocket, counter = _rocket(server, relogin=True)
+    walk = rocket.channels_history("GENERAL", count=10)
+    messages = [next(walk) for _ in range(15)]
+
+    server.expire_tokens()
+    messages.extend(walk)
+
+    assert [message["_id"] for message in messages] == [
+        message["_id"] for message in reversed(server.messages["GENERAL"])
+    ]
+    assert counter.count("login") == 2
+    # The rejected page is sent again, the walk doesn't start over
+    assert counter.count("channels.history") == 4
+    assert ("channels.history", 200, 1) in counter.calls
+
+
+def test_concurrent_requests_share_one_login(server):
+    rocket, counter = _rocket(server, relogin=True, thread_safe=True)
+    server.expire_tokens()
+    errors = []
+
+    def read():
+        try:
+            rocket.me()
+        except Exception as e:  # skipcq: PYL-W0703
+            errors.append(e)
+
+    workers = [threading.Thread(target=read) for _ in range(12)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+    assert counter.count("login") == 2
+
+
+def test_no_relogin_by_default(server):
+    rocket, counter = _rocket(server)
+    server.expire_tokens()
+
+    with pytest.raises(RocketBadStatusCodeException):
+        rocket.me()
+    assert counter.count("login") == 1
+
+
+def test_no_relogin_after_logout(server):
+    rocket, counter = _rocket(server, relogin=True)
+
+    rocket.logout()
+
+    with pytest.raises(RocketBadStatusCodeException):
+        rocket.me()
+    assert counter.count("login") == 1
+
+
+def test_async_relogin(server):
+    async def run():
+        async with AsyncRocketChat(
+            "admin", "password", server_url=server.url, relogin=True
+        ) as rocket:
+            server.expire_tokens()
+            return await rocket.me()
+
+    assert asyncio.run(run())["username"] == "admin"
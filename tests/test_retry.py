@@ -0,0 +1,118 @@
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from rocketchat_API.APIExceptions.RocketExceptions import (
+    RocketBadStatusCodeException,
+)
+from rocketchat_API.retry import RetryPolicy
+from rocketchat_API.rocketchat import RocketChat
+from tests.conftest import mock_response
+
+
+class NoSleepRetryPolicy(RetryPolicy):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _rocket(session, **policy_kwargs):
+    policy = NoSleepRetryPolicy(**policy_kwargs)
+    return RocketChat(session=session, retry_policy=policy), policy
+
+
+def test_get_is_retried_on_transient_status():
+    session = Mock()
+    session.get.side_effect = [
+        mock_response(status_code=502),
+        mock_response(status_code=503),
+        mock_response(),
+    ]
+    rocket, policy = _rocket(session, jitter=False)
+
+    assert rocket.channels_info(room_id="GENERAL") == {"success": True}
+    assert session.get.call_count == 3
+    assert policy.sleeps == [0.5, 1.0]
+
+
+def test_get_is_retried_on_connection_error():
+    session = Mock()
+    session.get.side_effect = [requests.ConnectionError(), mock_response()]
+    rocket, _ = _rocket(session)
+
+    assert rocket.channels_info(room_id="GENERAL") == {"success": True}
+
+
+def test_gives_up_after_max_attempts():
+    session = Mock()
+    session.get.return_value = mock_response(status_code=503)
+    rocket, _ = _rocket(session, max_attempts=4)
+
+    with pytest.raises(RocketBadStatusCodeException):
+        rocket.channels_info(room_id="GENERAL")
+    assert session.get.call_count == 4
+
+
+def test_last_exception_is_raised():
+    session = Mock()
+    session.get.side_effect = requests.Timeout()
+    rocket, _ = _rocket(session)
+
+    with pytest.raises(requests.Timeout):
+        rocket.channels_info(room_id="GENERAL")
+    assert session.get.call_count == 3
+
+
+def test_deadline_stops_retries():
+    session = Mock()
+    session.get.return_value = mock_response(status_code=503)
+    rocket, _ = _rocket(session, max_attempts=10, jitter=False, deadline=2)
+
+    with pytest.raises(RocketBadStatusCodeException):
+        rocket.channels_info(room_id="GENERAL")
+    # Waits 0.5 and 1, the next 2 seconds wait would exceed the deadline
+    assert session.get.call_count == 3
+
+
+def test_non_idempotent_post_is_not_retried():
+    session = Mock()
+    session.post.return_value = mock_response(status_code=503)
+    rocket, _ = _rocket(session)
+
+    with pytest.raises(RocketBadStatusCodeException):
+        rocket.chat_post_message("hello", room_id="GENERAL")
+    assert session.post.call_count == 1
+
+
+def test_idempotent_post_is_retried():
+    session = Mock()
+    session.post.side_effect = [mock_response(status_code=502), mock_response()]
+    rocket, _ = _rocket(session)
+
+    assert rocket.subscriptions_read("GENERAL") == {"success": True}
+    assert session.post.call_count == 2
+
+
+def test_other_statuses_are_not_retried():
+    session = Mock()
+    session.get.return_value = mock_response(status_code=500)
+    rocket, _ = _rocket(session)
+
+    with pytest.raises(RocketBadStatusCodeException):
+        rocket.channels_info(room_id="GENERAL")
+    assert session.get.call_count == 1
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+
+    assert all(0 <= policy.backoff(attempt) <= 5 for attempt in range(1, 20))
@@ -49,7 +49,9 @@ def test_login_token(logged_rocket):
     user_id = logged_rocket.headers["X-User-Id"]
     auth_token = logged_rocket.headers["X-Auth-Token"]
 
-    another_rocket = RocketChat(user_id=user_id, auth_token=auth_token)
+    another_rocket = RocketChat(
+        user_id=user_id, auth_token=auth_token, server_url=logged_rocket.server_url
+    )
     logged_user = another_rocket.me()
 
     assert logged_user.get("_id") == user_id
@@ -0,0 +1,140 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from rocketchat_API.APIExceptions.RocketExceptions import RocketApiException
+from rocketchat_API.directory import RoomDirectory
+from rocketchat_API.retry import RetryPolicy
+from rocketchat_API.rocketchat import RocketChat
+from rocketchat_API.streaming import iter_json_items
+from tests.conftest import mock_response
+
+
+def _chunks(text, size):
+    data = text.encode()
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def _collect(chunks, key):
+    items = []
+    gen = iter_json_items(chunks, key)
+    while True:
+        try:
+            items.append(next(gen))
+        except StopIteration as stop:
+            return items, stop.value
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_items_are_decoded_across_chunks(size):
+    body = {
+        "offset": 0,
+        "users": [{"_id": "1", "name": "Zoë 🚀"}, {"_id": "2", "n": 12345}, 6789],
+        "total": 1234567,
+        "success": True,
+    }
+    text = json.dumps(body, ensure_ascii=False, indent=1)
+
+    items, fields = _collect(_chunks(text, size), "users")
+
+    assert items == body["users"]
+    assert fields == {"offset": 0, "total": 1234567, "success": True}
+
+
+def test_missing_or_empty_arrays():
+    assert _collect([b'{"users": [], "total": 0}'], "users") == ([], {"total": 0})
+    assert _collect([b'{"total": 0}'], "users") == ([], {"total": 0})
+    assert _collect([b"{}"], "users") == ([], {})
+
+
+def test_truncated_body_raises():
+    with pytest.raises(json.JSONDecodeError):
+        _collect([b'{"users": [{"_id": "1"}, {"_id"'], "users")
+
+
+def _rocket(users, count):
+    session = Mock()
+
+    def get(url, **kwargs):
+        assert kwargs["stream"] is True
+        offset = int(url.split("offset=")[1].split("&")[0])
+        page = users[offset : offset + count]
+        return mock_response({"users": page, "total": len(users)}, chunk_size=5)
+
+    session.get.side_effect = get
+    return RocketChat(session=session), session
+
+
+def test_paginated_stream():
+    users = [{"_id": str(i)} for i in range(5)]
+    rocket, session = _rocket(users, count=2)
+
+    assert list(rocket.users_list(count=2, stream=True)) == users
+    assert session.get.call_count == 3
+
+    assert list(rocket.users_list(count=2, stream=True, max_count=3)) == users[:3]
+
+
+def test_paginated_stream_closes_responses():
+    response = mock_response({"users": [{"_id": "1"}, {"_id": "2"}]}, chunk_size=5)
+    session = Mock()
+    session.get.return_value = response
+    rocket = RocketChat(session=session)
+
+    users = rocket.users_list(count=2, stream=True)
+    next(users)
+    users.close()
+
+    assert response.close.called
+
+
+def test_paginated_stream_errors():
+    session = Mock()
+    session.get.return_value = mock_response(
+        {"success": False, "error": "unauthorized"}, status_code=403
+    )
+    rocket = RocketChat(session=session)
+
+    with pytest.raises(RocketApiException):
+        rocket.users_list(stream=True)
+    with pytest.raises(ValueError):
+        rocket.users_list(stream=True, prefetch=2)
+
+
+def test_stream_with_room_directory():
+    session = Mock()
+
+    def get(url, **kwargs):
+        if "/rooms.get" in url:
+            # The refresh of the directory is a regular request
+            assert "stream" not in kwargs
+            room = {"_id": "NEW", "name": "unknown", "t": "c"}
+            return mock_response({"update": [room], "remove": []})
+        assert kwargs["stream"] is True
+        assert "roomId=NEW" in url
+        return mock_response({"members": [{"_id": "1"}], "total": 1}, chunk_size=5)
+
+    session.get.side_effect = get
+    rocket = RocketChat(session=session)
+    rocket.room_directory = RoomDirectory(rocket, min_refresh_interval=0)
+    rocket.room_directory.watermark = "2024-01-01T00:00:00.000Z"
+
+    assert list(rocket.channels_members(channel="unknown", stream=True)) == [
+        {"_id": "1"}
+    ]
+
+
+def test_retried_stream_responses_are_closed():
+    unavailable = mock_response(status_code=503)
+    limited = mock_response(status_code=429, headers={"Retry-After": "0"})
+    page = mock_response({"users": [{"_id": "1"}], "total": 1}, chunk_size=5)
+    session = Mock()
+    session.get.side_effect = [unavailable, limited, page]
+    policy = RetryPolicy(max_attempts=2)
+    policy.sleep = lambda seconds: None
+    rocket = RocketChat(session=session, retry_policy=policy)
+
+    assert list(rocket.users_list(stream=True)) == [{"_id": "1"}]
+    assert unavailable.close.called
+    assert limited.close.called
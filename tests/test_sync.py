@@ -0,0 +1,131 @@
+from unittest.mock import Mock
+
+from rocketchat_API.sync import EPOCH, SyncEngine
+
+
+def _message(_id, updated_at, **fields):
+    return {"_id": _id, "_updatedAt": updated_at, **fields}
+
+
+def test_first_sync_starts_from_since():
+    rocket = Mock()
+    rocket.chat_sync_messages.return_value = {
+        "result": {
+            "updated": [_message("1", "2024-01-01T00:00:00.000Z")],
+            "deleted": [],
+        }
+    }
+    engine = SyncEngine(rocket)
+
+    assert engine.sync_room("GENERAL") == (1, 0)
+    rocket.chat_sync_messages.assert_called_once_with("GENERAL", EPOCH)
+    assert list(engine.store.get("GENERAL")) == ["1"]
+
+
+def test_next_sync_only_fetches_changes():
+    rocket = Mock()
+    rocket.chat_sync_messages.side_effect = [
+        {
+            "result": {
+                "updated": [
+                    _message("1", "2024-01-01T00:00:00.000Z", msg="a"),
+                    _message("2", "2024-01-02T00:00:00.000Z", msg="b"),
+                ],
+                "deleted": [],
+            }
+        },
+        {
+            "result": {
+                "updated": [_message("1", "2024-01-03T00:00:00.000Z", msg="edited")],
+                "deleted": [{"_id": "2", "_deletedAt": "2024-01-04T00:00:00.000Z"}],
+            }
+        },
+    ]
+    engine = SyncEngine(rocket)
+
+    engine.sync_room("GENERAL")
+    engine.sync_room("GENERAL")
+
+    rocket.chat_sync_messages.assert_called_with("GENERAL", "2024-01-02T00:00:00.000Z")
+    assert engine.store.get("GENERAL") == {
+        "1": _message("1", "2024-01-03T00:00:00.000Z", msg="edited")
+    }
+    assert engine.store.get_watermark("GENERAL") == "2024-01-04T00:00:00.000Z"
+
+
+def test_watermark_is_kept_without_changes():
+    rocket = Mock()
+    rocket.chat_sync_messages.return_value = {"result": {"updated": [], "deleted": []}}
+    engine = SyncEngine(rocket, since="2024-01-01T00:00:00.000Z")
+
+    engine.sync_room("GENERAL")
+
+    assert engine.store.get_watermark("GENERAL") == "2024-01-01T00:00:00.000Z"
+
+
+def test_deleted_messages_fallback():
+    rocket = Mock()
+    rocket.chat_sync_messages.return_value = {
+        "result": {"updated": [_message("1", "2024-01-01T00:00:00.000Z")]}
+    }
+    rocket.chat_get_deleted_messages.return_value = iter([{"_id": "1"}])
+    engine = SyncEngine(rocket)
+
+    assert engine.sync_room("GENERAL") == (1, 1)
+    assert engine.store.get("GENERAL") == {}
+
+
+def test_sync_rooms_concurrently():
+    rocket = Mock()
+    rocket.chat_sync_messages.side_effect = lambda room_id, since: {
+        "result": {
+            "updated": [_message(room_id + "-1", "2024-01-01T00:00:00.000Z")],
+            "deleted": [],
+        }
+    }
+    engine = SyncEngine(rocket, max_workers=4)
+    room_ids = [str(i) for i in range(20)]
+
+    assert engine.sync_rooms(room_ids) == {room_id: (1, 0) for room_id in room_ids}
+    assert all(engine.store.get(room_id) for room_id in room_ids)
+
+
+def test_sync_roles_and_subscriptions():
+    rocket = Mock()
+    rocket.roles_sync.return_value = {
+        "roles": {
+            "update": [_message("admin", "2024-01-01T00:00:00.000Z")],
+            "remove": [],
+        }
+    }
+    rocket.subscriptions_get.return_value = {
+        "update": [_message("sub", "2024-01-02T00:00:00.000Z")],
+        "remove": [{"_id": "old", "_deletedAt": "2024-01-03T00:00:00.000Z"}],
+    }
+    engine = SyncEngine(rocket)
+
+    assert engine.sync_roles() == (1, 0)
+    assert engine.sync_subscriptions() == (1, 1)
+    engine.sync_subscriptions()
+
+    rocket.subscriptions_get.assert_called_with(updatedSince="2024-01-03T00:00:00.000Z")
+    assert list(engine.store.get("roles")) == ["admin"]
+
+
+def test_sync_threads():
+    rocket = Mock()
+    rocket.chat_sync_thread_list.return_value = {
+        "threads": {"update": [_message("t1", "2024-01-01T00:00:00.000Z")]}
+    }
+    rocket.chat_sync_thread_messages.return_value = {
+        "messages": {
+            "update": [_message("m1", "2024-01-02T00:00:00.000Z")],
+            "remove": [],
+        }
+    }
+    engine = SyncEngine(rocket)
+
+    assert engine.sync_threads("GENERAL") == (1, 0)
+    assert engine.sync_thread_messages("t1") == (1, 0)
+    assert list(engine.store.get("threads:GENERAL")) == ["t1"]
+    assert list(engine.store.get("thread:t1")) == ["m1"]
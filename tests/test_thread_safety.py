@@ -0,0 +1,137 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from rocketchat_API.fake_server import FakeRocketChatServer
+from rocketchat_API.instrumentation import RequestObserver
+from rocketchat_API.rocketchat import RocketChat
+from rocketchat_API.transport import RequestsTransport
+from tests.conftest import mock_response
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeRocketChatServer() as fake:
+        fake.add_user("alice")
+        fake.add_user("bob")
+        yield fake
+
+
+def _hammer(threads):
+    errors = []
+
+    def run(target):
+        try:
+            target()
+        except Exception as e:  # skipcq: PYL-W0703
+            errors.append(e)
+
+    workers = [threading.Thread(target=run, args=(target,)) for target in threads]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return errors
+
+
+def test_logins_while_requests_are_in_flight(server):
+    rocket = RocketChat("alice", "password", server_url=server.url, thread_safe=True)
+    usernames = set()
+
+    def read():
+        for _ in range(30):
+            usernames.add(rocket.me()["username"])
+
+    def login():
+        for index in range(15):
+            rocket.login(("alice", "bob")[index % 2], "password")
+
+    # A token sent with the user id of the other user would be rejected
+    errors = _hammer([read] * 12 + [login] * 2)
+
+    assert errors == []
+    assert usernames <= {"alice", "bob"}
+    assert rocket.me()["_id"] == rocket.auth.user_id
+
+
+def test_logout(server):
+    rocket = RocketChat("alice", "password", server_url=server.url)
+
+    rocket.logout()
+
+    assert not rocket.auth.logged_in
+    assert dict(rocket.headers) == {}
+
+
+def test_logout_keeps_login_made_meanwhile(server):
+    rocket = RocketChat("alice", "password", server_url=server.url)
+
+    class LoginDuringLogout(RequestObserver):
+        def before_request(self, event):
+            if event.method == "logout":
+                rocket.login("bob", "password")
+
+    rocket.observers.append(LoginDuringLogout())
+    rocket.logout()
+
+    assert rocket.me()["username"] == "bob"
+
+
+def test_headers_are_copied_on_write():
+    rocket = RocketChat(auth_token="token", user_id="uid")
+    before = rocket.auth
+
+    rocket.headers["x-2fa-code"] = "123"
+    rocket.headers = {**rocket.headers, "X-Auth-Token": "new"}
+    del rocket.headers["x-2fa-code"]
+    rocket.headers.update({"x-custom": "1"})
+
+    assert dict(before.headers) == {"X-Auth-Token": "token", "X-User-Id": "uid"}
+    assert rocket.headers == {
+        "X-Auth-Token": "new",
+        "X-User-Id": "uid",
+        "x-custom": "1",
+    }
+    assert rocket.auth.auth_token == "new"
+
+
+def test_extra_headers_are_sent_and_kept_across_logins(server):
+    rocket = RocketChat(server_url=server.url)
+    rocket.headers["x-2fa-code"] = "123"
+
+    rocket.login("alice", "password")
+    assert rocket.me()["username"] == "alice"
+    assert rocket.headers["x-2fa-code"] == "123"
+    rocket.logout()
+
+    assert rocket.headers.copy() == {"x-2fa-code": "123"}
+    session = Mock()
+    session.get.return_value = mock_response()
+    rocket.session = session
+    rocket.channels_info(room_id="GENERAL")
+    assert session.get.call_args.kwargs["headers"]["x-2fa-code"] == "123"
+
+
+def test_per_thread_sessions():
+    transport = RequestsTransport(pool_maxsize=8, per_thread_sessions=True)
+    sessions = []
+    _hammer([lambda: sessions.append(transport.thread_session())] * 4)
+
+    assert transport.thread_session() is transport.session
+    assert len({id(session) for session in sessions + [transport.session]}) == 5
+    adapters = {session.get_adapter("https://example.com") for session in sessions}
+    assert adapters == {transport.adapter}
+    with pytest.raises(ValueError):
+        RequestsTransport(session=transport.session, per_thread_sessions=True)
+
+
+def test_thread_safe_client_shares_one_pool(server):
+    rocket = RocketChat("alice", "password", server_url=server.url, thread_safe=True)
+
+    def read():
+        for _ in range(20):
+            assert rocket.channels_info(room_id="GENERAL")["success"]
+
+    assert _hammer([read] * 16) == []
+    assert rocket.transport.adapter._pool_maxsize == 32
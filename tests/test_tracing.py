@@ -0,0 +1,165 @@
+import asyncio
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from rocketchat_API.APIExceptions.RocketExceptions import (
+    RocketBadStatusCodeException,
+)
+from rocketchat_API.fake_server import FakeRocketChatServer
+from rocketchat_API.rocketchat import AsyncRocketChat, RocketChat
+from rocketchat_API.tracing import Tracer
+
+
+class RecordedSpan:
+    def __init__(self, name, parent, attributes):
+        self.name = name
+        self.parent = parent
+        self.attributes = dict(attributes or {})
+        self.exceptions = []
+        self.ended = False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, exception):
+        self.exceptions.append(exception)
+
+    def end(self):
+        self.ended = True
+
+
+class RecordingTracer(Tracer):
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, parent=None, attributes=None):
+        span = RecordedSpan(name, parent, attributes)
+        self.spans.append(span)
+        return span
+
+    def named(self, name):
+        return [span for span in self.spans if span.name == name]
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeRocketChatServer(max_page_size=20) as fake:
+        fake.add_messages("GENERAL", 45)
+        yield fake
+
+
+def _rocket(server):
+    tracer = RecordingTracer()
+    rocket = RocketChat("admin", "password", server_url=server.url, tracer=tracer)
+    return rocket, tracer
+
+
+def test_request_span(server):
+    rocket, tracer = _rocket(server)
+
+    rocket.channels_info(room_id="GENERAL")
+
+    (span,) = tracer.named("channels.info")
+    assert span.parent is None
+    assert span.ended
+    assert span.attributes["http.method"] == "GET"
+    assert span.attributes["http.status_code"] == 200
+    assert span.attributes["rocketchat.retries"] == 0
+    assert span.attributes["rocketchat.bytes_received"] > 0
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"prefetch": 2}, {"stream": True}])
+def test_walk_span_is_parent_of_page_requests(server, kwargs):
+    rocket, tracer = _rocket(server)
+
+    for _ in rocket.channels_history("GENERAL", count=20, **kwargs):
+        time.sleep(0.001)
+
+    (walk,) = tracer.named("channels_history")
+    pages = tracer.named("channels.history")
+    assert len(pages) == 3
+    assert all(page.parent is walk and page.ended for page in pages)
+    assert walk.ended
+    assert walk.attributes["rocketchat.page_size"] == 20
+    assert walk.attributes["rocketchat.pages"] == 3
+    assert walk.attributes["rocketchat.items"] == 45
+    assert walk.attributes["rocketchat.consumer_seconds"] >= 0.045
+    assert walk.attributes["rocketchat.wait_seconds"] > 0
+
+
+def test_walk_span_ends_when_stopped_early(server):
+    rocket, tracer = _rocket(server)
+
+    messages = list(rocket.channels_history("GENERAL", count=20, max_count=5))
+
+    (walk,) = tracer.named("channels_history")
+    assert len(messages) == 5
+    assert walk.ended
+    assert walk.attributes["rocketchat.items"] == 5
+    assert walk.attributes["rocketchat.pages"] == 1
+
+
+def test_walk_span_records_failed_page():
+    session = Mock()
+    first_page = Mock(status_code=200, headers={})
+    first_page.json.return_value = {"messages": [{"_id": "1"}, {"_id": "2"}]}
+    session.get.side_effect = [first_page, Mock(status_code=500, headers={})]
+    tracer = RecordingTracer()
+    rocket = RocketChat(session=session, tracer=tracer)
+
+    with pytest.raises(RocketBadStatusCodeException):
+        list(rocket.channels_history("GENERAL", count=2))
+
+    (walk,) = tracer.named("channels_history")
+    assert walk.ended
+    assert walk.attributes["rocketchat.items"] == 2
+    assert isinstance(walk.exceptions[0], RocketBadStatusCodeException)
+    assert tracer.named("channels.history")[1].attributes["http.status_code"] == 500
+
+
+def test_async_walk_span(server):
+    tracer = RecordingTracer()
+
+    async def walk():
+        async with AsyncRocketChat(
+            "admin", "password", server_url=server.url, tracer=tracer
+        ) as rocket:
+            return [
+                message
+                async for message in rocket.channels_history(
+                    "GENERAL", count=20, prefetch=2
+                )
+            ]
+
+    assert len(asyncio.run(walk())) == 45
+    (walk_span,) = tracer.named("channels_history")
+    pages = tracer.named("channels.history")
+    assert len(pages) == 3
+    assert all(page.parent is walk_span for page in pages)
+    assert walk_span.attributes["rocketchat.pages"] == 3
+
+
+def test_opentelemetry_tracer(server):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    from rocketchat_API.tracing import OpenTelemetryTracer
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = OpenTelemetryTracer(provider.get_tracer("tests"))
+    rocket = RocketChat("admin", "password", server_url=server.url, tracer=tracer)
+
+    list(rocket.channels_history("GENERAL", count=20))
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    walk = spans["channels_history"]
+    assert spans["channels.history"].parent.span_id == walk.context.span_id
+    assert walk.attributes["rocketchat.items"] == 45
@@ -0,0 +1,59 @@
+import json
+from unittest.mock import Mock
+
+from rocketchat_API.rocketchat import RocketChat
+from rocketchat_API.transport import RequestsTransport, RocketChatTransport
+
+
+class RecordingTransport(RocketChatTransport):
+    def __init__(self):
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        response = Mock()
+        response.status_code = 200
+        response.json.return_value = {"success": True}
+        return response
+
+
+def test_custom_transport_receives_all_calls():
+    transport = RecordingTransport()
+    rocket = RocketChat(transport=transport, timeout=5)
+
+    rocket.channels_info(room_id="GENERAL")
+    rocket.chat_post_message("hello", room_id="GENERAL")
+
+    assert [call[0] for call in transport.calls] == ["get", "post"]
+    assert transport.calls[0][1].endswith("channels.info?roomId=GENERAL")
+    body = json.loads(transport.calls[1][2]["data"])
+    assert body == {"roomId": "GENERAL", "text": "hello"}
+    assert transport.calls[1][2]["timeout"] == 5
+
+
+def test_requests_transport_pool_size():
+    transport = RequestsTransport(pool_connections=4, pool_maxsize=64, max_retries=2)
+    adapter = transport.session.get_adapter("https://example.com")
+
+    assert adapter._pool_connections == 4
+    assert adapter._pool_maxsize == 64
+    assert adapter.max_retries.total == 2
+
+
+def test_requests_transport_keeps_given_session():
+    session = Mock()
+    rocket = RocketChat(session=session)
+
+    assert rocket.session is session
+    session.mount.assert_not_called()
+
+
+def test_requests_transport_without_keep_alive():
+    session = Mock()
+    transport = RequestsTransport(session=session, keep_alive=False)
+
+    transport.request("get", "http://localhost", headers={"X-User-Id": "id"})
+
+    session.get.assert_called_once_with(
+        "http://localhost", headers={"X-User-Id": "id", "Connection": "close"}
+    )
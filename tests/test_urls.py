@@ -0,0 +1,45 @@
+from unittest.mock import Mock
+from urllib.parse import parse_qs, urlsplit
+
+from rocketchat_API.rocketchat import RocketChat
+from rocketchat_API.urls import build_query, endpoint_url
+from tests.conftest import mock_response
+
+
+def test_build_query_encodes_values():
+    query = build_query(
+        {"searchText": "fish & chips #1 +50% ok?", "count": 10, "flag": True}
+    )
+
+    assert query == (
+        "searchText=fish%20%26%20chips%20%231%20%2B50%25%20ok%3F&count=10&flag=True"
+    )
+    assert parse_qs(query)["searchText"] == ["fish & chips #1 +50% ok?"]
+
+
+def test_build_query_lists_and_safe_characters():
+    query = build_query(
+        {"userIds": ["a", "b&c"], "since": "2024-01-01T00:00:00.000Z", "x": ""}
+    )
+
+    assert query == "userIds[]=a&userIds[]=b%26c&since=2024-01-01T00:00:00.000Z&x="
+    assert build_query({}) == ""
+
+
+def test_endpoint_url():
+    assert (
+        endpoint_url("https://chat.example.com", "/api/v1/", "chat.search")
+        == "https://chat.example.com/api/v1/chat.search"
+    )
+
+
+def test_search_text_is_sent_encoded():
+    session = Mock()
+    session.get.return_value = mock_response({"messages": []})
+    rocket = RocketChat(session=session)
+
+    list(rocket.chat_search("GENERAL", "a&b=c #d"))
+
+    url = session.get.call_args[0][0]
+    assert url.startswith("http://127.0.0.1:3000/api/v1/chat.search?")
+    assert parse_qs(urlsplit(url).query)["searchText"] == ["a&b=c #d"]